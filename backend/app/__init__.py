@@ -6,7 +6,12 @@ from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager,create_access_token, jwt_required,get_jwt_identity
 from flask_cors import CORS
 from config import Config
-from .utilis.redis import init_redis
+from .utilis.cache import init_cache
+from .utilis.password_pool import init_password_pool
+from .utilis.render_pool import init_render_pool
+from .utilis.certificate_pdf import init_pdf_renderer
+from .utilis.order_book import init_order_book
+from .utilis.pagination import NEXT_CURSOR_HEADER, SINCE_CURSOR_HEADER
 
 db = SQLAlchemy(engine_options=Config.SQLALCHEMY_ENGINE_OPTIONS)
 bcrypt = Bcrypt()
@@ -17,12 +22,15 @@ def create_app():
     app = Flask(__name__)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config.from_object(Config)
-    # a central invalidation logic is required
-    # init_redis(app)
-    CORS(app)
+    init_cache(app)
+    # Browsers only hand page cursors to the client when they are exposed
+    CORS(app, expose_headers=[NEXT_CURSOR_HEADER, SINCE_CURSOR_HEADER])
     db.init_app(app)
     migrate.init_app(app,db)
     bcrypt.init_app(app)
+    init_password_pool(app)
+    init_render_pool(app)
+    init_pdf_renderer(app)
     jwt.init_app(app)
     
     # Register blueprints
@@ -32,6 +40,7 @@ def create_app():
 
     from .routes.health_routes import health_bp
     from .routes.verification_routes import verification_bp
+    from .routes.market_routes import market_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(NGO_bp)
@@ -39,10 +48,20 @@ def create_app():
 
     app.register_blueprint(health_bp)
     app.register_blueprint(verification_bp)
+    app.register_blueprint(market_bp)
     
+    from .utilis.market_data import init_market_data
+    from .utilis.baselines import init_baselines
+    from .utilis.telemetry import init_telemetry
+
+    init_telemetry(app)
+
     with app.app_context():
         db.create_all()
         print("Connected to NeonPostgresql !")
+        init_order_book(app)
+        init_market_data(app)
+        init_baselines(app)
 
     # print(app.url_map)
 
@@ -0,0 +1,12 @@
+from app import db
+from datetime import datetime
+
+
+class CertificateRender(db.Model):
+    """Rendered certificate of an expired purchase, addressed by the SHA-256 of its body"""
+    __tablename__ = 'certificate_renders'
+    purchase_id = db.Column(db.Integer, db.ForeignKey('purchased_credits.id'), primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False)
+    body = db.Column(db.Text, nullable=False)  # JSON of the certificate data
+    template_version = db.Column(db.String(16), nullable=True)  # TEMPLATE_VERSION rendered with
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
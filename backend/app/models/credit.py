@@ -1,15 +1,23 @@
 from app import db
 from app.models.user import User
+from datetime import datetime
 
 
 class Credit(db.Model):
     __tablename__ = 'credits'
+    __table_args__ = (
+        # Marketplace listing: active credits in price order, keyset on (price, id)
+        db.Index('ix_credits_is_active_price_id', 'is_active', 'price', 'id'),
+        db.Index('ix_credits_creator_id_id', 'creator_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     amount = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)
     is_active = db.Column(db.Boolean, default=False)
     is_expired = db.Column(db.Boolean, default=False)
+    is_verified = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     creator_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     docu_url = db.Column(db.String(200))
 
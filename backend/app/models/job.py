@@ -0,0 +1,31 @@
+from app import db
+from datetime import datetime
+
+
+class BackgroundJob(db.Model):
+    """Progress of a background job, readable from any worker process"""
+    __tablename__ = 'background_jobs'
+    __table_args__ = (
+        db.Index('ix_background_jobs_finished_at', 'finished_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    total = db.Column(db.Integer, nullable=False)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    counts = db.Column(db.JSON, nullable=False, default=dict)  # results per status
+    errors = db.Column(db.JSON, nullable=False, default=list)  # failed chunks
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # last progress, to spot jobs lost to a restart
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class BackgroundJobChunk(db.Model):
+    """Per-item results of one processed chunk of a job"""
+    __tablename__ = 'background_job_chunks'
+
+    job_id = db.Column(db.String(32), db.ForeignKey('background_jobs.id', ondelete='CASCADE'), primary_key=True)
+    start_index = db.Column(db.Integer, primary_key=True, autoincrement=False)  # index of the chunk's first item
+    results = db.Column(db.JSON, nullable=False)
@@ -0,0 +1,18 @@
+from app import db
+
+
+class MarketCandle(db.Model):
+    """OHLCV rollup of credit transactions per production method and time bucket"""
+    __tablename__ = 'market_candles'
+
+    production_method = db.Column(db.String(50), primary_key=True)
+    interval = db.Column(db.String(2), primary_key=True)  # 1m, 1h, 1d
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.Integer, nullable=False, default=0)  # credit units traded
+    notional = db.Column(db.Float, nullable=False, default=0.0)
+    trades = db.Column(db.Integer, nullable=False, default=0)
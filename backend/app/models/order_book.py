@@ -0,0 +1,45 @@
+from app import db
+from datetime import datetime
+
+
+class BookOrder(db.Model):
+    """Resting order in the last order book snapshot"""
+    __tablename__ = 'order_book_orders'
+    __table_args__ = (
+        db.Index('ix_order_book_orders_class_side_price', 'credit_class', 'side', 'price_ticks', 'id'),
+    )
+
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False)  # engine sequence number
+    credit_class = db.Column(db.String(50), nullable=False)
+    side = db.Column(db.String(4), nullable=False)  # buy, sell
+    price_ticks = db.Column(db.BigInteger, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    remaining = db.Column(db.Integer, nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+
+class OrderBookState(db.Model):
+    """Single row: WAL sequence number covered by the snapshot"""
+    __tablename__ = 'order_book_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_seq = db.Column(db.BigInteger, nullable=False, default=0)
+    snapshot_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class OrderFill(db.Model):
+    __tablename__ = 'order_fills'
+    __table_args__ = (
+        db.Index('ix_order_fills_class_created_at', 'credit_class', 'created_at'),
+        db.Index('ix_order_fills_taker_order_id', 'taker_order_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    credit_class = db.Column(db.String(50), nullable=False)
+    maker_order_id = db.Column(db.BigInteger, nullable=False)
+    taker_order_id = db.Column(db.BigInteger, nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
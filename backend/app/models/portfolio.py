@@ -0,0 +1,13 @@
+from app import db
+from datetime import datetime
+
+class PortfolioSummary(db.Model):
+    """Per-buyer portfolio totals, maintained incrementally on purchase/sell/expire"""
+    __tablename__ = 'portfolio_summaries'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    credits_count = db.Column(db.Integer, nullable=False, default=0)
+    expired_count = db.Column(db.Integer, nullable=False, default=0)
+    total_invested = db.Column(db.Float, nullable=False, default=0.0)
+    current_value = db.Column(db.Float, nullable=False, default=0.0)
+    hydrogen_offset = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
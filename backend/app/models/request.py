@@ -2,6 +2,9 @@ from app import db
 
 class Request(db.Model):
     __tablename__ = 'requests'
+    __table_args__ = (
+        db.Index('ix_requests_credit_id', 'credit_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     credit_id = db.Column(db.Integer, db.ForeignKey('credits.id'), nullable=False)
     creator_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
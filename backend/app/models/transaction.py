@@ -3,6 +3,10 @@ from datetime import datetime
 
 class PurchasedCredit(db.Model):
     __tablename__ = 'purchased_credits'
+    __table_args__ = (
+        db.Index('ix_purchased_credits_user_id_credit_id', 'user_id', 'credit_id'),
+        db.Index('ix_purchased_credits_credit_id', 'credit_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     credit_id = db.Column(db.Integer, db.ForeignKey('credits.id'), nullable=False)
@@ -17,6 +21,14 @@ class PurchasedCredit(db.Model):
 
 class Transactions(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_timestamp', 'timestamp'),
+        # Latest transaction for a credit: filter on credit_id, order by timestamp
+        db.Index('ix_transactions_credit_id_timestamp', 'credit_id', 'timestamp'),
+        db.Index('ix_transactions_buyer_id', 'buyer_id'),
+        # One transaction per on-chain payment; retries replay it
+        db.Index('uq_transactions_txn_hash', 'txn_hash', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     credit_id = db.Column(db.Integer, db.ForeignKey('credits.id'), nullable=False)
@@ -3,6 +3,12 @@ from datetime import datetime
 
 class VerificationRequest(db.Model):
     __tablename__ = 'verification_requests'
+    __table_args__ = (
+        # Pending queue: filter on status, keyset on id
+        db.Index('ix_verification_requests_status_id', 'status', 'id'),
+        db.Index('ix_verification_requests_industry_id', 'industry_id'),
+        db.Index('ix_verification_requests_credit_id', 'credit_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     industry_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -25,10 +31,14 @@ class VerificationRequest(db.Model):
 
     credit = db.relationship('Credit', backref='verification_request')
     documents = db.relationship('VerificationDocument', backref='verification_request', cascade='all, delete-orphan')
+    ml_results = db.relationship('VerificationResult', backref='verification_request', cascade='all, delete-orphan')
 
 
 class VerificationDocument(db.Model):
     __tablename__ = 'verification_documents'
+    __table_args__ = (
+        db.Index('ix_verification_documents_verification_request_id', 'verification_request_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     verification_request_id = db.Column(db.Integer, db.ForeignKey('verification_requests.id'), nullable=False)
@@ -42,3 +52,53 @@ class VerificationDocument(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class VerificationResult(db.Model):
+    """ML verification output stored once per request and model version"""
+    __tablename__ = 'verification_results'
+    __table_args__ = (
+        db.UniqueConstraint('verification_request_id', 'model_version', name='uq_verification_result_version'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    verification_request_id = db.Column(db.Integer, db.ForeignKey('verification_requests.id'), nullable=False)
+    model_version = db.Column(db.String(20), nullable=False)
+    
+    is_valid = db.Column(db.Boolean, nullable=False)
+    composite_score = db.Column(db.Float, nullable=False)
+    fraud_probability = db.Column(db.Float, nullable=False)
+    result = db.Column(db.JSON, nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ProductionBaseline(db.Model):
+    """Running efficiency statistics (kWh/kg) of a producer's approved requests for one method"""
+    __tablename__ = 'production_baselines'
+
+    producer_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    production_method = db.Column(db.String(50), primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0.0)
+    m2 = db.Column(db.Float, nullable=False, default=0.0)  # Welford sum of squared deviations
+    ewma = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class FacilityTelemetry(db.Model):
+    """Streaming detector state of one facility's meter telemetry (see app.utilis.telemetry)"""
+    __tablename__ = 'facility_telemetry'
+
+    facility_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    last_minute = db.Column(db.BigInteger, nullable=False, default=-1)  # epoch minute of the newest reading
+    readings = db.Column(db.Integer, nullable=False, default=0)
+    eff_readings = db.Column(db.Integer, nullable=False, default=0)
+    eff_mean = db.Column(db.Float, nullable=False, default=0.0)
+    eff_var = db.Column(db.Float, nullable=False, default=0.0)
+    kwh_mean = db.Column(db.Float, nullable=False, default=0.0)
+    kwh_var = db.Column(db.Float, nullable=False, default=0.0)
+    rate = db.Column(db.Float, nullable=False, default=0.0)  # decayed share of flagged readings
+    flagged = db.Column(db.Integer, nullable=False, default=0)
+    kwh_total = db.Column(db.Float, nullable=False, default=0.0)
+    kg_total = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,17 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, bcrypt
+from app import db
 from app.models.credit import Credit
 from app.models.request import Request
 from app.models.transaction import PurchasedCredit, Transactions
 from app.models.user import User
 from app.models.verification import VerificationRequest
-from app.utilis.redis import get_redis
+from app.utilis import cache, certificates
+from app.utilis.current_user import load_current_user
+from app.utilis.order_book import cancel_resting, get_engine
+from app.utilis.password_pool import PasswordPoolBusy, PasswordPoolUnavailable, check_password
+from app.utilis.portfolio import mark_expired
+from app.utilis.pagination import (
+    decode_cursor, encode_cursor, page_args, split_page, with_next_cursor, with_since_cursor,
+)
+from sqlalchemy import func, select, tuple_
+import csv
+import io
 import random
 import json
+from datetime import datetime, timedelta
+from itertools import islice
+from config import Config
 
 NGO_bp = Blueprint('NGO', __name__)
-redis_client = get_redis()
 def get_current_user():
     try:
         return json.loads(get_jwt_identity())
@@ -27,27 +39,35 @@ def manage_credits():
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized"}), 403
 
-    user = User.query.filter_by(username=current_user.get('username')).first()
+    user = load_current_user()
 
-    key = user.username
     # Ensure only credits created by this NGO are visible
     if request.method == 'GET':
-        if redis_client:
-            try:
-                cached_credits = redis_client.get(key)
-                if cached_credits:
-                    print("cache hit credit")
-                    print(f"key: {key}")
-                    return jsonify(json.loads(cached_credits))
-                else:
-                    print("cache miss credit")
-                    print(f"key: {key}")
-            except Exception as e:
-                print(f"redis get client error: {e}")
-        credits = Credit.query.filter_by(creator_id=user.id).order_by(Credit.id.asc()).all()
+        try:
+            limit, cursor = page_args(types=(int,))
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        page_key = f"{limit}:{request.args.get('cursor', '')}"
+        entry_key = cache.make_key(cache.NGO_CREDITS, user.id, page_key)
+        cached = cache.get_json(entry_key)
+        if cached is not None:
+            return with_next_cursor(jsonify(cached['data']), cached['next_cursor']), 200
+        # Score of the credit's first request, resolved in the same query
+        request_score = (
+            select(Request.score)
+            .where(Request.credit_id == Credit.id)
+            .order_by(Request.id.asc())
+            .limit(1)
+            .correlate(Credit)
+            .scalar_subquery()
+        )
+        query = db.session.query(Credit, request_score).filter(Credit.creator_id == user.id)
+        if cursor:
+            query = query.filter(Credit.id > cursor[0])
+        rows = query.order_by(Credit.id.asc()).limit(limit + 1).all()
+        rows, next_cursor = split_page(rows, limit, key=lambda row: [row[0].id])
         data = []
-        for c in credits:
-            req = Request.query.filter_by(credit_id=c.id).first()
+        for c, score in rows:
             # Generate token ID for auto-generated credits
             token_id = f"TOKEN_{c.id}" if c.is_verified else None
             
@@ -61,30 +81,17 @@ def manage_credits():
                 "creator_id": c.creator_id,
                 "secure_url": c.docu_url,
                 "req_status": c.req_status,
-                "score": req.score if req else 0,
+                "score": score or 0,
                 "is_ml_verified": c.is_verified,
                 "token_id": token_id,
                 "verification_status": "ML-Approved" if c.is_verified else "Pending",
                 "auto_generated": c.is_verified and c.req_status == 2
             })
-        if redis_client:
-            try:
-                redis_client.set(key, json.dumps(data))
-            except Exception as e:
-                print(f"Redis error: {e}")
-        return jsonify(data), 200
+        cache.set_json(entry_key, {"data": data, "next_cursor": next_cursor})
+        return with_next_cursor(jsonify(data), next_cursor), 200
 
     # Allow the NGO to create new credits
     if request.method == 'POST':
-        
-        if redis_client:
-            try:
-                # cached_credits = redis_client.get(key)
-                redis_client.delete(key)
-                print("cache credit delete")
-                print(f"key: {key}")
-            except:
-                pass
         #do something regarding the amount 
         data = request.json
 
@@ -111,6 +118,7 @@ def manage_credits():
 
         
         db.session.commit()
+        cache.on_credit_created(new_credit)
         return jsonify({"message": "Credit created successfully"}), 201
 
 
@@ -121,46 +129,101 @@ def expire_credit(credit_id):
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized"}), 403
 
-    user = User.query.filter_by(username=current_user.get('username')).first()
+    user = load_current_user()
     credit = Credit.query.get(credit_id)
-    pc = PurchasedCredit.query.filter_by(credit_id=credit.id).first()
 
     if not credit:
         return jsonify({"message": "Credit not found"}), 404
-    if not pc:
-        return jsonify({"message": f"Credit can't be expired as it has not been sold yet, credit with B_ID {credit_id} is not found"}), 400
     # Ensure only the creator NGO can expire the credit
     if credit.creator_id != user.id:
         return jsonify({"message": "You do not have permission to expire this credit"}), 403
 
-    # Expire the credit
-    credit.is_active = False
-    credit.is_expired = True
-    pc.is_expired = True
-    db.session.commit()
+    engine = get_engine()
+    with engine.exclusive():
+        # Units escrowed by resting sell orders go back to their holders first
+        cancelled = cancel_resting(engine, credit)
+        holdings = PurchasedCredit.query.filter_by(credit_id=credit.id).all()
+        if not holdings:
+            db.session.commit()
+            return jsonify({"message": f"Credit can't be expired as it has not been sold yet, credit with B_ID {credit_id} is not found"}), 400
+
+        # Expire the credit for every holder
+        credit.is_active = False
+        credit.is_expired = True
+        for pc in holdings:
+            if not pc.is_expired:
+                mark_expired(pc.user_id)
+            pc.is_expired = True
+        db.session.commit()
+    for holder_id in {pc.user_id for pc in holdings} | {o.owner_id for o in cancelled}:
+        cache.on_credit_expired(credit, holder_id)
+    # The certificates are final from now on; render them before the first download
+    for pc in holdings:
+        try:
+            certificates.precompute(pc.id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"certificate precompute error: {e}")
     return jsonify({"message": "Credit expired successfully"}), 200
 
+
 @NGO_bp.route('/api/NGO/transactions', methods=['GET'])
 @jwt_required()
 def get_transactions():
+    """
+    Transactions on the current NGO's credits.
+
+    By default newest first, paged with ?cursor= / X-Next-Cursor. With
+    ?since=<X-Since-Cursor of an earlier response> only transactions not
+    delivered yet are returned, in id order, so a dashboard can poll for
+    new rows; every response carries the X-Since-Cursor to poll from next.
+    """
     current_user = get_current_user()
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized"}), 403
-    key = current_user.get('username')+"trans"
-    if redis_client:
-        try:
-            cached_txns = redis_client.get(key)
-            if cached_txns:
-                print("Cache hit")
-                return jsonify(json.loads(cached_txns)), 200
-            else:
-                print("Cache miss")
-        except Exception as e:
-            print(f"redis get client error: {e}")
-    transactions = Transactions.query.order_by(Transactions.timestamp.desc()).all()
-    transaction_list = []
-    for t in transactions:
-        transaction_list.append({
+
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+    try:
+        limit, cursor = page_args(types=(str, int))
+        since = decode_cursor(request.args.get('since'))
+        if since:
+            since = (int(since[0]), {int(i) for i in since[1]})
+        if cursor:
+            cursor = (datetime.fromisoformat(cursor[0]), int(cursor[1]))
+    except (ValueError, TypeError, IndexError):
+        return jsonify({"message": "Invalid cursor"}), 400
+
+    page_key = json.dumps([limit, request.args.get('cursor', ''), request.args.get('since', '')])
+    entry_key = cache.make_key(cache.NGO_TRANSACTIONS, user.id, page_key)
+    cached = cache.get_json(entry_key)
+    if cached is None:
+        query = (
+            db.session.query(Transactions)
+            .join(Credit, Credit.id == Transactions.credit_id)
+            .filter(Credit.creator_id == user.id)
+        )
+        if since:
+            floor, seen = since
+            new_rows = query.filter(Transactions.id > floor)
+            if seen:
+                new_rows = new_rows.filter(Transactions.id.notin_(seen))
+            rows = new_rows.order_by(Transactions.id.asc()).limit(limit + 1).all()
+            rows, more = split_page(rows, limit, key=lambda t: [t.id])
+            next_cursor = None  # polling continues from the since cursor
+            # A full page leaves newer rows for the next poll
+            delivered_to = rows[-1].id if more else None
+            since_cursor = _feed_cursor(query, floor, seen | {t.id for t in rows}, delivered_to)
+        else:
+            sort_key = tuple_(Transactions.timestamp, Transactions.id)
+            if cursor:
+                query = query.filter(sort_key < cursor)
+            rows = query.order_by(Transactions.timestamp.desc(), Transactions.id.desc()).limit(limit + 1).all()
+            rows, next_cursor = split_page(rows, limit, key=lambda t: [t.timestamp.isoformat(), t.id])
+            since_cursor = None if cursor else _feed_cursor(query, 0, None, None)
+
+        transaction_list = [{
             "id": t.id,
             "buyer": t.buyer_id,
             "credit": t.credit_id,
@@ -168,13 +231,133 @@ def get_transactions():
             "total_price": t.total_price,
             "timestamp": t.timestamp.isoformat(),
             "txn_hash": t.txn_hash
-        })
-        if redis_client:
-            try:
-                redis_client.set(key,json.dumps(transaction_list),px=500)
-            except Exception as e:
-                print(f"Redis error: {e}")
-    return jsonify(transaction_list)
+        } for t in rows]
+        cached = {"data": transaction_list, "next_cursor": next_cursor, "since_cursor": since_cursor}
+        cache.set_json(entry_key, cached)
+
+    response = with_next_cursor(jsonify(cached['data']), cached['next_cursor'])
+    return with_since_cursor(response, cached['since_cursor']), 200
+
+
+def _feed_cursor(query, floor, delivered, delivered_to):
+    """
+    Since-cursor [floor, ids above floor already delivered]. Ids are handed
+    out at insert but rows become visible at commit, so a lower id can show
+    up after a higher one; the floor only passes ids older than
+    TRANSACTION_FEED_WINDOW, which any open transaction has committed by,
+    and the delivered ids above it are skipped by the next poll.
+    delivered=None means every row visible now, as on a first page.
+    delivered_to caps the floor when a full page left rows undelivered.
+    Only the newest TRANSACTION_FEED_MAX_SEEN delivered ids are kept, so
+    the cursor fits in a request line; beyond that the floor moves up to
+    the newest id dropped, and a row below it still uncommitted is missed.
+    """
+    settled_before = datetime.utcnow() - timedelta(seconds=Config.TRANSACTION_FEED_WINDOW)
+    settled = query.filter(Transactions.timestamp <= settled_before) \
+        .with_entities(func.max(Transactions.id)).scalar()
+    if settled is not None and delivered_to is not None:
+        settled = min(settled, delivered_to)
+    floor = max(floor, settled or 0)
+    if delivered is None:
+        delivered = {row[0] for row in query.filter(Transactions.id > floor).with_entities(Transactions.id)}
+    delivered = sorted(i for i in delivered if i > floor)
+    if len(delivered) > Config.TRANSACTION_FEED_MAX_SEEN:
+        floor = delivered[-Config.TRANSACTION_FEED_MAX_SEEN - 1]
+        delivered = delivered[-Config.TRANSACTION_FEED_MAX_SEEN:]
+    return encode_cursor([floor, delivered])
+
+
+EXPORT_COLUMNS = ['id', 'buyer_id', 'credit_id', 'amount', 'total_price', 'timestamp', 'txn_hash']
+
+
+def _parse_export_date(value, end=False):
+    """ISO date or datetime; a bare end date covers that whole day"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+@NGO_bp.route('/api/NGO/transactions/export', methods=['GET'])
+@jwt_required()
+def export_transactions():
+    """
+    Stream transactions as CSV or NDJSON, oldest first.
+
+    ?format=csv|ndjson, ?from= and ?to= (ISO dates, `to` inclusive for a
+    bare date) and repeatable ?credit_id=. Only the transactions of the
+    calling NGO's own credits are exported. Rows are fetched
+    EXPORT_BATCH_SIZE at a time from a server-side cursor and written out
+    per batch, so memory stays flat whatever the result size.
+    """
+    current_user = get_current_user()
+    if current_user.get('role') != 'NGO':
+        return jsonify({"message": "Unauthorized"}), 403
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"message": "format must be 'csv' or 'ndjson'"}), 400
+    try:
+        start = _parse_export_date(request.args.get('from'))
+        end = _parse_export_date(request.args.get('to'), end=True)
+        credit_ids = [int(c) for c in request.args.getlist('credit_id')]
+    except ValueError:
+        return jsonify({"message": "Invalid from, to or credit_id"}), 400
+
+    query = (
+        db.session.query(*(getattr(Transactions, c) for c in EXPORT_COLUMNS))
+        .join(Credit, Credit.id == Transactions.credit_id)
+        .filter(Credit.creator_id == user.id)
+    )
+    if start:
+        query = query.filter(Transactions.timestamp >= start)
+    if end:
+        query = query.filter(Transactions.timestamp < end)
+    if credit_ids:
+        query = query.filter(Transactions.credit_id.in_(credit_ids))
+    query = query.order_by(Transactions.id).execution_options(yield_per=Config.EXPORT_BATCH_SIZE)
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == 'csv':
+            writer.writerow(EXPORT_COLUMNS)
+        rows = iter(query)
+        for batch in iter(lambda: list(islice(rows, Config.EXPORT_BATCH_SIZE)), []):
+            if export_format == 'csv':
+                writer.writerows(
+                    (r[0], r[1], r[2], r[3], r[4], r[5].isoformat(), r[6]) for r in batch
+                )
+            else:
+                for r in batch:
+                    buffer.write(json.dumps({
+                        "id": r[0],
+                        "buyer": r[1],
+                        "credit": r[2],
+                        "amount": r[3],
+                        "total_price": r[4],
+                        "timestamp": r[5].isoformat(),
+                        "txn_hash": r[6]
+                    }))
+                    buffer.write('\n')
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if export_format == 'csv' and buffer.tell():
+            yield buffer.getvalue()
+
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    filename = f"transactions-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @NGO_bp.route('/api/NGO/expire-req', methods=['POST'])
@@ -186,15 +369,19 @@ def check_expire_request():
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized"}), 403
 
-    username = current_user.get('username')
-    # Fetch user details from the database
-    user = User.query.filter_by(username=username).first()
+    user = load_current_user()
 
     if not user:
         return jsonify({"message": "User not found"}), 404
 
     #check if the given password was true 
-    if bcrypt.check_password_hash(user.password, data['password']):
+    try:
+        valid = check_password(user.password, data['password'])
+    except PasswordPoolUnavailable:
+        return jsonify({"message": "Password service unavailable"}), 503
+    except PasswordPoolBusy:
+        return jsonify({"message": "Server busy, please retry"}), 429, {"Retry-After": "1"}
+    if valid:
         return jsonify({"message": "User verified succesfully! can proceed to expire credit"}), 200
     return jsonify({"message": "Invalid credentials"}), 401
 
@@ -206,29 +393,42 @@ def get_auto_generated_credits():
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized"}), 403
 
-    user = User.query.filter_by(username=current_user.get('username')).first()
+    user = load_current_user()
+    try:
+        limit, cursor = page_args(types=(int,))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     
-    # Get auto-generated credits (ML verified)
-    auto_credits = Credit.query.filter_by(
-        creator_id=user.id,
-        is_verified=True,
-        req_status=2
-    ).order_by(Credit.created_at.desc()).all()
+    # Get auto-generated credits (ML verified), newest first
+    auto_filter = (
+        (Credit.creator_id == user.id) &
+        (Credit.is_verified == True) &
+        (Credit.req_status == 2)
+    )
+    total = db.session.query(func.count(Credit.id)).filter(auto_filter).scalar()
+    
+    # Verification details come from the same outer-joined query
+    query = (
+        db.session.query(Credit, VerificationRequest.production_method, VerificationRequest.hydrogen_amount)
+        .outerjoin(VerificationRequest, VerificationRequest.credit_id == Credit.id)
+        .filter(auto_filter)
+    )
+    if cursor:
+        query = query.filter(Credit.id < cursor[0])
+    rows = query.order_by(Credit.id.desc()).limit(limit + 1).all()
+    rows, next_cursor = split_page(rows, limit, key=lambda row: [row[0].id])
     
     auto_credits_data = []
-    for credit in auto_credits:
-        # Get verification details
-        verification = VerificationRequest.query.filter_by(credit_id=credit.id).first()
-        
+    for credit, production_method, hydrogen_amount in rows:
         auto_credits_data.append({
             "id": credit.id,
             "name": credit.name,
             "amount": credit.amount,
             "price": credit.price,
             "token_id": f"TOKEN_{credit.id}",
-            "production_method": verification.production_method if verification else "Unknown",
-            "hydrogen_amount": verification.hydrogen_amount if verification else credit.amount,
-            "verification_date": credit.created_at.isoformat(),
+            "production_method": production_method or "Unknown",
+            "hydrogen_amount": hydrogen_amount if hydrogen_amount is not None else credit.amount,
+            "verification_date": credit.created_at.isoformat() if credit.created_at else None,
             "ml_score": 100,  # Perfect ML verification
             "status": "ML-Approved & Token Generated",
             "documents": "Government certificates auto-generated"
@@ -236,8 +436,9 @@ def get_auto_generated_credits():
     
     return jsonify({
         "auto_credits": auto_credits_data,
-        "total_auto_generated": len(auto_credits_data),
-        "message": f"Found {len(auto_credits_data)} auto-generated credits from ML verification"
+        "total_auto_generated": total,
+        "next_cursor": next_cursor,
+        "message": f"Found {total} auto-generated credits from ML verification"
     })
 
 
@@ -1,7 +1,9 @@
-import requests
 from flask import Blueprint, request, jsonify
-from app import db, bcrypt, create_access_token
+from app import db, create_access_token
 from app.models.user import User
+from app.utilis.current_user import user_claims, load_current_user
+from app.utilis.captcha import CaptchaUnavailable, verify_captcha
+from app.utilis.password_pool import PasswordPoolBusy, PasswordPoolUnavailable, hash_password, check_password, needs_rehash
 import json
 import os
 from dotenv import load_dotenv
@@ -11,7 +13,6 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 load_dotenv()
 
 auth_bp = Blueprint('auth', __name__)
-SECRET_KEY =os.getenv('SECRET_KEY','1x0000000000000000000000000000000AA')
 @auth_bp.route('/api/signup', methods=['POST'])
 def signup():
     data = request.json
@@ -24,15 +25,19 @@ def signup():
     # For development, skip CAPTCHA verification
     captcha_response = data.get('cf-turnstile-response')
     if captcha_response:
-        captcha_verify = requests.post('https://challenges.cloudflare.com/turnstile/v0/siteverify',
-                                       data={
-                                       'secret': SECRET_KEY,
-                                       'response': captcha_response,
-                                       }).json()
-        if not captcha_verify.get('success'):
+        try:
+            captcha_ok = verify_captcha(captcha_response, request.remote_addr)
+        except CaptchaUnavailable:
+            return jsonify({"message": "CAPTCHA verification unavailable, please retry"}), 503
+        if not captcha_ok:
             return jsonify({"message":"CAPTCHA failed"}),400
     
-    hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+    try:
+        hashed_password = hash_password(data['password'])
+    except PasswordPoolUnavailable:
+        return jsonify({"message": "Password service unavailable"}), 503
+    except PasswordPoolBusy:
+        return jsonify({"message": "Server busy, please retry"}), 429, {"Retry-After": "1"}
     new_user = User(username=data['username'], email=data['email'], password=hashed_password, role=data['role'])
     db.session.add(new_user)
     db.session.commit()
@@ -43,12 +48,26 @@ def login():
     data = request.json
     user = User.query.filter_by(username=data['username']).first()
 
-    if user and bcrypt.check_password_hash(user.password, data['password']):
+    try:
+        valid = bool(user) and check_password(user.password, data['password'])
+    except PasswordPoolUnavailable:
+        return jsonify({"message": "Password service unavailable"}), 503
+    except PasswordPoolBusy:
+        return jsonify({"message": "Server busy, please retry"}), 429, {"Retry-After": "1"}
+
+    if valid:
         if data['role'] != user.role:
             return jsonify({"message": "Unauthorized"}),403
+        if needs_rehash(user.password):
+            # Below the configured floor: rehash at this worker's calibrated cost (best effort)
+            try:
+                user.password = hash_password(data['password'])
+                db.session.commit()
+            except PasswordPoolBusy:
+                pass
         identity = json.dumps({"username": user.username, "role": user.role})
         expires = timedelta(hours=12)
-        access_token = create_access_token(identity=identity, expires_delta= expires)
+        access_token = create_access_token(identity=identity, expires_delta= expires, additional_claims=user_claims(user))
         return jsonify(access_token=access_token,role=user.role), 200
     return jsonify({"message": "Invalid credentials"}), 401
 
@@ -57,12 +76,7 @@ def login():
 def get_profile():
     """Get user profile"""
     try:
-        identity = get_jwt_identity()
-        user_data = json.loads(identity)
-        username = user_data.get('username')
-        role = user_data.get('role')
-        
-        user = User.query.filter_by(username=username).first()
+        user = load_current_user()
         if not user:
             return jsonify({"message": "User not found"}), 404
             
@@ -1,50 +1,106 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User
 from app.models.credit import Credit
 from app.models.transaction import PurchasedCredit
 from app.models.transaction import Transactions
-from app.utilis.redis import get_redis
-# Use simple certificate only - no WeasyPrint
-from app.utilis.simple_certificate import generate_simple_certificate as generate_certificate_data
+from app.models.verification import VerificationRequest
+from app.utilis import cache, certificate_pdf, certificates, market_data
+from app.utilis.certificate_template import CERTIFICATE_CSS, CSS_VERSION, html_document
+from app.utilis.current_user import load_current_user, get_user
+from app.utilis.order_book import get_engine, whole_holding
+from app.utilis.portfolio import get_portfolio, apply_holding
+from app.utilis.pagination import page_args, split_page, with_next_cursor
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 import json
 import io
+from datetime import datetime
 import base64
-# WeasyPrint is not available
-WEASYPRINT_AVAILABLE = False
 from app import db
+from config import Config
 
 buyer_bp = Blueprint('buyer_bp', __name__)
-redis_client = get_redis()
 def get_current_user():
     try:
         return json.loads(get_jwt_identity())
     except json.JSONDecodeError:
         return None
 
+# Listing sort orders: (sort key columns, descending)
+MARKETPLACE_SORTS = {
+    'recent': ((Credit.id,), True),
+    'price_asc': ((Credit.price, Credit.id), False),
+    'price_desc': ((Credit.price, Credit.id), True),
+}
+
+
 @buyer_bp.route('/api/buyer/credits', methods=['GET'])
 @jwt_required()
 def buyer_credits():
-    key = "buyer_credits"
-    if redis_client:
-        try:
-            cached_credits = redis_client.get(key)
-            if cached_credits:
-                print("cache hit buyer_credits")
-                return jsonify(json.loads(cached_credits))
-            else:
-                print("cache miss buyer_credits")
-        except Exception as e:
-            print(f"redis get client error: {e}")
-    credits = Credit.query.filter_by(is_active =True).all()
-    data = [{"id": c.id, "name": c.name, "amount": c.amount, "price": c.price,"creator":c.creator_id, "secure_url": c.docu_url} for c in credits]
-    if redis_client:
-        try:
-            redis_client.set(key, json.dumps(data))
-            print("buyer_credits cached")
-        except:
-            pass
-    return jsonify(data)
+    """
+    Active marketplace listings, one keyset page at a time.
+
+    Filters: min_price, max_price, min_amount, max_amount, creator,
+    production_method. Sort: recent (default), price_asc, price_desc.
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    sort = request.args.get('sort', 'recent')
+    if sort not in MARKETPLACE_SORTS:
+        return jsonify({"message": f"Invalid sort, expected one of {', '.join(MARKETPLACE_SORTS)}"}), 400
+    columns, descending = MARKETPLACE_SORTS[sort]
+    try:
+        limit, cursor = page_args(types=[c.type.python_type for c in columns])
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    filters = {
+        "min_price": request.args.get('min_price', type=float),
+        "max_price": request.args.get('max_price', type=float),
+        "min_amount": request.args.get('min_amount', type=int),
+        "max_amount": request.args.get('max_amount', type=int),
+        "creator": request.args.get('creator', type=int),
+        "production_method": request.args.get('production_method'),
+    }
+
+    def load_listing():
+        query = Credit.query.filter(Credit.is_active == True)
+        if filters["min_price"] is not None:
+            query = query.filter(Credit.price >= filters["min_price"])
+        if filters["max_price"] is not None:
+            query = query.filter(Credit.price <= filters["max_price"])
+        if filters["min_amount"] is not None:
+            query = query.filter(Credit.amount >= filters["min_amount"])
+        if filters["max_amount"] is not None:
+            query = query.filter(Credit.amount <= filters["max_amount"])
+        if filters["creator"] is not None:
+            query = query.filter(Credit.creator_id == filters["creator"])
+        if filters["production_method"]:
+            query = query.filter(
+                select(VerificationRequest.id)
+                .where(VerificationRequest.credit_id == Credit.id)
+                .where(VerificationRequest.production_method == filters["production_method"])
+                .exists()
+            )
+        if cursor:
+            position = tuple_(*columns)
+            query = query.filter(position < tuple(cursor) if descending else position > tuple(cursor))
+        query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+        credits, next_cursor = split_page(
+            query.limit(limit + 1).all(), limit,
+            key=lambda c: [getattr(c, col.key) for col in columns],
+        )
+        return {
+            "data": [{"id": c.id, "name": c.name, "amount": c.amount, "price": c.price,"creator":c.creator_id, "secure_url": c.docu_url} for c in credits],
+            "next_cursor": next_cursor,
+        }
+
+    page_key = json.dumps([sort, limit, request.args.get('cursor', ''), filters], sort_keys=True)
+    page = cache.single_flight_json(
+        cache.MARKETPLACE, 'all', page_key, load_listing,
+        soft_ttl=Config.MARKETPLACE_SOFT_TTL
+    )
+    return with_next_cursor(jsonify(page['data']), page['next_cursor'])
 
 @buyer_bp.route('/api/buyer/purchase', methods=['POST'])
 @jwt_required()
@@ -60,54 +116,88 @@ def purchase_credit():
     if 'txn_hash' not in data:
         return jsonify({"message": "Missing txn_hash"}), 400
 
-    # Retrieve the credit
-    credit = Credit.query.get(data['credit_id'])
-    if not credit:
-        return jsonify({"message": "Credit not found"}), 404
-
     # Check if the current user exists
-    user = User.query.filter_by(username=current_user['username']).first()
+    user = load_current_user()
     if not user:
         return jsonify({"message": "User not found"}), 404
 
-    # Check if the credit already exists in the purchased_credits table
-    existing_credit = PurchasedCredit.query.filter_by(credit_id=credit.id).first()
-    if existing_credit:
-        db.session.delete(existing_credit)
-
-    # Add new entry to purchased_credits
-    purchased_credit = PurchasedCredit(
-        user_id=user.id,
-        credit_id=credit.id,
-        amount=credit.amount,
-        creator_id=credit.creator_id,
-    )
-
-    # Record the transaction
-    transaction = Transactions(
-        buyer_id=user.id,
-        credit_id=credit.id,
-        amount=credit.amount,
-        total_price=credit.price,
-        txn_hash=data['txn_hash']
-    )
-    key = "buyer_credits"
-    if redis_client:
+    # A retried request answers from the transaction it already recorded
+    replay = replay_purchase(data['txn_hash'], user.id, data['credit_id'])
+    if replay is not None:
+        return replay
+
+    # Serialized with the order book, which also moves this credit's units
+    engine = get_engine()
+    with engine.exclusive():
+        # Retrieve the credit, row-locked until commit where the database supports it
+        credit = db.session.get(Credit, data['credit_id'], with_for_update=True)
+        if not credit:
+            return jsonify({"message": "Credit not found"}), 404
+
+        # Take the credit off the market; only one concurrent buyer changes the row
+        claimed = db.session.execute(
+            update(Credit)
+            .where(Credit.id == credit.id, Credit.is_active == True)
+            .values(is_active=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            return jsonify({"message": "Credit is no longer for sale"}), 409
+
+        # A fixed-price sale moves every unit, so they must all be with one holder
+        holding = whole_holding(engine, credit)
+        if holding is None:
+            db.session.rollback()
+            return jsonify({"message": "Credit is split between holders, buy its units on the market"}), 409
+        previous_owner_id, existing_credit = holding
+        if existing_credit:
+            apply_holding(existing_credit.user_id, credit, -1, expired=existing_credit.is_expired)
+            db.session.delete(existing_credit)
+
+        # Add new entry to purchased_credits
+        purchased_credit = PurchasedCredit(
+            user_id=user.id,
+            credit_id=credit.id,
+            amount=credit.amount,
+            creator_id=credit.creator_id,
+        )
+
+        # Record the transaction
+        transaction = Transactions(
+            buyer_id=user.id,
+            credit_id=credit.id,
+            amount=credit.amount,
+            total_price=credit.price,
+            txn_hash=data['txn_hash']
+        )
+        # Add and commit the changes
+        db.session.add(purchased_credit)
+        db.session.add(transaction)
+        apply_holding(user.id, credit, 1)
         try:
-            redis_client.delete(key)
-        except Exception as e:
-            print(f"redis get client error: {e}")
-    # Update the credit to inactive
-    credit.is_active = False
-
-    # Add and commit the changes
-    db.session.add(purchased_credit)
-    db.session.add(transaction)
-    db.session.commit()
+            db.session.commit()
+        except IntegrityError:
+            # Same txn_hash committed concurrently by a retry of this request
+            db.session.rollback()
+            replay = replay_purchase(data['txn_hash'], user.id, data['credit_id'])
+            if replay is not None:
+                return replay
+            raise
+    cache.on_credit_purchased(credit, user.id, previous_owner_id)
 
     return jsonify({"message": "Credit purchased successfully"}), 200
 
 
+def replay_purchase(txn_hash, user_id, credit_id):
+    """Response for a txn_hash that was already recorded, or None if it is new"""
+    transaction = Transactions.query.filter_by(txn_hash=txn_hash).first()
+    if transaction is None:
+        return None
+    if transaction.buyer_id != user_id or str(transaction.credit_id) != str(credit_id):
+        return jsonify({"message": "txn_hash already used for another purchase"}), 409
+    return jsonify({"message": "Credit purchased successfully", "replayed": True}), 200
+
+
 @buyer_bp.route('/api/buyer/sell', methods=['PATCH'])
 @jwt_required()
 def sell_credit():
@@ -122,18 +212,37 @@ def sell_credit():
     if not data or 'credit_id' not in data or 'salePrice' not in data:
         return jsonify({"message": "Missing credit_id or salePrice"}), 400
 
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
     credit = Credit.query.get(data['credit_id'])
-    if credit:
+    if not credit:
+        return jsonify({"message": "Can't sell at this point"}), 400
+
+    engine = get_engine()
+    with engine.exclusive():
+        # Listings sell the whole credit, so only a holder of every unit lists it
+        holding = whole_holding(engine, credit)
+        if holding is None or holding[0] != user.id:
+            db.session.rollback()
+            return jsonify({"message": "Only the holder of all of this credit's units can put it on sale"}), 403
+        # Re-price the holder's portfolio summary at the sale price
+        row = holding[1]
+        holder_id = row.user_id if row else None
+        expired = bool(row and row.is_expired)
+        apply_holding(holder_id, credit, -1, expired=expired)
         credit.is_active = True
         credit.price = data['salePrice']
+        apply_holding(holder_id, credit, 1, expired=expired)
 
         if(credit.req_status != 3):
             credit.req_status = 3
-            
+
         db.session.commit()
+    cache.on_credit_listed(credit, holder_id)
 
-        return jsonify({"message": f"Credit put to sale with price {data['salePrice']}" }), 200
-    return jsonify({"message": "Can't sell at this point"}), 400
+    return jsonify({"message": f"Credit put to sale with price {data['salePrice']}" }), 200
 
 @buyer_bp.route('/api/buyer/remove-from-sale', methods=['PATCH'])
 @jwt_required()
@@ -148,13 +257,26 @@ def remove_credit():
     if not data or 'credit_id' not in data:
         return jsonify({"message": "Missing credit_id"}), 404
 
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
     credit = Credit.query.get(data['credit_id'])
-    if credit:
+    if not credit:
+        return jsonify({"message": "For some reason cant remove from sale, man if error is coming here we are cooked"}), 400
+
+    engine = get_engine()
+    with engine.exclusive():
+        # A listed credit has one holder, the one who listed it
+        holding = whole_holding(engine, credit)
+        if holding is None or holding[0] != user.id:
+            db.session.rollback()
+            return jsonify({"message": "Only the holder of all of this credit's units can take it off sale"}), 403
         credit.is_active = False
         db.session.commit()
+    cache.on_credit_listed(credit, holding[1].user_id if holding[1] else None)
 
-        return jsonify({"message": "Credit removed from sale" }), 200
-    return jsonify({"message": "For some reason cant remove from sale, man if error is coming here we are cooked"}), 400
+    return jsonify({"message": "Credit removed from sale" }), 200
 
 @buyer_bp.route('/api/buyer/purchased', methods=['GET'])
 @jwt_required()
@@ -163,21 +285,17 @@ def get_purchased_credits():
     if not current_user:
         return jsonify({"message": "Invalid token"}), 401
 
-    user = User.query.filter_by(username=current_user['username']).first()
-    key = user.username
-    if redis_client:
-        try:
-            cached_purchased = redis_client.get(key)
-            if cached_purchased:
-                return jsonify(json.loads(cached_purchased)), 200
-        except Exception as e:
-            print(f"redis get client error: {e}")
+    user = load_current_user()
+    entry_key = cache.make_key(cache.PURCHASED, user.id, 'list')
+    cached_purchased = cache.get_json(entry_key)
+    if cached_purchased is not None:
+        return jsonify(cached_purchased), 200
 
     purchased_credits = PurchasedCredit.query.filter_by(user_id=user.id).all()
     credits = []
     for pc in purchased_credits:
         credit = Credit.query.get(pc.credit_id)
-        creator = User.query.get(pc.creator_id) if pc.creator_id else None
+        creator = get_user(pc.creator_id)
         credits.append({
             "id": credit.id,
             "name": credit.name,
@@ -191,14 +309,43 @@ def get_purchased_credits():
                 "email": creator.email
             } if creator else None
         })
-        if redis_client:
-            try:
-                redis_client.set(key,json.dumps(credits),px=500)
-                print("puchased cached")
-            except:
-                pass
+    cache.set_json(entry_key, credits)
     return jsonify(credits), 200
 
+def load_certificate(user, credit_id):
+    """(CertificateRender, None) for an expired purchase, or (None, error response)"""
+    rendered = certificates.cached_render(user.id, credit_id)
+    if rendered is not None:
+        return rendered, None
+
+    row = (
+        certificates.certificate_sources()
+        .filter(PurchasedCredit.credit_id == credit_id, PurchasedCredit.user_id == user.id)
+        .first()
+    )
+    if row is None:
+        return None, (jsonify({"message": f"Credit with {credit_id} was never purchased"}), 404)
+    purchased_credit, credit, buyer, transaction = row
+    if credit is None:
+        return None, (jsonify({"message":"No such credit found"}),404)
+    if transaction is None:
+        return None, (jsonify({"message": f"Respective transaction with {purchased_credit.credit_id} not found"}), 404)
+    if not credit.is_expired:
+        return None, (jsonify({"message":f"No credit with {credit.id} has expired"}), 404)
+    return certificates.store(purchased_credit, credit, buyer, transaction), None
+
+
+def certificate_response(etag, build):
+    """304 when the client already holds `etag`, else the response from build()"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @buyer_bp.route('/api/buyer/generate-certificate/<int:creditId>', methods=['GET'])
 @jwt_required()
 def generate_certificate(creditId):
@@ -206,26 +353,16 @@ def generate_certificate(creditId):
     if not current_user:
         return jsonify({"message": "Invalid token"}), 401
     
-    user = User.query.filter_by(username=current_user['username']).first()
-    purchased_credit = PurchasedCredit.query.filter_by(credit_id=creditId, user_id=user.id).first()
-    if not purchased_credit:
-        return jsonify({"message": f"Credit with {creditId} was never purchased"}), 404
-
-    credit = Credit.query.get(purchased_credit.credit_id)
-    if credit is None:
-        return jsonify({"message":"No such credit found"}),404
+    user = load_current_user()
+    rendered, error = load_certificate(user, creditId)
+    if error:
+        return error
+    # The stored body already is the certificate JSON
+    return certificate_response(
+        rendered.content_hash,
+        lambda: Response(rendered.body, mimetype='application/json'),
+    )
 
-    transaction = Transactions.query.filter_by(credit_id=purchased_credit.credit_id).order_by(Transactions.timestamp.desc()).first()
-    if transaction is None:
-        return jsonify({"message": f"Respective transaction with {purchased_credit.credit_id} not found"}), 404
-    
-    # Use the certificate generator
-    certificate_data = generate_certificate_data(purchased_credit.id, user, purchased_credit, credit, transaction) if credit.is_expired else None
-        
-    if certificate_data is None:
-        return jsonify({"message":f"No credit with {credit.id} has expired"}), 404
-    
-    return jsonify(certificate_data), 200
 @buyer_bp.route('/api/buyer/download-certificate/<int:creditId>',methods=['GET'])
 @jwt_required()
 def download_certificate(creditId):
@@ -233,44 +370,96 @@ def download_certificate(creditId):
     if not current_user:
         return jsonify({"message": "Invalid token"}), 401
     
-    user = User.query.filter_by(username=current_user['username']).first()
-    purchased_credit = PurchasedCredit.query.filter_by(credit_id=creditId, user_id=user.id).first()
-    if not purchased_credit:
-        return jsonify({"message": f"Credit with {creditId} was never purchased"}), 404
-
-    credit = Credit.query.get(purchased_credit.credit_id)
-    if credit is None:
-        return jsonify({"message":"No such credit found"}),404
-    transaction = Transactions.query.filter_by(credit_id=purchased_credit.credit_id).order_by(Transactions.timestamp.desc()).first()
-    if transaction is None:
-        return jsonify({"message": "Respective transaction not found"}), 404
-    
-    certificate_data = generate_certificate_data(purchased_credit.id, user, purchased_credit, credit, transaction) if credit.is_expired else None
-    if certificate_data is None:
-        return jsonify({"message":f"No credit with {credit.id} has expired"}), 404
-    
-    # Return HTML certificate only since WeasyPrint is not available
-    return jsonify({
-        "filename": f"Hydrogen_Credit_Certificate_{purchased_credit.id}.html",
-        "html": certificate_data['certificate_html'],
+    user = load_current_user()
+    rendered, error = load_certificate(user, creditId)
+    if error:
+        return error
+
+    certificate_data = json.loads(rendered.body)
+    document = html_document(certificate_data['certificate_id'], certificate_data['certificate_html'])
+    details = {
         "certificate_id": certificate_data['certificate_id'],
         "buyer_name": certificate_data['buyer_name'],
         "credit_name": certificate_data['credit_name'],
         "amount": certificate_data['amount'],
         "purchase_date": certificate_data['purchase_date'],
         "transaction_hash": certificate_data['transaction_hash'],
-        "message": "PDF generation requires GTK libraries. Using HTML certificate instead."
-    })
+    }
+
+    if not certificate_pdf.WEASYPRINT_AVAILABLE:
+        # A different representation of the same content, with the stylesheet inlined
+        return certificate_response(f"{rendered.content_hash}-{CSS_VERSION}-download", lambda: jsonify({
+            "filename": f"Hydrogen_Credit_Certificate_{rendered.purchase_id}.html",
+            "html": document,
+            **details,
+            "message": "PDF generation requires GTK libraries. Using HTML certificate instead."
+        }))
+
+    etag = f"{rendered.content_hash}-{CSS_VERSION}-pdf"
+    if request.if_none_match.contains(etag):
+        return certificate_response(etag, None)
+
+    # Rendering happens on the PDF workers; this request only checks on it
+    status, key = certificate_pdf.request_pdf(document)
+    if status == certificate_pdf.PENDING:
+        poll_url = url_for('buyer_bp.download_certificate', creditId=creditId)
+        return jsonify({
+            "status": "pending",
+            "poll_url": poll_url,
+            "message": "Certificate PDF is being rendered"
+        }), 202, {"Location": poll_url, "Retry-After": "1"}
+    if status == certificate_pdf.BUSY:
+        return jsonify({"message": "Too many certificates rendering, please retry"}), 503, {"Retry-After": "5"}
+    if status == certificate_pdf.FAILED:
+        return jsonify({"message": "Certificate PDF could not be rendered"}), 500
+
+    return certificate_response(etag, lambda: jsonify({
+        "filename": f"Hydrogen_Credit_Certificate_{rendered.purchase_id}.pdf",
+        "pdf_base64": base64.b64encode(certificate_pdf.read_pdf(key)).decode('ascii'),
+        **details,
+    }))
+
+@buyer_bp.route('/api/certificates/certificate.css', methods=['GET'])
+def certificate_stylesheet():
+    """Shared certificate styles; public so a <link> can load it, cached for good under ?v="""
+    response = Response(CERTIFICATE_CSS, mimetype='text/css')
+    response.set_etag(CSS_VERSION)
+    if request.args.get('v') == CSS_VERSION:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+@buyer_bp.route('/api/buyer/certificates/export', methods=['GET'])
+@jwt_required()
+def export_certificates():
+    """All certificates of the current buyer's expired credits as one streamed ZIP with a manifest"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"message": "Invalid token"}), 401
+
+    user = load_current_user()
+    rows = certificates.expired_purchases(user.id)
+    filename = f"hydrogen_certificates_{user.id}_{datetime.utcnow():%Y%m%d}.zip"
+    return Response(
+        stream_with_context(certificates.zip_stream(rows)),
+        mimetype='application/zip',
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 @buyer_bp.route('/api/buyer/credits/<int:credit_id>', methods=['GET'])
 @jwt_required()
 def get_credit_details(credit_id):
+    entry_key = cache.make_key(cache.CREDIT, credit_id, 'details')
+    cached_credit = cache.get_json(entry_key)
+    if cached_credit is not None:
+        return jsonify(cached_credit)
     try:
         credit = Credit.query.get_or_404(credit_id)
         user = User.query.get_or_404(credit.creator_id)
 
 
-        return jsonify({
+        details = {
             "id": credit.id,
             "name": credit.name,
             "amount": credit.amount,
@@ -282,7 +471,9 @@ def get_credit_details(credit_id):
             "docu_url": credit.docu_url,
 
             "req_status": credit.req_status
-        })
+        }
+        cache.set_json(entry_key, details)
+        return jsonify(details)
     except Exception as e:
         return jsonify({"error": "Credit not found"}), 404
 
@@ -294,22 +485,13 @@ def get_portfolio_analytics():
     if not current_user:
         return jsonify({"message": "Invalid token"}), 401
 
-    user = User.query.filter_by(username=current_user['username']).first()
-    purchased_credits = PurchasedCredit.query.filter_by(user_id=user.id).all()
+    user = load_current_user()
+    portfolio = cache.cached_json(cache.PORTFOLIO, user.id, 'summary', lambda: get_portfolio(user.id))
     
-    total_invested = 0
-    current_value = 0
-    hydrogen_offset = 0
-    credits_count = len(purchased_credits)
-    
-    for pc in purchased_credits:
-        credit = Credit.query.get(pc.credit_id)
-        if credit:
-            total_invested += float(credit.price)
-            # Mock performance calculation
-            performance = (hash(str(credit.id)) % 100) - 50  # Random performance between -50 and 50
-            current_value += float(credit.price) * (1 + performance / 100)
-            hydrogen_offset += float(credit.amount) * 0.5  # Mock H₂ production impact
+    total_invested = portfolio['total_invested']
+    current_value = portfolio['current_value']
+    hydrogen_offset = portfolio['hydrogen_offset']
+    credits_count = portfolio['credits_count']
     
     profit_loss = current_value - total_invested
     profit_loss_percentage = (profit_loss / total_invested * 100) if total_invested > 0 else 0
@@ -319,21 +501,33 @@ def get_portfolio_analytics():
         "currentValue": round(current_value, 2),
         "profitLoss": round(profit_loss, 2),
         "profitLossPercentage": round(profit_loss_percentage, 2),
-                    "hydrogenOffset": round(hydrogen_offset, 1),
-        "creditsCount": credits_count
+        "hydrogenOffset": round(hydrogen_offset, 1),
+        "creditsCount": credits_count,
+        "expiredCount": portfolio['expired_count']
     })
 
 @buyer_bp.route('/api/buyer/market-trends', methods=['GET'])
 @jwt_required()
 def get_market_trends():
-    # Mock market trends data for Green Hydrogen
-    trends = [
-        {"name": "Electrolysis H₂", "trend": "up", "percentage": 18.5, "volume": "3.2M"},
-        {"name": "Solar H₂", "trend": "up", "percentage": 12.3, "volume": "2.1M"},
-        {"name": "Wind H₂", "trend": "down", "percentage": -2.1, "volume": "1.8M"},
-        {"name": "Biomass H₂", "trend": "up", "percentage": 25.7, "volume": "950K"}
-    ]
-    return jsonify(trends)
+    """24h price change and traded volume per production method, from the 1h candles"""
+    return jsonify(market_data.market_trends())
+
+@buyer_bp.route('/api/buyer/price-history', methods=['GET'])
+@jwt_required()
+def get_price_history():
+    """OHLCV candles for one production method, oldest first"""
+    production_method = (request.args.get('production_method') or '').lower()
+    interval = request.args.get('interval', '1h')
+    if not production_method:
+        return jsonify({"message": "production_method is required"}), 400
+    if interval not in market_data.INTERVALS:
+        return jsonify({"message": f"interval must be one of {', '.join(market_data.INTERVALS)}"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), market_data.RETENTION[interval]))
+    return jsonify({
+        "production_method": production_method,
+        "interval": interval,
+        "candles": market_data.price_history(production_method, interval, limit),
+    })
 
 @buyer_bp.route('/api/buyer/recommendations', methods=['GET'])
 @jwt_required()
@@ -342,7 +536,7 @@ def get_recommendations():
     if not current_user:
         return jsonify({"message": "Invalid token"}), 401
 
-    user = User.query.filter_by(username=current_user['username']).first()
+    user = load_current_user()
     purchased_credits = PurchasedCredit.query.filter_by(user_id=user.id).all()
     purchased_credit_ids = [pc.credit_id for pc in purchased_credits]
     
@@ -354,7 +548,7 @@ def get_recommendations():
     
     recommendations = []
     for credit in available_credits:
-        creator = User.query.get(credit.creator_id)
+        creator = get_user(credit.creator_id)
         recommendations.append({
             "id": credit.id,
             "name": credit.name,
@@ -0,0 +1,151 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models.order_book import OrderFill
+from app.utilis import cache
+from app.utilis.current_user import load_current_user
+from app.utilis.order_book import (
+    BUY, SELL, LIMIT, MARKET, CANCELLED, credit_for_class, escrow_units, get_engine, record_fills,
+    release_units,
+)
+from config import Config
+
+market_bp = Blueprint('market', __name__)
+
+
+@market_bp.route('/api/market/orders', methods=['POST'])
+@jwt_required()
+def submit_order():
+    """Place a limit or market order on a credit class's book"""
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    data = request.json or {}
+    credit_class = data.get('credit_class')
+    side = data.get('side')
+    order_type = data.get('order_type', LIMIT)
+    quantity = data.get('quantity')
+    price = data.get('price')
+
+    if isinstance(credit_class, int) and not isinstance(credit_class, bool):
+        credit_class = str(credit_class)
+    if not credit_class or not isinstance(credit_class, str) or len(credit_class) > 50:
+        return jsonify({"message": "Missing or invalid credit_class"}), 400
+    if side not in (BUY, SELL):
+        return jsonify({"message": "side must be 'buy' or 'sell'"}), 400
+    if order_type not in (LIMIT, MARKET):
+        return jsonify({"message": "order_type must be 'limit' or 'market'"}), 400
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        return jsonify({"message": "quantity must be a positive integer"}), 400
+    if order_type == LIMIT:
+        if not isinstance(price, (int, float)) or isinstance(price, bool) or price <= 0:
+            return jsonify({"message": "Limit orders need a positive price"}), 400
+    else:
+        price = None
+
+    # A class is a credit's id; only live credits trade
+    credit = credit_for_class(credit_class)
+    if credit is None:
+        return jsonify({"message": "Credit not found or expired"}), 404
+    credit_class = str(credit.id)
+
+    engine = get_engine()
+    with engine.exclusive():
+        if side == SELL and credit.is_active:
+            db.session.rollback()
+            return jsonify({"message": "Credit is listed at a fixed price; remove it from sale first"}), 409
+        if side == SELL and not escrow_units(engine, credit, user.id, quantity):
+            db.session.rollback()
+            return jsonify({"message": "Not enough units of this credit to sell"}), 409
+        try:
+            order, fills = engine.submit(credit_class, side, quantity, price, order_type, owner_id=user.id)
+        except Exception:
+            db.session.rollback()
+            raise
+        if side == SELL and order.status == CANCELLED:
+            release_units(credit, user.id, order.remaining)  # unfilled market remainder
+        # Escrow, fills and their settlement commit together
+        record_fills(fills)
+        if engine.wal is not None and engine.wal.records >= Config.ORDER_SNAPSHOT_EVERY:
+            engine.snapshot(db.session)
+
+    if side == SELL:
+        cache.on_credit_listed(credit, user.id)
+    for buyer_id, seller_id in {(f.buyer_id, f.seller_id) for f in fills}:
+        cache.on_credit_purchased(credit, buyer_id, seller_id)
+
+    return jsonify({
+        "order": order.to_dict(),
+        "fills": [f.to_dict() for f in fills],
+    }), 201
+
+
+@market_bp.route('/api/market/orders/<int:order_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_order(order_id):
+    user = load_current_user()
+    engine = get_engine()
+    with engine.exclusive():
+        order = engine.get_order(order_id)
+        if not order or not user or order.owner_id != user.id:
+            return jsonify({"message": "Order not found or no longer open"}), 404
+        order = engine.cancel(order_id)
+        if order is None:
+            return jsonify({"message": "Order not found or no longer open"}), 404
+        # Units escrowed on a credit that has since expired still go back
+        credit = credit_for_class(order.credit_class, include_expired=True) if order.side == SELL else None
+        if credit is not None:
+            release_units(credit, user.id, order.remaining)
+            db.session.commit()
+    if credit is not None:
+        cache.on_credit_listed(credit, user.id)
+    return jsonify({"order": order.to_dict()}), 200
+
+
+@market_bp.route('/api/market/orders/<int:order_id>', methods=['GET'])
+@jwt_required()
+def get_order(order_id):
+    user = load_current_user()
+    engine = get_engine()
+    with engine.exclusive():
+        order = engine.get_order(order_id)
+    if not order or not user or order.owner_id != user.id:
+        return jsonify({"message": "Order not found or no longer open"}), 404
+    return jsonify({"order": order.to_dict()}), 200
+
+
+@market_bp.route('/api/market/book/<credit_class>', methods=['GET'])
+@jwt_required()
+def get_book(credit_class):
+    """Aggregated depth of a credit class's book"""
+    levels = max(1, min(request.args.get('depth', 10, type=int), 100))
+    engine = get_engine()
+    with engine.exclusive(), engine.lock:
+        book = engine.books.get(credit_class)
+        depth = book.depth(levels) if book else {"bids": [], "asks": []}
+    return jsonify({"credit_class": credit_class, **depth}), 200
+
+
+@market_bp.route('/api/market/fills', methods=['GET'])
+@jwt_required()
+def get_my_fills():
+    """Latest fills where the current user was buyer or seller"""
+    user = load_current_user()
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+    fills = (
+        OrderFill.query
+        .filter((OrderFill.buyer_id == user.id) | (OrderFill.seller_id == user.id))
+        .order_by(OrderFill.id.desc())
+        .limit(100)
+        .all()
+    )
+    return jsonify([{
+        "id": f.id,
+        "credit_class": f.credit_class,
+        "price": f.price,
+        "quantity": f.quantity,
+        "side": "buy" if f.buyer_id == user.id else "sell",
+        "created_at": f.created_at.isoformat() if f.created_at else None,
+    } for f in fills]), 200
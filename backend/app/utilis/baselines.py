@@ -0,0 +1,158 @@
+"""
+Per-producer efficiency baselines for historical consistency scoring.
+
+production_baselines keeps one row per (producer, production method) with
+the count, mean, Welford M2 and an EWMA of efficiency (kWh per kg H₂) over
+that producer's approved verification requests. A request turning
+'approved' folds its efficiency into the row inside the same DB transaction
+(an upsert issued from the session's after_flush hook), so the model reads
+a producer's history with a single primary-key lookup instead of the
+client sending it along.
+"""
+import math
+from datetime import datetime
+
+from sqlalchemy import event, inspect, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.verification import ProductionBaseline, VerificationRequest
+from config import Config
+
+
+def efficiency(energy_mwh, h2_kg):
+    """kWh per kg, or None when the request lacks the figures"""
+    if energy_mwh is None or not h2_kg or h2_kg <= 0:
+        return None
+    return energy_mwh * 1000 / h2_kg
+
+
+def as_baseline(row):
+    """The dict the model scores against, or None without history"""
+    if row is None or not row.count:
+        return None
+    variance = row.m2 / (row.count - 1) if row.count > 1 else 0.0
+    return {
+        "count": row.count,
+        "mean": row.mean,
+        "std": math.sqrt(max(variance, 0.0)),
+        "ewma": row.ewma,
+    }
+
+
+# Write path
+
+def _upsert_baseline(connection, producer_id, method, value, now):
+    table = ProductionBaseline.__table__
+    alpha = Config.BASELINE_EWMA_ALPHA
+    values = {
+        "producer_id": producer_id, "production_method": method,
+        "count": 1, "mean": value, "m2": 0.0, "ewma": value, "updated_at": now,
+    }
+    # SET expressions see the row as it was, so this is one Welford/EWMA step
+    delta = value - table.c.mean
+    new_mean = table.c.mean + delta / (table.c.count + 1)
+    step = {
+        "count": table.c.count + 1,
+        "mean": new_mean,
+        "m2": table.c.m2 + delta * (value - new_mean),
+        "ewma": table.c.ewma + alpha * (value - table.c.ewma),
+        "updated_at": now,
+    }
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        connection.execute(insert(table).values(**values).on_conflict_do_update(
+            index_elements=[table.c.producer_id, table.c.production_method],
+            set_=step,
+        ))
+        return
+    result = connection.execute(
+        update(table)
+        .where(table.c.producer_id == producer_id, table.c.production_method == method)
+        .values(**step)
+    )
+    if not result.rowcount:
+        connection.execute(table.insert().values(**values))
+
+
+def _newly_approved(session):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, VerificationRequest) and 'approved' in inspect(obj).attrs.status.history.added:
+            yield obj
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_approvals(session, flush_context):
+    connection = None
+    now = datetime.utcnow()
+    for v in _newly_approved(session):
+        value = efficiency(v.energy_source_mwh, v.hydrogen_amount)
+        if value is None:
+            continue
+        connection = connection or session.connection()
+        _upsert_baseline(connection, v.industry_id, v.production_method, value, now)
+
+
+# Read path
+
+def baseline_for(producer_id, method):
+    """Baseline of one producer and method"""
+    if producer_id is None:
+        return None
+    return as_baseline(db.session.get(ProductionBaseline, (producer_id, method)))
+
+
+def baselines_for(keys):
+    """{(producer_id, method): baseline} for many pairs in one query"""
+    keys = {key for key in keys if key[0] is not None}
+    if not keys:
+        return {}
+    rows = ProductionBaseline.query.filter(
+        tuple_(ProductionBaseline.producer_id, ProductionBaseline.production_method).in_(keys)
+    ).all()
+    return {(r.producer_id, r.production_method): as_baseline(r) for r in rows}
+
+
+def rebuild_baselines():
+    """Recompute production_baselines from every approved request, oldest first"""
+    query = (
+        db.session.query(VerificationRequest.industry_id, VerificationRequest.production_method,
+                         VerificationRequest.energy_source_mwh, VerificationRequest.hydrogen_amount)
+        .filter(VerificationRequest.status == 'approved')
+        .order_by(VerificationRequest.created_at, VerificationRequest.id)
+        .yield_per(5000)
+    )
+    alpha = Config.BASELINE_EWMA_ALPHA
+    stats = {}  # (producer_id, method) -> [count, mean, m2, ewma]
+    for producer_id, method, energy_mwh, h2_kg in query:
+        value = efficiency(energy_mwh, h2_kg)
+        if value is None:
+            continue
+        entry = stats.get((producer_id, method))
+        if entry is None:
+            stats[(producer_id, method)] = [1, value, 0.0, value]
+            continue
+        entry[0] += 1
+        delta = value - entry[1]
+        entry[1] += delta / entry[0]
+        entry[2] += delta * (value - entry[1])
+        entry[3] += alpha * (value - entry[3])
+    now = datetime.utcnow()
+    db.session.query(ProductionBaseline).delete()
+    db.session.bulk_insert_mappings(ProductionBaseline, [
+        {"producer_id": p, "production_method": m, "count": s[0], "mean": s[1], "m2": s[2],
+         "ewma": s[3], "updated_at": now}
+        for (p, m), s in stats.items()
+    ])
+    db.session.commit()
+    return len(stats)
+
+
+def init_baselines(app):
+    """Backfill the baseline table once if it is empty but approved requests exist"""
+    if db.session.query(ProductionBaseline.producer_id).first() is None and \
+            db.session.query(VerificationRequest.id).filter(VerificationRequest.status == 'approved').first() is not None:
+        print(f"Built {rebuild_baselines()} production baselines from approved verifications")
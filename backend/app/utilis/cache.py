@@ -0,0 +1,291 @@
+"""
+Application cache with namespaced, versioned keys.
+
+Entries live under h2:<namespace>:<scope>:<version>:<key>. Invalidating a
+(namespace, scope) pair swaps its version token, which orphans every entry
+cached under the old one (e.g. all pages of the marketplace listing) in a
+single write; orphaned entries age out through their TTL.
+
+Callers resolve an entry's key once with make_key() and read and write
+through that key, so a value loaded before an invalidation is stored under
+the old version and never served after it.
+
+Redis is used when reachable. Otherwise an in-process LRU with the same
+interface takes over; it cannot see other workers' invalidations, so it is
+only used when the app runs as a single process (WEB_CONCURRENCY=1), and
+with more workers the cache is disabled instead. Any client with the
+redis-py get/set/delete API (fakeredis included) can be passed to
+init_cache.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import Config
+from .redis import init_redis, get_redis
+
+# Cached entity namespaces
+CREDIT = 'credit'
+MARKETPLACE = 'marketplace'
+PORTFOLIO = 'portfolio'
+PURCHASED = 'purchased'
+NGO_CREDITS = 'ngo_credits'
+NGO_TRANSACTIONS = 'ngo_transactions'
+
+KEY_PREFIX = 'h2'
+
+_backend = None
+
+
+class LRUCache:
+    """Thread-safe in-process stand-in for the subset of Redis the cache uses (single process only)"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        ttl = px / 1000.0 if px is not None else ex
+        with self._lock:
+            if nx and self._live(key):
+                return None
+            self._data[key] = (str(value), time.monotonic() + ttl if ttl is not None else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def ping(self):
+        return True
+
+
+def init_cache(app, client=None):
+    """Pick the cache backend: an injected client, Redis if reachable, else the LRU"""
+    global _backend
+    if client is None:
+        init_redis(app)
+        client = get_redis()
+    if client is None:
+        if Config.WEB_WORKERS > 1:
+            # Other workers would keep serving entries this one invalidated
+            print(f"Caching disabled: Redis is unreachable and the in-process LRU "
+                  f"cannot be shared by {Config.WEB_WORKERS} workers")
+            _backend = None
+            return None
+        print("Using in-process LRU cache")
+        client = LRUCache(Config.CACHE_LRU_MAX_ENTRIES)
+    _backend = client
+    app.extensions['h2_cache'] = client
+    return client
+
+
+def get_cache():
+    return _backend
+
+
+def _version_key(namespace, scope):
+    return f"{KEY_PREFIX}:{namespace}:{scope}:version"
+
+
+def _version(namespace, scope):
+    vkey = _version_key(namespace, scope)
+    version = _backend.get(vkey)
+    if version is None:
+        # Random tokens never collide with entries cached under an evicted version
+        _backend.set(vkey, uuid.uuid4().hex[:12], nx=True)
+        version = _backend.get(vkey)
+    return version
+
+
+def make_key(namespace, scope, key=''):
+    """
+    Versioned cache key for an entry in (namespace, scope), or None without
+    a cache. Resolve it before loading the value and pass it to get_json and
+    set_json.
+    """
+    if _backend is None:
+        return None
+    try:
+        return f"{KEY_PREFIX}:{namespace}:{scope}:{_version(namespace, scope)}:{key}"
+    except Exception as e:
+        print(f"cache get error: {e}")
+        return None
+
+
+def get_json(entry_key):
+    """Cached JSON value under a make_key() key, or None on a miss or cache failure"""
+    if entry_key is None:
+        return None
+    try:
+        cached = _backend.get(entry_key)
+        return json.loads(cached) if cached is not None else None
+    except Exception as e:
+        print(f"cache get error: {e}")
+        return None
+
+
+def set_json(entry_key, value, ttl=None):
+    """Store value under a make_key() key resolved before the value was loaded"""
+    if entry_key is None:
+        return
+    try:
+        _backend.set(entry_key, json.dumps(value), ex=ttl or Config.CACHE_DEFAULT_TTL)
+    except Exception as e:
+        print(f"cache set error: {e}")
+
+
+def cached_json(namespace, scope, key, loader, ttl=None):
+    """Read-through helper: return the cached value or store loader()'s result"""
+    entry_key = make_key(namespace, scope, key)
+    value = get_json(entry_key)
+    if value is None:
+        value = loader()
+        set_json(entry_key, value, ttl)
+    return value
+
+
+def _acquire_lock(lock_key):
+    token = uuid.uuid4().hex
+    try:
+        if _backend.set(lock_key, token, px=int(Config.CACHE_LOCK_TTL * 1000), nx=True):
+            return token
+    except Exception as e:
+        print(f"cache lock error: {e}")
+    return None
+
+
+def _release_lock(lock_key, token):
+    try:
+        if _backend.get(lock_key) == token:
+            _backend.delete(lock_key)
+    except Exception as e:
+        print(f"cache unlock error: {e}")
+
+
+def _get_envelope(key):
+    try:
+        cached = _backend.get(key)
+        return json.loads(cached) if cached is not None else None
+    except Exception as e:
+        print(f"cache get error: {e}")
+        return None
+
+
+def single_flight_json(namespace, scope, key, loader, soft_ttl=None, stale_ttl=None):
+    """
+    Read-through with stampede protection and stale-while-revalidate.
+
+    Entries are fresh for soft_ttl seconds. Once stale, or after the scope
+    is invalidated, one caller wins a short lock and rebuilds the value
+    while everyone else is served the last good copy (kept for stale_ttl
+    under a version-independent key). With nothing stale to serve, callers
+    wait for the winner's result before falling back to loader().
+    """
+    if _backend is None:
+        return loader()
+    soft_ttl = soft_ttl or Config.CACHE_DEFAULT_TTL
+    stale_ttl = max(stale_ttl or Config.CACHE_STALE_TTL, soft_ttl)
+    current_key = make_key(namespace, scope, key)
+    if current_key is None:
+        return loader()
+    stale_key = f"{KEY_PREFIX}:{namespace}:{scope}:stale:{key}"
+    lock_key = f"{current_key}:lock"
+
+    envelope = _get_envelope(current_key)
+    if envelope and envelope['fresh_until'] > time.time():
+        return envelope['value']
+
+    token = _acquire_lock(lock_key)
+    if token:
+        try:
+            # Another caller may have finished a rebuild since our first read
+            envelope = _get_envelope(current_key)
+            if envelope and envelope['fresh_until'] > time.time():
+                return envelope['value']
+            value = loader()
+            payload = json.dumps({"value": value, "fresh_until": time.time() + soft_ttl})
+            try:
+                _backend.set(current_key, payload, ex=stale_ttl)
+                _backend.set(stale_key, payload, ex=stale_ttl)
+            except Exception as e:
+                print(f"cache set error: {e}")
+            return value
+        finally:
+            _release_lock(lock_key, token)
+
+    stale = envelope or _get_envelope(stale_key)
+    if stale:
+        return stale['value']
+
+    # Cold cache: coalesce onto the rebuild already in flight
+    deadline = time.monotonic() + Config.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.02)
+        envelope = _get_envelope(current_key)
+        if envelope:
+            return envelope['value']
+    return loader()
+
+
+def invalidate(namespace, scope='all'):
+    """Drop every entry cached in (namespace, scope)"""
+    if _backend is None:
+        return
+    try:
+        _backend.set(_version_key(namespace, scope), uuid.uuid4().hex[:12])
+    except Exception as e:
+        print(f"cache invalidate error: {e}")
+
+
+# Invalidation hooks, fired by routes after their changes are committed
+
+def on_credit_created(credit):
+    invalidate(NGO_CREDITS, credit.creator_id)
+    invalidate(MARKETPLACE)
+
+
+def on_credit_purchased(credit, buyer_id, previous_owner_id=None):
+    invalidate(CREDIT, credit.id)
+    invalidate(MARKETPLACE)
+    invalidate(NGO_CREDITS, credit.creator_id)
+    invalidate(NGO_TRANSACTIONS, credit.creator_id)
+    for user_id in {buyer_id, previous_owner_id} - {None}:
+        invalidate(PURCHASED, user_id)
+        invalidate(PORTFOLIO, user_id)
+
+
+def on_credit_listed(credit, holder_id=None):
+    """Credit put on or taken off sale"""
+    invalidate(CREDIT, credit.id)
+    invalidate(MARKETPLACE)
+    invalidate(NGO_CREDITS, credit.creator_id)
+    if holder_id is not None:
+        invalidate(PURCHASED, holder_id)
+        invalidate(PORTFOLIO, holder_id)
+
+
+def on_credit_expired(credit, holder_id=None):
+    on_credit_listed(credit, holder_id)
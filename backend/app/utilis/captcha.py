@@ -0,0 +1,141 @@
+"""
+CAPTCHA verification for signup.
+
+The Turnstile backend posts to CAPTCHA_VERIFY_URL through one shared,
+keep-alive requests.Session with connect/read timeouts. A circuit breaker
+stops calling the upstream after CAPTCHA_BREAKER_THRESHOLD consecutive
+failures and lets a single trial request through once
+CAPTCHA_BREAKER_RESET seconds have passed, so a degraded upstream costs
+signup at most one timeout instead of pinning every worker.
+
+CAPTCHA_BACKEND picks the verifier: 'turnstile' (default) or 'disabled'
+(accept every token, for local development). Point CAPTCHA_VERIFY_URL at
+a local stub server to exercise the Turnstile path offline.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+
+class CaptchaUnavailable(Exception):
+    """The verifier could not give an answer (upstream down, slow or circuit open)"""
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+class TurnstileVerifier:
+    def __init__(self, url, secret, connect_timeout, read_timeout, pool_size, breaker):
+        self.url = url
+        self.secret = secret
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def verify(self, token, remote_ip=None):
+        if not self.breaker.allow():
+            raise CaptchaUnavailable("CAPTCHA verifier circuit open")
+        payload = {'secret': self.secret, 'response': token}
+        if remote_ip:
+            payload['remoteip'] = remote_ip
+        try:
+            response = self.session.post(self.url, data=payload, timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            self.breaker.record_failure()
+            print(f"CAPTCHA verification failed upstream: {e}")
+            raise CaptchaUnavailable(str(e))
+        self.breaker.record_success()
+        return bool(result.get('success'))
+
+
+class DisabledVerifier:
+    def verify(self, token, remote_ip=None):
+        return True
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def build_verifier(backend=None):
+    backend = backend or Config.CAPTCHA_BACKEND
+    if backend == 'disabled':
+        return DisabledVerifier()
+    if backend == 'turnstile':
+        return TurnstileVerifier(
+            Config.CAPTCHA_VERIFY_URL,
+            Config.CAPTCHA_SECRET_KEY,
+            Config.CAPTCHA_CONNECT_TIMEOUT,
+            Config.CAPTCHA_READ_TIMEOUT,
+            Config.CAPTCHA_POOL_SIZE,
+            CircuitBreaker(Config.CAPTCHA_BREAKER_THRESHOLD, Config.CAPTCHA_BREAKER_RESET),
+        )
+    raise ValueError(f"Unknown CAPTCHA backend: {backend}")
+
+
+def get_verifier():
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = build_verifier()
+        return _verifier
+
+
+def set_verifier(verifier):
+    """Swap the process-wide verifier (tests, stub servers)"""
+    global _verifier
+    with _verifier_lock:
+        _verifier = verifier
+
+
+def verify_captcha(token, remote_ip=None):
+    """True/False from the verifier; raises CaptchaUnavailable if it cannot answer"""
+    return get_verifier().verify(token, remote_ip)
@@ -0,0 +1,96 @@
+"""
+PDF certificates, rendered off the request path and cached on disk.
+
+WeasyPrint needs a few hundred milliseconds of CPU per page, so request
+threads never call it. request_pdf() looks the document up in the disk
+cache (CERT_PDF_CACHE_DIR/<sha256[:2]>/<sha256>.pdf, keyed by the full HTML
+document) and otherwise queues it on render_pool.pdf_pool, at most
+CERT_PDF_MAX_PENDING at a time. Routes answer 202 with a poll URL until
+the file is there. Files are written to a temporary name and renamed, so
+readers never see a partial PDF.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+from app.utilis.render_pool import pdf_pool
+from config import Config
+
+try:
+    from weasyprint import HTML
+    WEASYPRINT_AVAILABLE = Config.CERT_PDF_ENABLED
+except Exception:  # not installed, or its GTK/Pango libraries are missing
+    HTML = None
+    WEASYPRINT_AVAILABLE = False
+
+READY = 'ready'
+PENDING = 'pending'
+FAILED = 'failed'
+BUSY = 'busy'
+
+_pending = {}  # content hash -> Future
+_failed = {}  # content hash -> error message, reported once then retried
+_lock = threading.Lock()
+
+
+def content_hash(document):
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(Config.CERT_PDF_CACHE_DIR, key[:2], f"{key}.pdf")
+
+
+def _render(document, path):
+    # Runs on a pdf_pool worker
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            HTML(string=document).write_pdf(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def _finished(key, future):
+    with _lock:
+        _pending.pop(key, None)
+        error = future.exception()
+        if error is not None:
+            _failed[key] = str(error) or type(error).__name__
+            print(f"certificate PDF render failed for {key}: {_failed[key]}")
+
+
+def request_pdf(document):
+    """(status, key): READY once the PDF for `document` is on disk, else PENDING/FAILED/BUSY"""
+    key = content_hash(document)
+    if os.path.exists(cache_path(key)):
+        return READY, key
+    with _lock:
+        if key in _pending:
+            return PENDING, key
+        if _failed.pop(key, None) is not None:
+            return FAILED, key
+        if len(_pending) >= Config.CERT_PDF_MAX_PENDING:
+            return BUSY, key
+        future = pdf_pool.submit(_render, document, cache_path(key))
+        _pending[key] = future
+    future.add_done_callback(lambda f: _finished(key, f))
+    return PENDING, key
+
+
+def read_pdf(key):
+    with open(cache_path(key), 'rb') as f:
+        return f.read()
+
+
+def init_pdf_renderer(app):
+    """Start the PDF workers when WeasyPrint can actually render"""
+    if WEASYPRINT_AVAILABLE:
+        pdf_pool.start()
+    else:
+        print("WeasyPrint not available; certificates download as HTML")
@@ -0,0 +1,107 @@
+"""
+The certificate template, compiled once at import.
+
+All styling lives in CERTIFICATE_CSS, which is served on its own from
+/api/certificates/certificate.css under a content-hashed URL and cached by
+clients, so a certificate carries only its markup and fields. The template
+is split into literal text and field slots up front, so rendering is a
+single %-format of the field values (HTML-escaped when they need it).
+"""
+import hashlib
+import html
+import operator
+import re
+
+CERTIFICATE_CSS = """\
+.h2-cert{border:4px double #2c3e50;border-radius:15px;padding:30px;max-width:700px;margin:0 auto;\
+font-family:'Arial',sans-serif;background:linear-gradient(to bottom right,#f0f0f0,#ffffff);\
+box-shadow:0 4px 6px rgba(0,0,0,0.1);position:relative;overflow:hidden}
+.h2-cert-band{position:absolute;left:0;right:0;height:15px}
+.h2-cert-band.top{top:0;background:linear-gradient(to right,#2ecc71,#3498db)}
+.h2-cert-band.bottom{bottom:0;background:linear-gradient(to right,#3498db,#2ecc71)}
+.h2-cert h1{font-family:'Georgia',serif;text-align:center;color:#2c3e50;margin-bottom:20px;font-size:2.5em;\
+text-shadow:2px 2px 4px rgba(0,0,0,0.1)}
+.h2-cert-body{text-align:center;margin-bottom:20px;color:#34495e}
+.h2-cert-body p{font-size:1em;margin-bottom:10px}
+.h2-cert-body p.last{margin-bottom:20px}
+.h2-cert h2,.h2-cert h3{font-family:'Palatino Linotype',serif;margin-bottom:15px}
+.h2-cert h2{color:#2c3e50;font-size:2em}
+.h2-cert h3{color:#16a085;font-size:1.5em}
+.h2-cert-ids{margin-top:40px;text-align:center;font-family:'Courier New',monospace;color:#7f8c8d}
+.h2-cert-ids p{padding-bottom:15px;display:inline-block;width:90%}
+.h2-cert-ids p.hash{border-top:1px solid #bdc3c7;padding:15px 0 0;margin-bottom:15px;word-break:break-all;\
+width:auto;max-width:90%}
+.h2-cert-ids p.credit{border-bottom:1px solid #bdc3c7}
+"""
+
+CSS_VERSION = hashlib.sha256(CERTIFICATE_CSS.encode()).hexdigest()[:16]
+STYLESHEET_PATH = f"/api/certificates/certificate.css?v={CSS_VERSION}"
+
+CERTIFICATE_TEMPLATE = (
+    '<div class="h2-cert">'
+    '<div class="h2-cert-band top"></div><div class="h2-cert-band bottom"></div>'
+    '<h1>Hydrogen Credit Certificate</h1>'
+    '<div class="h2-cert-body">'
+    '<p>This certifies that</p><h2>{{ buyer_name }}</h2>'
+    '<p>has purchased</p><h3>{{ credit_name }}</h3>'
+    '<p>on {{ purchase_date }}</p>'
+    '<p class="last">and has helped produce <strong>{{ hydrogen_kg }} kg</strong> of hydrogen'
+    ' with <strong>ETH {{ price }}</strong></p>'
+    '</div>'
+    '<div class="h2-cert-ids">'
+    '<p class="hash">Transaction Hash: {{ transaction_hash }}</p>'
+    '<p>Certificate ID: {{ certificate_ref }}</p>'
+    '<p class="credit">Credit ID: CC-{{ credit_id }}</p>'
+    '</div>'
+    '</div>'
+)
+
+
+class CompiledTemplate:
+    """A template with {{ name }} slots, pre-split into a %-format string and slot order"""
+
+    _SLOT = re.compile(r'{{\s*(\w+)\s*}}')
+
+    def __init__(self, source):
+        parts = self._SLOT.split(source)
+        self.fields = tuple(parts[1::2])
+        self._format = '%s'.join(literal.replace('%', '%%') for literal in parts[0::2])
+        self._probe = '%s' * len(self.fields)
+        self._getter = operator.itemgetter(*self.fields) if len(self.fields) > 1 else (
+            lambda values: tuple(values[name] for name in self.fields))
+
+    def render(self, values):
+        args = self._getter(values)
+        # One formatted probe of all values tells whether anything needs escaping
+        probe = self._probe % args
+        if '&' in probe or '<' in probe or '>' in probe:
+            args = tuple([html.escape(str(arg), quote=False) for arg in args])
+        return self._format % args
+
+
+certificate_template = CompiledTemplate(CERTIFICATE_TEMPLATE)
+# Stored renders made from another template or stylesheet are re-rendered
+TEMPLATE_VERSION = hashlib.sha256((CERTIFICATE_TEMPLATE + CERTIFICATE_CSS).encode()).hexdigest()[:16]
+
+
+MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December')
+
+
+def long_date(value):
+    """'June 01, 2025'; what strftime('%B %d, %Y') gives in the C locale, without its cost"""
+    return f"{MONTHS[value.month - 1]} {value.day:02d}, {value.year}"
+
+
+def render_certificate_html(values):
+    return certificate_template.render(values)
+
+
+def html_document(title, body, stylesheet_href=None):
+    """Standalone page around a certificate; inlines the CSS unless a stylesheet link is given"""
+    if stylesheet_href:
+        head = f'<link rel="stylesheet" href="{stylesheet_href}">'
+    else:
+        head = f'<style>{CERTIFICATE_CSS}</style>'
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'{head}</head><body>{body}</body></html>\n')
@@ -0,0 +1,220 @@
+"""
+Rendered certificates, cached per purchase and addressed by content hash.
+
+A certificate only exists once its credit has expired and never changes
+after that, so it is rendered once (when the credit expires, or on first
+request) and stored in certificate_renders with the SHA-256 of its body and of the
+template version. The hash doubles as the strong ETag, so a client holding
+the current copy is answered with a 304 after a single primary-key lookup.
+Rows rendered from an older template or stylesheet are ignored and
+re-rendered in place on their next request.
+
+zip_stream() bundles all of a buyer's certificates into a streamed ZIP,
+rendering the ones not stored yet on the render pool.
+"""
+import csv
+import hashlib
+import json
+import tempfile
+import time
+import zipfile
+from collections import deque
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.certificate import CertificateRender
+from app.models.credit import Credit
+from app.models.transaction import PurchasedCredit, Transactions
+from app.models.user import User
+from app.utilis import render_pool
+from app.utilis.certificate_template import CERTIFICATE_CSS, TEMPLATE_VERSION, html_document
+from app.utilis.simple_certificate import generate_simple_certificate
+from config import Config
+
+
+def certificate_sources():
+    """(purchase, credit, buyer, latest transaction) in one query; credit/transaction may be None"""
+    latest_transaction = (
+        select(Transactions.id)
+        .where(Transactions.credit_id == PurchasedCredit.credit_id)
+        .order_by(Transactions.timestamp.desc())
+        .limit(1)
+        .correlate(PurchasedCredit)
+        .scalar_subquery()
+    )
+    return (
+        db.session.query(PurchasedCredit, Credit, User, Transactions)
+        .join(User, User.id == PurchasedCredit.user_id)
+        .outerjoin(Credit, Credit.id == PurchasedCredit.credit_id)
+        .outerjoin(Transactions, Transactions.id == latest_transaction)
+    )
+
+
+def certificate_fields(purchased_credit, credit, user, transaction):
+    """Plain values a certificate is rendered from; picklable for the render pool"""
+    return {
+        "purchase_id": purchased_credit.id,
+        "user": {"id": user.id, "username": user.username},
+        "purchased_credit": {"amount": purchased_credit.amount, "purchase_date": purchased_credit.purchase_date},
+        "credit": {"id": credit.id, "name": credit.name, "amount": credit.amount, "price": credit.price},
+        "transaction": {"txn_hash": transaction.txn_hash},
+    }
+
+
+def render_fields(fields):
+    """(content hash, JSON body) of a certificate"""
+    data = generate_simple_certificate(
+        fields["purchase_id"],
+        SimpleNamespace(**fields["user"]),
+        SimpleNamespace(**fields["purchased_credit"]),
+        SimpleNamespace(**fields["credit"]),
+        SimpleNamespace(**fields["transaction"]),
+    )
+    body = json.dumps(data, sort_keys=True)
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\n{body}".encode()).hexdigest(), body
+
+
+def render(purchased_credit, credit, user, transaction):
+    return render_fields(certificate_fields(purchased_credit, credit, user, transaction))
+
+
+def _render_chunk(chunk):
+    # Runs on a render pool worker
+    return [(fields["purchase_id"], fields["credit"]["id"], *render_fields(fields)) for fields in chunk]
+
+
+def store(purchased_credit, credit, user, transaction):
+    """Render and persist a certificate, replacing an outdated render; returns the stored CertificateRender"""
+    content_hash, body = render(purchased_credit, credit, user, transaction)
+    row = db.session.get(CertificateRender, purchased_credit.id)
+    if row is None:
+        row = CertificateRender(purchase_id=purchased_credit.id)
+        db.session.add(row)
+    row.content_hash, row.body, row.template_version = content_hash, body, TEMPLATE_VERSION
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Rendered concurrently by another request; the content is the same
+        db.session.rollback()
+        row = db.session.get(CertificateRender, purchased_credit.id)
+    return row
+
+
+def cached_render(user_id, credit_id):
+    return (
+        db.session.query(CertificateRender)
+        .join(PurchasedCredit, PurchasedCredit.id == CertificateRender.purchase_id)
+        .filter(PurchasedCredit.credit_id == credit_id, PurchasedCredit.user_id == user_id,
+                CertificateRender.template_version == TEMPLATE_VERSION)
+        .first()
+    )
+
+
+def precompute(purchase_id):
+    """Render the certificate of a just-expired purchase ahead of the first download"""
+    stored = db.session.get(CertificateRender, purchase_id)
+    if stored is not None and stored.template_version == TEMPLATE_VERSION:
+        return
+    row = certificate_sources().filter(PurchasedCredit.id == purchase_id).first()
+    if row is None:
+        return
+    purchased_credit, credit, user, transaction = row
+    if credit is None or transaction is None or not credit.is_expired:
+        return
+    store(purchased_credit, credit, user, transaction)
+
+
+MANIFEST_COLUMNS = ['certificate_id', 'purchase_id', 'credit_id', 'transaction_hash', 'sha256', 'filename']
+
+
+def expired_purchases(user_id):
+    """Every expired purchase of a buyer with its stored render (or None), in one query"""
+    return (
+        certificate_sources()
+        .add_entity(CertificateRender)
+        .outerjoin(CertificateRender, (CertificateRender.purchase_id == PurchasedCredit.id) &
+                   (CertificateRender.template_version == TEMPLATE_VERSION))
+        .filter(PurchasedCredit.user_id == user_id, Credit.is_expired == True, Transactions.id.isnot(None))
+        .order_by(PurchasedCredit.id)
+        .yield_per(Config.CERT_RENDER_CHUNK * 4)
+    )
+
+
+def iter_certificates(rows):
+    """
+    (purchase id, credit id, content hash, body) per row of
+    expired_purchases(). Stored renders pass straight through; the rest are
+    rendered on the render pool CERT_RENDER_CHUNK at a time with at most two
+    chunks per worker in flight, so output order differs from input order.
+    """
+    window = Config.CERT_RENDER_WORKERS * 2
+    pending = deque()
+    chunk = []
+    for purchased_credit, credit, user, transaction, rendered in rows:
+        if rendered is not None:
+            yield purchased_credit.id, credit.id, rendered.content_hash, rendered.body
+            continue
+        chunk.append(certificate_fields(purchased_credit, credit, user, transaction))
+        if len(chunk) == Config.CERT_RENDER_CHUNK:
+            pending.append(render_pool.certificate_pool.submit(_render_chunk, chunk))
+            chunk = []
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+    if chunk:
+        pending.append(render_pool.certificate_pool.submit(_render_chunk, chunk))
+    while pending:
+        yield from pending.popleft().result()
+
+
+class _ZipSink:
+    """Write-only file object that hands the archive bytes out as they are produced"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def zip_stream(rows):
+    """
+    ZIP archive of the certificates in `rows`, yielded piece by piece: one
+    HTML file per certificate linking one shared certificate.css, plus
+    manifest.csv. Certificate bodies are
+    released as soon as they are written and the manifest is spooled to a
+    temporary file past 1 MB; what remains per entry is its central
+    directory record (about 0.5 KB), which ZIP writes at the very end.
+    """
+    sink = _ZipSink()
+    stamp = time.localtime()[:6]
+    with tempfile.SpooledTemporaryFile(max_size=1 << 20, mode='w+', newline='') as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(MANIFEST_COLUMNS)
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('certificate.css', CERTIFICATE_CSS)
+            for purchase_id, credit_id, content_hash, body in iter_certificates(rows):
+                data = json.loads(body)
+                filename = f"{data['certificate_id']}.html"
+                info = zipfile.ZipInfo(filename, date_time=stamp)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, html_document(data['certificate_id'], data['certificate_html'], 'certificate.css'))
+                writer.writerow([data['certificate_id'], purchase_id, credit_id, data['transaction_hash'],
+                                 content_hash, filename])
+                yield sink.drain()
+            manifest.seek(0)
+            with archive.open('manifest.csv', 'w') as entry:
+                for block in iter(lambda: manifest.read(1 << 16), ''):
+                    entry.write(block.encode())
+        yield sink.drain()
@@ -0,0 +1,99 @@
+"""
+Current-user resolution for JWT-protected routes.
+
+Access tokens carry the user's id and role as the `uid` and `role` claims.
+load_current_user() resolves the user once per request (cached on flask.g)
+through a short-TTL, process-wide LRU of user rows, so authenticated
+requests normally skip the users lookup entirely. Cached rows are merged
+into the request's session without a SELECT and dropped from the LRU
+whenever a User row is updated or deleted in this process.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app import db
+from app.models.user import User
+from config import Config
+
+_users = OrderedDict()
+_users_lock = threading.Lock()
+
+
+def user_claims(user):
+    """Additional JWT claims identifying a user without a DB lookup"""
+    return {"uid": user.id, "role": user.role}
+
+
+def _cache_get(user_id):
+    with _users_lock:
+        entry = _users.get(user_id)
+        if entry is None:
+            return None
+        expires_at, row = entry
+        if expires_at <= time.monotonic():
+            del _users[user_id]
+            return None
+        _users.move_to_end(user_id)
+        return row
+
+
+def _cache_put(user):
+    # Detached copy, so the cached row never belongs to a request's session
+    row = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(row)
+    with _users_lock:
+        _users[user.id] = (time.monotonic() + Config.USER_CACHE_TTL, row)
+        _users.move_to_end(user.id)
+        while len(_users) > Config.USER_CACHE_MAX_ENTRIES:
+            _users.popitem(last=False)
+
+
+def invalidate_user(user_id):
+    with _users_lock:
+        _users.pop(user_id, None)
+
+
+def get_user(user_id):
+    """User by id, from the process LRU when possible"""
+    if user_id is None:
+        return None
+    cached = _cache_get(user_id)
+    if cached is not None:
+        return db.session.merge(cached, load=False)
+    user = db.session.get(User, user_id)
+    if user is not None:
+        _cache_put(user)
+    return user
+
+
+def load_current_user():
+    """The authenticated User for this request, or None"""
+    if 'current_user' in g:
+        return g.current_user
+    user_id = get_jwt().get('uid')
+    if user_id is not None:
+        user = get_user(user_id)
+    else:
+        # Tokens issued before the uid claim only carry the username
+        try:
+            username = json.loads(get_jwt_identity()).get('username')
+        except (TypeError, json.JSONDecodeError):
+            username = None
+        user = User.query.filter_by(username=username).first() if username else None
+        if user is not None:
+            _cache_put(user)
+    g.current_user = user
+    return user
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _on_user_changed(mapper, connection, target):
+    invalidate_user(target.id)
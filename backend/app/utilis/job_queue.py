@@ -0,0 +1,150 @@
+"""
+Background job queue for bulk work submitted over HTTP.
+
+Jobs run on a per-process thread pool, but their progress and results are
+stored in background_jobs and background_job_chunks, so any worker can
+answer a status poll and finished jobs outlive a restart. The items
+themselves are held only by the process running the job: a job whose
+process died stops making progress, and after JOB_QUEUE_STALE_AFTER
+seconds without any it is reported as failed. Finished jobs are deleted
+JOB_QUEUE_RETENTION seconds after they finish.
+"""
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.job import BackgroundJob, BackgroundJobChunk
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+INTERRUPTED = "Job was interrupted before it finished"
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.JOB_QUEUE_WORKERS,
+                thread_name_prefix="job-worker",
+            )
+        return _executor
+
+
+def enqueue_job(app, owner_id, kind, items, handler, chunk_size=None):
+    """
+    Queue `items` for background processing and return the job id right away.
+
+    `handler(chunk)` runs inside an app context on a worker thread and must
+    return one result dict per item, each with a 'status' key.
+    """
+    chunk_size = chunk_size or Config.JOB_QUEUE_CHUNK_SIZE
+    job_id = uuid.uuid4().hex
+    _prune_finished()
+    db.session.add(BackgroundJob(id=job_id, kind=kind, owner_id=owner_id, status="queued", total=len(items),
+                                 processed=0, counts={}, errors=[]))
+    db.session.commit()
+
+    get_executor().submit(_run_job, app, job_id, items, handler, chunk_size)
+    return job_id
+
+
+def get_job(job_id):
+    """Snapshot of a job's progress, or None if unknown or pruned"""
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None:
+        return None
+    chunks = (
+        db.session.query(BackgroundJobChunk.results)
+        .filter(BackgroundJobChunk.job_id == job_id)
+        .order_by(BackgroundJobChunk.start_index)
+    )
+    status, errors = job.status, list(job.errors)
+    stale_before = datetime.utcnow() - timedelta(seconds=Config.JOB_QUEUE_STALE_AFTER)
+    if status in ("queued", "running") and job.updated_at < stale_before:
+        status = "failed"
+        errors.append({"offset": job.processed, "error": INTERRUPTED})
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "owner_id": job.owner_id,
+        "status": status,
+        "total": job.total,
+        "processed": job.processed,
+        "counts": dict(job.counts),
+        "results": [result for (results,) in chunks for result in results],
+        "errors": errors,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def _prune_finished():
+    finished_before = datetime.utcnow() - timedelta(seconds=Config.JOB_QUEUE_RETENTION)
+    expired = db.session.query(BackgroundJob.id).filter(BackgroundJob.finished_at < finished_before)
+    db.session.query(BackgroundJobChunk).filter(BackgroundJobChunk.job_id.in_(expired.scalar_subquery())) \
+        .delete(synchronize_session=False)
+    db.session.query(BackgroundJob).filter(BackgroundJob.finished_at < finished_before) \
+        .delete(synchronize_session=False)
+
+
+def _run_job(app, job_id, items, handler, chunk_size):
+    with app.app_context():
+        try:
+            _update(job_id, status="running")
+            failed_chunks = 0
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start:start + chunk_size]
+                error = None
+                try:
+                    results = handler(chunk)
+                except Exception as e:
+                    print(f"job {job_id} chunk at {start} failed: {e}")
+                    traceback.print_exc()
+                    db.session.rollback()
+                    error = {"offset": start, "error": str(e)}
+                    results = [{"status": "failed", "error": str(e)} for _ in chunk]
+                    failed_chunks += 1
+                _record_chunk(job_id, start, results, error)
+
+            chunks = -(-len(items) // chunk_size)
+            _update(
+                job_id,
+                status="failed" if chunks and failed_chunks == chunks else "completed",
+                finished_at=datetime.utcnow(),
+            )
+        except Exception as e:
+            print(f"job {job_id} failed: {e}")
+            traceback.print_exc()
+            db.session.rollback()
+        finally:
+            db.session.remove()
+
+
+def _record_chunk(job_id, start, results, error):
+    job = db.session.get(BackgroundJob, job_id)
+    counts = dict(job.counts)
+    for offset, result in enumerate(results):
+        result["index"] = start + offset
+        status = result.get("status", "unknown")
+        counts[status] = counts.get(status, 0) + 1
+    db.session.add(BackgroundJobChunk(job_id=job_id, start_index=start, results=results))
+    job.counts = counts
+    if error is not None:
+        job.errors = job.errors + [error]
+    job.processed += len(results)
+    job.updated_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _update(job_id, **fields):
+    job = db.session.get(BackgroundJob, job_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.updated_at = datetime.utcnow()
+    db.session.commit()
@@ -0,0 +1,318 @@
+"""
+OHLCV market data per production method, rolled up from Transactions.
+
+Each Transactions insert updates its 1m, 1h and 1d candles in
+market_candles inside the same DB transaction (an upsert per interval,
+issued from the session's after_flush hook). After commit the same trade
+is folded into the in-memory series, so trends and price history are read
+from memory in O(buckets). Series are reloaded from the table every
+MARKET_DATA_REFRESH seconds to pick up trades committed by other workers.
+
+The table keeps 1m and 1h candles only as far back as the in-memory
+series (RETENTION buckets): the flush that writes a trade's candles also
+deletes that method's older ones, so the table stays as compact as memory.
+Daily candles are kept for the full history.
+
+Prices are per credit unit (total_price / amount); volume is credit units.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, event, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models.market import MarketCandle
+from app.models.transaction import Transactions
+from app.models.verification import VerificationRequest
+from config import Config
+
+INTERVALS = {
+    '1m': timedelta(minutes=1),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+# Buckets kept in memory per series
+RETENTION = {'1m': 24 * 60, '1h': 24 * 90, '1d': 5 * 365}
+# Intervals whose market_candles rows are also pruned to RETENTION
+PRUNED_INTERVALS = ('1m', '1h')
+UNKNOWN_METHOD = 'unknown'
+
+_series = {}  # (production_method, interval) -> (loaded_at, {bucket_start: [o, h, l, c, volume, notional, trades]})
+_methods = {"loaded_at": None, "names": set()}
+_lock = threading.Lock()
+
+
+def bucket_start(ts, interval):
+    if interval == '1m':
+        return ts.replace(second=0, microsecond=0)
+    if interval == '1h':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def unit_price(total_price, amount):
+    return total_price / amount if amount else total_price
+
+
+def retention_start(interval, now):
+    """First bucket of the RETENTION window ending at now's bucket"""
+    return bucket_start(now, interval) - INTERVALS[interval] * (RETENTION[interval] - 1)
+
+
+# Write path
+
+def _upsert_candle(connection, method, interval, bucket, price, amount, notional):
+    table = MarketCandle.__table__
+    values = {
+        "production_method": method, "interval": interval, "bucket_start": bucket,
+        "open": price, "high": price, "low": price, "close": price,
+        "volume": amount, "notional": notional, "trades": 1,
+    }
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        stmt = insert(table).values(**values)
+        new = stmt.excluded
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.production_method, table.c.interval, table.c.bucket_start],
+            set_={
+                "high": case((table.c.high < new.high, new.high), else_=table.c.high),
+                "low": case((table.c.low > new.low, new.low), else_=table.c.low),
+                "close": new.close,
+                "volume": table.c.volume + new.volume,
+                "notional": table.c.notional + new.notional,
+                "trades": table.c.trades + new.trades,
+            },
+        ))
+        return
+    result = connection.execute(
+        update(table)
+        .where(table.c.production_method == method, table.c.interval == interval,
+               table.c.bucket_start == bucket)
+        .values(
+            high=case((table.c.high < price, price), else_=table.c.high),
+            low=case((table.c.low > price, price), else_=table.c.low),
+            close=price,
+            volume=table.c.volume + amount,
+            notional=table.c.notional + notional,
+            trades=table.c.trades + 1,
+        )
+    )
+    if not result.rowcount:
+        connection.execute(table.insert().values(**values))
+
+
+def _prune_candles(connection, method, now):
+    """Delete a method's 1m and 1h candles older than the in-memory window"""
+    table = MarketCandle.__table__
+    for interval in PRUNED_INTERVALS:
+        connection.execute(
+            table.delete().where(table.c.production_method == method, table.c.interval == interval,
+                                 table.c.bucket_start < retention_start(interval, now))
+        )
+
+
+def _production_method(connection, credit_id):
+    method = connection.execute(
+        select(VerificationRequest.production_method)
+        .where(VerificationRequest.credit_id == credit_id)
+        .limit(1)
+    ).scalar()
+    return (method or UNKNOWN_METHOD).lower()
+
+
+@event.listens_for(Session, 'after_flush')
+def _roll_up_new_transactions(session, flush_context):
+    new_transactions = [obj for obj in session.new if isinstance(obj, Transactions)]
+    if not new_transactions:
+        return
+    connection = session.connection()
+    pending = session.info.setdefault('market_trades', [])
+    methods = set()
+    for txn in new_transactions:
+        method = _production_method(connection, txn.credit_id)
+        ts = txn.timestamp or datetime.utcnow()
+        price = unit_price(txn.total_price, txn.amount)
+        for interval in INTERVALS:
+            _upsert_candle(connection, method, interval, bucket_start(ts, interval),
+                           price, txn.amount, txn.total_price)
+        pending.append((method, ts, price, txn.amount, txn.total_price))
+        methods.add(method)
+    now = datetime.utcnow()
+    for method in methods:
+        _prune_candles(connection, method, now)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_trades(session):
+    for trade in session.info.pop('market_trades', None) or ():
+        apply_trade(*trade)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_trades(session):
+    session.info.pop('market_trades', None)
+
+
+def apply_trade(method, ts, price, amount, notional):
+    """Fold a committed trade into the series already held in memory"""
+    with _lock:
+        _methods["names"].add(method)
+        for interval in INTERVALS:
+            entry = _series.get((method, interval))
+            if entry is None:
+                continue  # loaded from the table on first read
+            buckets = entry[1]
+            bucket = bucket_start(ts, interval)
+            candle = buckets.get(bucket)
+            if candle is None:
+                buckets[bucket] = [price, price, price, price, amount, notional, 1]
+                while len(buckets) > RETENTION[interval]:
+                    del buckets[min(buckets)]
+            else:
+                candle[1] = max(candle[1], price)
+                candle[2] = min(candle[2], price)
+                candle[3] = price
+                candle[4] += amount
+                candle[5] += notional
+                candle[6] += 1
+
+
+# Read path
+
+def _fresh(loaded_at):
+    return loaded_at is not None and time.monotonic() - loaded_at < Config.MARKET_DATA_REFRESH
+
+
+def production_methods():
+    with _lock:
+        if _fresh(_methods["loaded_at"]):
+            return sorted(_methods["names"])
+    names = {row[0] for row in db.session.query(MarketCandle.production_method).filter(
+        MarketCandle.interval == '1d').distinct()}
+    with _lock:
+        _methods["names"] = names | _methods["names"]
+        _methods["loaded_at"] = time.monotonic()
+        return sorted(_methods["names"])
+
+
+def get_series(method, interval):
+    """{bucket_start: [open, high, low, close, volume, notional, trades]} for one series"""
+    key = (method, interval)
+    with _lock:
+        entry = _series.get(key)
+        if entry is not None and _fresh(entry[0]):
+            return entry[1]
+    since = retention_start(interval, datetime.utcnow())
+    rows = (
+        db.session.query(MarketCandle)
+        .filter(MarketCandle.production_method == method, MarketCandle.interval == interval,
+                MarketCandle.bucket_start >= since)
+        .order_by(MarketCandle.bucket_start)
+        .all()
+    )
+    buckets = {r.bucket_start: [r.open, r.high, r.low, r.close, r.volume, r.notional, r.trades] for r in rows}
+    with _lock:
+        _series[key] = (time.monotonic(), buckets)
+    return buckets
+
+
+def price_history(method, interval, limit):
+    buckets = get_series(method, interval)
+    with _lock:
+        latest = sorted(buckets)[-limit:]
+        return [
+            {"time": b.isoformat(), "open": c[0], "high": c[1], "low": c[2], "close": c[3],
+             "volume": c[4], "notional": c[5], "trades": c[6]}
+            for b in latest for c in (buckets[b],)
+        ]
+
+
+def _format_volume(volume):
+    if volume >= 1_000_000:
+        return f"{volume / 1_000_000:.1f}M"
+    if volume >= 1_000:
+        return f"{volume / 1_000:.0f}K"
+    return str(volume)
+
+
+def market_trends(window_hours=24):
+    """Price change and volume per production method over the last window_hours"""
+    since = bucket_start(datetime.utcnow(), '1h') - timedelta(hours=window_hours - 1)
+    trends = []
+    for method in production_methods():
+        buckets = get_series(method, '1h')
+        with _lock:
+            recent = [buckets[b] for b in sorted(buckets) if b >= since]
+        if not recent:
+            continue
+        first_open, last_close = recent[0][0], recent[-1][3]
+        change = (last_close - first_open) / first_open * 100 if first_open else 0.0
+        trends.append({
+            "name": f"{method.capitalize()} H₂",
+            "production_method": method,
+            "trend": "up" if change >= 0 else "down",
+            "percentage": round(change, 1),
+            "volume": _format_volume(sum(c[4] for c in recent)),
+            "last_price": last_close,
+        })
+    return trends
+
+
+def rebuild_rollups():
+    """Recompute market_candles from the full transaction history, 1m and 1h within RETENTION"""
+    method = (
+        select(VerificationRequest.production_method)
+        .where(VerificationRequest.credit_id == Transactions.credit_id)
+        .limit(1)
+        .correlate(Transactions)
+        .scalar_subquery()
+    )
+    query = (
+        db.session.query(Transactions.timestamp, Transactions.amount, Transactions.total_price, method)
+        .order_by(Transactions.timestamp, Transactions.id)
+        .yield_per(5000)
+    )
+    now = datetime.utcnow()
+    pruned_before = {interval: retention_start(interval, now) for interval in PRUNED_INTERVALS}
+    candles = {}
+    for ts, amount, total_price, production_method in query:
+        production_method = (production_method or UNKNOWN_METHOD).lower()
+        price = unit_price(total_price, amount)
+        for interval in INTERVALS:
+            bucket = bucket_start(ts, interval)
+            if interval in pruned_before and bucket < pruned_before[interval]:
+                continue
+            key = (production_method, interval, bucket)
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = [price, price, price, price, amount, total_price, 1]
+            else:
+                candle[1] = max(candle[1], price)
+                candle[2] = min(candle[2], price)
+                candle[3] = price
+                candle[4] += amount
+                candle[5] += total_price
+                candle[6] += 1
+    db.session.query(MarketCandle).delete()
+    db.session.bulk_insert_mappings(MarketCandle, [
+        {"production_method": m, "interval": i, "bucket_start": b, "open": c[0], "high": c[1],
+         "low": c[2], "close": c[3], "volume": c[4], "notional": c[5], "trades": c[6]}
+        for (m, i, b), c in candles.items()
+    ])
+    db.session.commit()
+    with _lock:
+        _series.clear()
+        _methods["loaded_at"] = None
+    return len(candles)
+
+
+def init_market_data(app):
+    """Backfill the rollup table once if it is empty but transactions exist"""
+    if db.session.query(MarketCandle.production_method).first() is None and \
+            db.session.query(Transactions.id).first() is not None:
+        print(f"Built {rebuild_rollups()} market candles from transaction history")
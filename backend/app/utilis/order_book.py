@@ -0,0 +1,624 @@
+"""
+In-memory order books for credit sales, one per credit class.
+
+Orders match by price-time priority: the best price first, and the oldest
+order first within a price. Limit orders rest whatever part does not
+fill; market orders take what liquidity there is and the remainder
+expires. Makers set the trade price.
+
+Every accepted submit/cancel is appended to a write-ahead log before it is
+applied, so replaying the log from the last DB snapshot rebuilds the exact
+books (matching is deterministic). snapshot() writes the resting orders
+to order_book_orders together with the last applied sequence number and
+then truncates the log.
+
+Each worker process keeps its own copy of the books, and they share the
+log. Operations run inside MatchingEngine.exclusive(), which takes a lock
+file next to the log and first applies the records other workers have
+appended (or reloads the snapshot one of them wrote). So sequence numbers
+and order ids are issued once, and a snapshot, written under the same lock
+after the fills are recorded, never drops records another worker lacks.
+
+Prices are held as integer ticks of 1/PRICE_SCALE to keep levels exact.
+
+A credit class is a credit's id, and orders trade units of its amount.
+The units of a credit a buyer holds are their purchased_credits rows; the
+creator holds whatever is not in a row or on sale. A sell order escrows
+its units when it is accepted: they leave the seller's holding before the
+order reaches the book and go back if it is cancelled or a market order
+expires. Each fill is settled into purchased_credits and transactions in
+the same DB transaction that stores it in order_fills. Payment is made
+on chain (as for fixed-price purchases), so buy orders hold no funds.
+
+Fixed-price listings and purchases (/api/buyer) move a whole credit, so
+they run under the same exclusive() and only while one user holds every
+unit (whole_holding()); a credit listed at a fixed price takes no sell
+orders. Expiring a credit cancels its resting orders first.
+"""
+import heapq
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PRICE_SCALE = 10_000
+
+BUY = 'buy'
+SELL = 'sell'
+LIMIT = 'limit'
+MARKET = 'market'
+
+OPEN = 'open'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+
+
+def to_ticks(price):
+    return int(round(price * PRICE_SCALE))
+
+
+def from_ticks(ticks):
+    return ticks / PRICE_SCALE
+
+
+class Order:
+    __slots__ = ('id', 'credit_class', 'side', 'order_type', 'price', 'quantity',
+                 'remaining', 'owner_id', 'status')
+
+    def __init__(self, order_id, credit_class, side, order_type, price, quantity, owner_id=None):
+        self.id = order_id
+        self.credit_class = credit_class
+        self.side = side
+        self.order_type = order_type
+        self.price = price  # ticks; None for market orders
+        self.quantity = quantity
+        self.remaining = quantity
+        self.owner_id = owner_id
+        self.status = OPEN
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "credit_class": self.credit_class,
+            "side": self.side,
+            "order_type": self.order_type,
+            "price": from_ticks(self.price) if self.price is not None else None,
+            "quantity": self.quantity,
+            "remaining": self.remaining,
+            "filled": self.quantity - self.remaining,
+            "owner_id": self.owner_id,
+            "status": self.status,
+        }
+
+
+class Fill:
+    __slots__ = ('credit_class', 'maker_order_id', 'taker_order_id', 'price', 'quantity',
+                 'buyer_id', 'seller_id')
+
+    def __init__(self, credit_class, maker, taker, price, quantity):
+        self.credit_class = credit_class
+        self.maker_order_id = maker.id
+        self.taker_order_id = taker.id
+        self.price = price
+        self.quantity = quantity
+        buyer, seller = (taker, maker) if taker.side == BUY else (maker, taker)
+        self.buyer_id = buyer.owner_id
+        self.seller_id = seller.owner_id
+
+    def to_dict(self):
+        return {
+            "credit_class": self.credit_class,
+            "maker_order_id": self.maker_order_id,
+            "taker_order_id": self.taker_order_id,
+            "price": from_ticks(self.price),
+            "quantity": self.quantity,
+            "buyer_id": self.buyer_id,
+            "seller_id": self.seller_id,
+        }
+
+
+class OrderBook:
+    """Bids and asks of one credit class: a FIFO queue per price level plus a heap of prices"""
+
+    def __init__(self, credit_class):
+        self.credit_class = credit_class
+        self.bids = {}
+        self.asks = {}
+        self._bid_prices = []  # negated ticks, so the heap top is the best bid
+        self._ask_prices = []
+
+    def rest(self, order):
+        if order.side == BUY:
+            levels, prices, key = self.bids, self._bid_prices, -order.price
+        else:
+            levels, prices, key = self.asks, self._ask_prices, order.price
+        queue = levels.get(order.price)
+        if queue is None:
+            queue = levels[order.price] = deque()
+            heapq.heappush(prices, key)
+        queue.append(order)
+
+    def match(self, order):
+        """Fill `order` against the opposite side; returns the fills"""
+        if order.side == BUY:
+            levels, prices, sign = self.asks, self._ask_prices, 1
+        else:
+            levels, prices, sign = self.bids, self._bid_prices, -1
+        limit = order.price
+        fills = []
+        while order.remaining and prices:
+            best = prices[0] * sign
+            if limit is not None and (best > limit if sign == 1 else best < limit):
+                break
+            queue = levels.get(best)
+            while queue and queue[0].status != OPEN:
+                queue.popleft()
+            if not queue:
+                heapq.heappop(prices)
+                levels.pop(best, None)
+                continue
+            maker = queue[0]
+            quantity = min(order.remaining, maker.remaining)
+            maker.remaining -= quantity
+            order.remaining -= quantity
+            fills.append(Fill(self.credit_class, maker, order, best, quantity))
+            if not maker.remaining:
+                maker.status = FILLED
+                queue.popleft()
+        return fills
+
+    def depth(self, levels=10):
+        """Aggregated open quantity at the best `levels` prices per side"""
+        def side(book, reverse):
+            rows = []
+            for price in sorted(book, reverse=reverse):
+                quantity = sum(o.remaining for o in book[price] if o.status == OPEN)
+                if quantity:
+                    rows.append({"price": from_ticks(price), "quantity": quantity})
+                    if len(rows) == levels:
+                        break
+            return rows
+        return {"bids": side(self.bids, True), "asks": side(self.asks, False)}
+
+    def resting(self):
+        for book in (self.bids, self.asks):
+            for queue in book.values():
+                for order in queue:
+                    if order.status == OPEN:
+                        yield order
+
+
+class OrderWAL:
+    """
+    Append-only JSON-lines log of accepted book operations, shared by every
+    worker on the host. A lock file next to it serializes the workers.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._file = None
+        self._lock_file = None
+        self.offset = 0  # end of the last record this process has applied
+        self.records = 0
+
+    def lock(self):
+        if self._lock_file is None:
+            self._lock_file = open(self.path + '.lock', 'a+')
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            self._lock_file.seek(0)
+            msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def append(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a', buffering=1 << 16)
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.offset = self._file.tell()
+        self.records += 1
+
+    def read_new(self):
+        """Records appended since `offset`, by this or another worker"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn final write
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+                self.offset += len(line)
+        self.records += len(records)
+        return records
+
+    def replay(self):
+        """Every record in the log, from the start"""
+        self.offset = self.records = 0
+        return self.read_new()
+
+    def truncate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        open(self.path, 'w').close()
+        self.offset = self.records = 0
+
+
+class MatchingEngine:
+    def __init__(self, wal=None):
+        self.books = {}
+        self.orders = {}
+        self.wal = wal
+        self.seq = 0
+        self.lock = threading.Lock()
+        # Held by callers across escrow, submit/cancel and settlement
+        self.market_lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Serialize a whole order operation, DB escrow and settlement included,
+        across threads and, through the WAL lock, across worker processes.
+        On entry the books catch up with what other workers logged.
+        """
+        with self.market_lock:
+            outermost = self._depth == 0 and self.wal is not None
+            if outermost:
+                self.wal.lock()
+            self._depth += 1
+            try:
+                if outermost:
+                    record_fills(self.catch_up(), skip_recorded=True)
+                yield self
+            finally:
+                self._depth -= 1
+                if outermost:
+                    self.wal.unlock()
+
+    def catch_up(self):
+        """
+        Reload the books if another worker snapshotted past them, then apply
+        the WAL records this process has not seen. Returns their fills, which
+        a worker that crashed before settling them may have left unrecorded.
+        """
+        from app import db
+        from app.models.order_book import BookOrder, OrderBookState
+
+        state = db.session.get(OrderBookState, 1, populate_existing=True)
+        if state is not None and state.last_seq > self.seq:
+            with self.lock:
+                self.books, self.orders = {}, {}
+            self.load_resting(BookOrder.query.all(), state.last_seq)
+            self.wal.offset = self.wal.records = 0
+        return self.replay(self.wal.read_new())
+
+    def resting_quantity(self, credit_class, side):
+        """Open quantity on one side of a class's book"""
+        with self.lock:
+            book = self.books.get(credit_class)
+            if book is None:
+                return 0
+            return sum(o.remaining for o in book.resting() if o.side == side)
+
+    def book(self, credit_class):
+        book = self.books.get(credit_class)
+        if book is None:
+            book = self.books[credit_class] = OrderBook(credit_class)
+        return book
+
+    def submit(self, credit_class, side, quantity, price=None, order_type=LIMIT, owner_id=None):
+        """Accept an order; returns (order, fills). Limit prices are in currency units."""
+        ticks = to_ticks(price) if order_type == LIMIT else None
+        with self.lock:
+            seq = self.seq + 1
+            if self.wal is not None:
+                self.wal.append([seq, 'S', credit_class, side, order_type, ticks, quantity, owner_id])
+            return self._apply_submit(seq, credit_class, side, order_type, ticks, quantity, owner_id)
+
+    def cancel(self, order_id):
+        """Cancel a resting order; returns it, or None if it is no longer open"""
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return None
+            seq = self.seq + 1
+            if self.wal is not None:
+                self.wal.append([seq, 'C', order_id])
+            return self._apply_cancel(seq, order_id)
+
+    def _apply_submit(self, seq, credit_class, side, order_type, ticks, quantity, owner_id):
+        self.seq = seq
+        order = Order(seq, credit_class, side, order_type, ticks, quantity, owner_id)
+        book = self.book(credit_class)
+        fills = book.match(order)
+        for fill in fills:
+            maker = self.orders.get(fill.maker_order_id)
+            if maker is not None and maker.status != OPEN:
+                del self.orders[maker.id]
+        if not order.remaining:
+            order.status = FILLED
+        elif order_type == MARKET:
+            order.status = CANCELLED
+        else:
+            book.rest(order)
+            self.orders[order.id] = order
+        return order, fills
+
+    def _apply_cancel(self, seq, order_id):
+        self.seq = seq
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            order.status = CANCELLED
+        return order
+
+    def get_order(self, order_id):
+        return self.orders.get(order_id)
+
+    def replay(self, records):
+        """Apply WAL records newer than the current sequence; returns their fills"""
+        fills = []
+        with self.lock:
+            for record in records:
+                if record[0] <= self.seq:
+                    continue
+                if record[1] == 'S':
+                    seq, _, credit_class, side, order_type, ticks, quantity, owner_id = record
+                    fills.extend(self._apply_submit(
+                        seq, credit_class, side, order_type, ticks, quantity, owner_id)[1])
+                else:
+                    self._apply_cancel(record[0], record[2])
+        return fills
+
+    def load_resting(self, orders, seq):
+        """Rebuild books from snapshot rows (oldest first per price level)"""
+        with self.lock:
+            for row in sorted(orders, key=lambda o: o.id):
+                order = Order(row.id, row.credit_class, row.side, LIMIT, row.price_ticks,
+                              row.quantity, row.owner_id)
+                order.remaining = row.remaining
+                self.book(order.credit_class).rest(order)
+                self.orders[order.id] = order
+            self.seq = max(self.seq, seq)
+
+    def snapshot(self, session):
+        """
+        Persist resting orders and the applied sequence, then truncate the
+        WAL. Call it inside exclusive() once the fills are recorded.
+        """
+        from app.models.order_book import BookOrder, OrderBookState
+
+        with self.lock:
+            rows = [
+                {"id": o.id, "credit_class": o.credit_class, "side": o.side, "price_ticks": o.price,
+                 "quantity": o.quantity, "remaining": o.remaining, "owner_id": o.owner_id}
+                for book in self.books.values() for o in book.resting()
+            ]
+            session.query(BookOrder).delete()
+            if rows:
+                session.bulk_insert_mappings(BookOrder, rows)
+            state = session.get(OrderBookState, 1) or OrderBookState(id=1)
+            state.last_seq = self.seq
+            state.snapshot_at = datetime.utcnow()
+            session.add(state)
+            session.commit()
+            if self.wal is not None:
+                self.wal.truncate()
+            return len(rows)
+
+
+_engine = None
+
+
+def get_engine():
+    return _engine
+
+
+def init_order_book(app):
+    """Rebuild the books from the last DB snapshot plus the WAL written since"""
+    global _engine
+
+    engine = MatchingEngine(OrderWAL(app.config['ORDER_WAL_PATH'], app.config['ORDER_WAL_FSYNC']))
+    with engine.exclusive():
+        replayed = engine.wal.records
+    _engine = engine
+    if replayed:
+        print(f"Order book recovered: replayed {replayed} WAL records up to seq {engine.seq}")
+    return engine
+
+
+def credit_for_class(credit_class, include_expired=False):
+    """The credit a class trades, or None unless it exists (and has not expired)"""
+    from app import db
+    from app.models.credit import Credit
+
+    if not str(credit_class).isdigit():
+        return None
+    credit = db.session.get(Credit, int(credit_class))
+    if credit is None or (credit.is_expired and not include_expired):
+        return None
+    return credit
+
+
+def _holding(credit, user_id):
+    from app.models.transaction import PurchasedCredit
+
+    return (
+        PurchasedCredit.query
+        .filter_by(user_id=user_id, credit_id=credit.id, is_expired=bool(credit.is_expired))
+        .order_by(PurchasedCredit.id)
+        .with_for_update()
+        .first()
+    )
+
+
+def whole_holding(engine, credit):
+    """
+    (holder id, their purchased_credits row, or None for the creator) when
+    one user holds every unit of a credit, else None: its units are split
+    between holders or partly on the book. Fixed-price listings and
+    purchases move a whole credit, so they are limited to whole holdings.
+    """
+    from app.models.transaction import PurchasedCredit
+
+    if engine.resting_quantity(str(credit.id), SELL):
+        return None
+    rows = PurchasedCredit.query.filter_by(credit_id=credit.id).with_for_update().all()
+    if not rows:
+        return credit.creator_id, None
+    if len(rows) == 1 and rows[0].amount == credit.amount:
+        return rows[0].user_id, rows[0]
+    return None
+
+
+def available_units(engine, credit, user_id):
+    """Units of a credit a user may still offer"""
+    from app import db
+    from app.models.transaction import PurchasedCredit
+
+    if user_id == credit.creator_id:
+        held = db.session.query(db.func.coalesce(db.func.sum(PurchasedCredit.amount), 0)) \
+            .filter(PurchasedCredit.credit_id == credit.id).scalar()
+        return credit.amount - held - engine.resting_quantity(str(credit.id), SELL)
+    row = _holding(credit, user_id)
+    return row.amount if row is not None else 0
+
+
+def escrow_units(engine, credit, user_id, quantity):
+    """
+    Take `quantity` units out of the seller's holding for a sell order.
+    The creator's unsold units leave their holding by being on the book.
+    Returns False when the seller does not hold that many.
+    """
+    from app import db
+    from app.utilis.portfolio import apply_holding
+
+    if available_units(engine, credit, user_id) < quantity:
+        return False
+    if user_id == credit.creator_id:
+        return True
+    row = _holding(credit, user_id)
+    if row.amount == quantity:
+        apply_holding(user_id, credit, -1)
+        db.session.delete(row)
+    else:
+        row.amount -= quantity
+    return True
+
+
+def release_units(credit, user_id, quantity):
+    """Return escrowed units of a cancelled or expired sell order"""
+    if quantity and user_id != credit.creator_id:
+        _credit_units(credit, user_id, quantity)
+
+
+def _credit_units(credit, user_id, quantity):
+    from app import db
+    from app.models.transaction import PurchasedCredit
+    from app.utilis.portfolio import apply_holding
+
+    row = _holding(credit, user_id)
+    if row is not None:
+        row.amount += quantity
+        return
+    expired = bool(credit.is_expired)
+    apply_holding(user_id, credit, 1, expired=expired)
+    db.session.add(PurchasedCredit(user_id=user_id, credit_id=credit.id, amount=quantity,
+                                   creator_id=credit.creator_id, is_expired=expired))
+
+
+def cancel_resting(engine, credit):
+    """
+    Cancel every resting order on a credit's book, returning sell orders'
+    units to their holders; returns the cancelled orders. Runs inside
+    engine.exclusive(), and the caller commits.
+    """
+    with engine.lock:
+        book = engine.books.get(str(credit.id))
+        order_ids = [o.id for o in book.resting()] if book is not None else []
+    cancelled = []
+    for order_id in order_ids:
+        order = engine.cancel(order_id)
+        if order is None:
+            continue
+        if order.side == SELL:
+            release_units(credit, order.owner_id, order.remaining)
+        cancelled.append(order)
+    return cancelled
+
+
+def _settle(fills):
+    """Move each fill's units to the buyer and record it as a transaction"""
+    from app import db
+    from app.models.credit import Credit
+    from app.models.transaction import Transactions
+
+    credits = {}
+    for f in fills:
+        if f.credit_class not in credits:
+            credits[f.credit_class] = db.session.get(Credit, int(f.credit_class)) \
+                if str(f.credit_class).isdigit() else None
+        credit = credits[f.credit_class]
+        if credit is None or f.buyer_id is None:
+            continue  # not a credit's book (fills logged before settlement existed)
+        # Units bought by the creator return to their unsold stock
+        if f.buyer_id != credit.creator_id:
+            _credit_units(credit, f.buyer_id, f.quantity)
+        db.session.add(Transactions(
+            buyer_id=f.buyer_id,
+            credit_id=credit.id,
+            amount=f.quantity,
+            total_price=from_ticks(f.price) * f.quantity,
+            txn_hash=f"book:{f.maker_order_id}:{f.taker_order_id}",
+        ))
+
+
+def record_fills(fills, skip_recorded=False):
+    """
+    Store fills in order_fills and settle them, in one DB transaction with
+    whatever the session already holds (the order's escrow). skip_recorded
+    drops fills already stored before a crash.
+    """
+    from app import db
+    from app.models.order_book import OrderFill
+
+    if skip_recorded and fills:
+        takers = {f.taker_order_id for f in fills}
+        stored = {
+            row[0] for row in
+            db.session.query(OrderFill.taker_order_id).filter(OrderFill.taker_order_id.in_(takers))
+        }
+        fills = [f for f in fills if f.taker_order_id not in stored]
+    if fills:
+        _settle(fills)
+        db.session.bulk_insert_mappings(OrderFill, [
+            {"credit_class": f.credit_class, "maker_order_id": f.maker_order_id,
+             "taker_order_id": f.taker_order_id, "price": from_ticks(f.price), "quantity": f.quantity,
+             "buyer_id": f.buyer_id, "seller_id": f.seller_id}
+            for f in fills
+        ])
+    db.session.commit()
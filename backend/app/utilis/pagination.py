@@ -0,0 +1,71 @@
+import base64
+import json
+from flask import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+SINCE_CURSOR_HEADER = 'X-Since-Cursor'
+
+
+def encode_cursor(values):
+    """Opaque keyset cursor from the sort-key values of the last row"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, types=None):
+    """
+    Sort-key values from a cursor; raises ValueError on a malformed cursor.
+    With `types`, the cursor must hold one scalar per type and each value
+    is converted with it, so only plain values reach the keyset filter.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    if types is None:
+        return values
+    if len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    if any(isinstance(value, bool) or not isinstance(value, (int, float, str)) for value in values):
+        raise ValueError("Invalid cursor")
+    try:
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, OverflowError):
+        raise ValueError("Invalid cursor")
+
+
+def page_args(default_limit=DEFAULT_PAGE_SIZE, max_limit=MAX_PAGE_SIZE, types=None):
+    """(limit, cursor values) from the ?limit= and ?cursor= query parameters"""
+    limit = request.args.get('limit', default_limit, type=int)
+    limit = max(1, min(limit, max_limit))
+    return limit, decode_cursor(request.args.get('cursor'), types)
+
+
+def split_page(rows, limit, key):
+    """
+    Trim a `limit + 1` row fetch to one page and build the cursor
+    for the next one, or None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
+
+
+def with_next_cursor(response, next_cursor):
+    """Expose the next-page cursor without changing list-shaped bodies"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
+def with_since_cursor(response, since_cursor):
+    """Expose the cursor a poller passes as ?since= to get only newer rows"""
+    if since_cursor:
+        response.headers[SINCE_CURSOR_HEADER] = since_cursor
+    return response
@@ -0,0 +1,152 @@
+"""
+bcrypt hashing and verification on a bounded process pool.
+
+Each bcrypt call burns a few hundred milliseconds of CPU, so it runs on
+dedicated worker processes instead of the request thread. At most
+PASSWORD_POOL_MAX_PENDING calls may be queued or running; beyond that
+hash_password/check_password raise PasswordPoolBusy and routes answer 429.
+
+The bcrypt cost is calibrated at startup to land near BCRYPT_TARGET_MS
+per hash, never below BCRYPT_MIN_ROUNDS. Calibration runs per worker and
+may land on different costs, so needs_rehash() compares stored hashes with
+the configured floor instead (BCRYPT_MIN_ROUNDS when calibrating, else
+BCRYPT_LOG_ROUNDS) and only upgrades hashes below it; every worker agrees
+on it, and no hash is ever downgraded.
+
+Workers are forked once, while the app is still single-threaded. If the
+pool breaks later (a worker killed by the OOM killer, say) it is not
+replaced: forking the running, multithreaded server is unsafe, and spawn
+would re-run the entry script in every worker. Password operations then
+raise PasswordPoolUnavailable (routes answer 503) until the process is
+restarted.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from flask_bcrypt import Bcrypt
+
+from config import Config
+
+_bcrypt = Bcrypt()
+_executor = None
+_executor_lock = threading.Lock()
+_broken = False
+_slots = threading.BoundedSemaphore(Config.PASSWORD_POOL_MAX_PENDING)
+_rounds = Config.BCRYPT_LOG_ROUNDS
+_min_rounds = Config.BCRYPT_LOG_ROUNDS
+
+
+class PasswordPoolBusy(Exception):
+    """Too many password operations queued; the caller should retry later"""
+
+
+class PasswordPoolUnavailable(PasswordPoolBusy):
+    """The worker pool broke and this process can no longer hash passwords"""
+
+
+# Worker-side functions; module level so they can be pickled
+
+def _hash(password, rounds):
+    return _bcrypt.generate_password_hash(password, rounds).decode('utf-8')
+
+
+def _check(pw_hash, password):
+    return _bcrypt.check_password_hash(pw_hash, password)
+
+
+def _noop():
+    return None
+
+
+def calibrate(target_ms, min_rounds=4, max_rounds=16):
+    """Highest bcrypt cost whose hash time stays within target_ms"""
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        _hash('calibration-password', candidate)
+        if (time.perf_counter() - start) * 1000 > target_ms:
+            break
+        rounds = candidate
+    return rounds
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _broken:
+            raise PasswordPoolUnavailable()
+        if _executor is None:
+            # Workers are forked from the still single-threaded app at startup
+            # (see init_password_pool); spawn would re-import the entry script
+            method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(
+                max_workers=Config.PASSWORD_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _executor
+
+
+def _mark_broken(broken):
+    """Fail closed: a broken pool is shut down and never re-forked"""
+    global _broken
+    with _executor_lock:
+        if not _broken:
+            print("password pool broke; password operations are refused until the process restarts")
+        _broken = True
+    broken.shutdown(wait=False)
+
+
+def init_password_pool(app):
+    """Calibrate the bcrypt cost and start the worker processes"""
+    global _rounds, _min_rounds
+    if Config.BCRYPT_CALIBRATE:
+        _min_rounds = Config.BCRYPT_MIN_ROUNDS
+        _rounds = max(calibrate(Config.BCRYPT_TARGET_MS), _min_rounds)
+        print(f"bcrypt cost calibrated to {_rounds} rounds (target {Config.BCRYPT_TARGET_MS}ms)")
+    app.config['BCRYPT_LOG_ROUNDS'] = _rounds
+    _get_executor().submit(_noop).result()
+
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordPoolBusy()
+    executor = _get_executor()
+    try:
+        future = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        _slots.release()
+        _mark_broken(executor)
+        raise PasswordPoolUnavailable()
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=Config.PASSWORD_POOL_TIMEOUT)
+    except BrokenProcessPool:
+        _mark_broken(executor)
+        raise PasswordPoolUnavailable()
+    except FutureTimeout:
+        raise PasswordPoolBusy()
+
+
+def hash_password(password):
+    """bcrypt hash at the calibrated cost"""
+    if not password:
+        raise ValueError('Password must be non-empty.')
+    return _run(_hash, password, _rounds)
+
+
+def check_password(pw_hash, password):
+    return _run(_check, pw_hash, password)
+
+
+def needs_rehash(pw_hash):
+    """True when pw_hash was made with a cost below the configured floor"""
+    try:
+        return int(pw_hash.split('$')[2]) < _min_rounds
+    except (IndexError, ValueError, AttributeError):
+        return False
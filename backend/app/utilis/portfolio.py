@@ -0,0 +1,143 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.credit import Credit
+from app.models.portfolio import PortfolioSummary
+from app.models.transaction import PurchasedCredit
+from config import Config
+
+HYDROGEN_OFFSET_FACTOR = 0.5  # Mock H₂ production impact per credit unit
+
+
+def mock_performance(credit_id):
+    """Mock performance between -0.5 and +0.49, stable per credit"""
+    return ((credit_id % 100) - 50) / 100.0
+
+
+def portfolio_totals(user_id):
+    """Portfolio totals for a buyer from one aggregate over purchased_credits ⋈ credits"""
+    current_value = Credit.price * (1 + ((Credit.id % 100) - 50) / 100.0)
+    row = (
+        db.session.query(
+            func.count(PurchasedCredit.id),
+            func.coalesce(func.sum(case((PurchasedCredit.is_expired == True, 1), else_=0)), 0),
+            func.coalesce(func.sum(Credit.price), 0.0),
+            func.coalesce(func.sum(current_value), 0.0),
+            func.coalesce(func.sum(Credit.amount), 0) * HYDROGEN_OFFSET_FACTOR,
+        )
+        .select_from(PurchasedCredit)
+        .outerjoin(Credit, Credit.id == PurchasedCredit.credit_id)
+        .filter(PurchasedCredit.user_id == user_id)
+        .one()
+    )
+    return {
+        "credits_count": row[0],
+        "expired_count": int(row[1]),
+        "total_invested": float(row[2]),
+        "current_value": float(row[3]),
+        "hydrogen_offset": float(row[4]),
+    }
+
+
+def get_portfolio(user_id):
+    """
+    Portfolio totals for a buyer. With PORTFOLIO_SUMMARY_ENABLED this is a
+    single-row read of portfolio_summaries, backfilled from the aggregate
+    the first time a buyer is seen.
+    """
+    if not Config.PORTFOLIO_SUMMARY_ENABLED:
+        return portfolio_totals(user_id)
+
+    summary = db.session.get(PortfolioSummary, user_id)
+    if summary is None:
+        # A concurrent first read or purchase may create the row first; keep theirs
+        _insert_summary(user_id, portfolio_totals(user_id))
+        db.session.commit()
+        summary = db.session.get(PortfolioSummary, user_id)
+    return {
+        "credits_count": summary.credits_count,
+        "expired_count": summary.expired_count,
+        "total_invested": summary.total_invested,
+        "current_value": summary.current_value,
+        "hydrogen_offset": summary.hydrogen_offset,
+    }
+
+
+def _insert_summary(user_id, values, conflict_deltas=None):
+    """
+    Insert a buyer's summary row. If one exists by then, leave it as is, or
+    add conflict_deltas to it.
+    """
+    table = PortfolioSummary.__table__
+    now = datetime.utcnow()
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        stmt = insert(table).values(user_id=user_id, updated_at=now, **values)
+        if conflict_deltas:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_=dict({name: table.c[name] + delta for name, delta in conflict_deltas.items()}, updated_at=now),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.user_id])
+        db.session.execute(stmt)
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(user_id=user_id, updated_at=now, **values))
+    except IntegrityError:
+        if conflict_deltas:
+            _update_summary(user_id, conflict_deltas)
+
+
+def _update_summary(user_id, deltas):
+    return db.session.execute(
+        update(PortfolioSummary)
+        .where(PortfolioSummary.user_id == user_id)
+        .values(**{name: getattr(PortfolioSummary, name) + delta for name, delta in deltas.items()})
+    ).rowcount
+
+
+def _apply(user_id, deltas):
+    """
+    Add deltas to a buyer's summary row in the current transaction. Call it
+    before the change itself is flushed: a missing row is started from the
+    holdings as they stand, plus the deltas.
+    """
+    with db.session.no_autoflush:
+        if _update_summary(user_id, deltas):
+            return
+        values = portfolio_totals(user_id)
+        for name, delta in deltas.items():
+            values[name] += delta
+        _insert_summary(user_id, values, conflict_deltas=deltas)
+
+
+def apply_holding(user_id, credit, sign, expired=False):
+    """
+    Add (sign=1) or remove (sign=-1) one credit's contribution to a buyer's
+    summary row in the current transaction, before the holding change is
+    flushed. Buyers without a row get one built from the aggregate.
+    """
+    if not Config.PORTFOLIO_SUMMARY_ENABLED or user_id is None:
+        return
+    price = float(credit.price)
+    _apply(user_id, {
+        "credits_count": sign,
+        "expired_count": sign if expired else 0,
+        "total_invested": sign * price,
+        "current_value": sign * price * (1 + mock_performance(credit.id)),
+        "hydrogen_offset": sign * float(credit.amount) * HYDROGEN_OFFSET_FACTOR,
+    })
+
+
+def mark_expired(user_id):
+    """Count one more expired holding in a buyer's summary row, before the holding is flushed as expired"""
+    if not Config.PORTFOLIO_SUMMARY_ENABLED or user_id is None:
+        return
+    _apply(user_id, {"expired_count": 1})
@@ -1,4 +1,5 @@
 from redis import Redis
+from redis.exceptions import RedisError
 from config import Config
 redis_client = None
 def init_redis(app):
@@ -8,11 +9,13 @@ def init_redis(app):
         redis_client = Redis.from_url(
             redis_url,
             decode_responses=True,
+            socket_connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+            socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
         )
         redis_client.ping()
         print("Connected to redis")
-    except ConnectionError as e:
-        print("No redis server connected")
+    except (RedisError, OSError) as e:
+        print(f"No redis server connected: {e}")
         redis_client = None
 
 def get_redis():
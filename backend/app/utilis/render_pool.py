@@ -0,0 +1,64 @@
+"""
+Worker processes for CPU-bound rendering (certificate HTML and PDFs).
+
+Rendering is pure CPU and holds the GIL, so it runs on dedicated process
+pools: certificate_pool for bulk HTML exports (CERT_RENDER_WORKERS) and
+pdf_pool for PDF certificates (CERT_PDF_WORKERS), so a large export cannot
+starve PDF requests. Callers keep a bounded number of futures in flight,
+so memory does not grow with the size of the job.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+
+
+def _noop():
+    return None
+
+
+class WorkerPool:
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Same reasoning as the password pool: fork from the app at startup
+                method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            return self._executor
+
+    def _reset(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False)
+
+    def start(self):
+        """Fork the worker processes while the app is still single-threaded"""
+        self.executor().submit(_noop).result()
+
+    def submit(self, fn, *args):
+        """fn(*args) on a worker process; a crashed pool is replaced once"""
+        executor = self.executor()
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            return self.executor().submit(fn, *args)
+
+
+certificate_pool = WorkerPool(Config.CERT_RENDER_WORKERS)
+pdf_pool = WorkerPool(Config.CERT_PDF_WORKERS)
+
+
+def init_render_pool(app):
+    certificate_pool.start()
@@ -0,0 +1,121 @@
+"""
+Thread-safe pool of sqlite3 connections for full_server.py.
+
+A thread checks a connection out with `pool.connect()` and hands it back
+with `conn.close()`. Nested checkouts on the same thread (a route calling
+get_user_by_username, say) reuse the connection already held, so one
+request uses one connection. Released connections stay open and are
+handed to the next request. Each connection keeps its own prepared
+statement cache, so reusing connections also reuses parsed statements.
+
+Every connection is opened in WAL mode with synchronous=NORMAL and a
+memory map, so readers no longer block behind a writer's file lock.
+"""
+import queue
+import sqlite3
+import threading
+
+
+class PoolExhausted(sqlite3.OperationalError):
+    """No connection became free within the pool timeout"""
+
+
+class PooledConnection:
+    """sqlite3.Connection proxy whose close() returns it to the pool"""
+
+    def __init__(self, pool, raw):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_depth', 0)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._raw, name, value)
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self._raw.__exit__(*exc)
+
+    def close(self):
+        self._pool._release(self)
+
+
+class SQLitePool:
+    def __init__(self, path, max_connections=16, timeout=10.0,
+                 cached_statements=256, mmap_size=256 * 1024 * 1024, busy_timeout_ms=5000):
+        self.path = path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._local = threading.local()
+
+    def _open(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        raw.execute('PRAGMA journal_mode=WAL')
+        raw.execute('PRAGMA synchronous=NORMAL')
+        raw.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        raw.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return raw
+
+    def connect(self):
+        """Connection for the calling thread, reused if it already holds one"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if not self._slots.acquire(timeout=self.timeout):
+                raise PoolExhausted("database connection pool exhausted")
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                try:
+                    raw = self._open()
+                except Exception:
+                    self._slots.release()
+                    raise
+            conn = PooledConnection(self, raw)
+            self._local.conn = conn
+        object.__setattr__(conn, '_depth', conn._depth + 1)
+        return conn
+
+    def _release(self, conn, force=False):
+        if self._local.__dict__.get('conn') is not conn:
+            return
+        depth = 0 if force else conn._depth - 1
+        object.__setattr__(conn, '_depth', depth)
+        if depth > 0:
+            return
+        del self._local.conn
+        raw = conn._raw
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            raw.row_factory = None
+            self._idle.put(raw)
+        except sqlite3.Error:
+            raw.close()
+        finally:
+            self._slots.release()
+
+    def release_thread(self):
+        """Return the calling thread's connection, however deeply it was checked out"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._release(conn, force=True)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
@@ -0,0 +1,248 @@
+"""
+Streaming anomaly detection over facility meter telemetry.
+
+Meters post minute readings of energy (kWh) and hydrogen (kg). Each
+facility keeps a fixed-size state: exponentially weighted mean and
+variance of energy per minute and of efficiency (kWh/kg), the last minute
+seen, running totals, and an exponentially decayed rate of flagged
+readings. A reading is flagged when either signal is more than
+TELEMETRY_Z_THRESHOLD standard deviations from its running mean (after
+TELEMETRY_WARMUP readings). Memory is O(facilities) however long the
+stream runs, and raw readings are never stored or rescanned.
+
+The decayed flag rate is the facility's telemetry_anomaly factor, which
+the verification model reads through facility_summary(). Readings at or
+before a facility's last minute are dropped, so meters can safely resend.
+
+The state lives in facility_telemetry, one row per facility, so every
+worker folds readings into the same state: ingest() write-locks the row
+(an upsert that touches it), folds the batch in memory and writes the row
+back in one DB transaction. Summaries report last_minute so meters know
+where to resume from.
+"""
+import math
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models.verification import FacilityTelemetry
+
+
+# Per-facility state layout, and the facility_telemetry columns holding it
+LAST_MINUTE, READINGS, EFF_READINGS, EFF_MEAN, EFF_VAR, KWH_MEAN, KWH_VAR, RATE, FLAGGED, KWH_TOTAL, KG_TOTAL = range(11)
+STATE_COLUMNS = ('last_minute', 'readings', 'eff_readings', 'eff_mean', 'eff_var', 'kwh_mean', 'kwh_var',
+                 'rate', 'flagged', 'kwh_total', 'kg_total')
+EMPTY_STATE = (-1, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0.0, 0.0)
+# Relative noise floor, so a meter that has read flat so far is not flagged for a 0.1% wobble
+NOISE_FLOOR = 1e-4
+# Readings must fall between the epoch and the end of year 9999, the range summaries can format
+MAX_MINUTE = int(datetime(9999, 12, 31, 23, 59, tzinfo=timezone.utc).timestamp() // 60)
+
+
+def reading_minute(ts):
+    """Epoch minute of a reading timestamp: epoch seconds or an ISO 8601 string"""
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        minute = int(ts // 60)
+    elif isinstance(ts, str):
+        parsed = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        minute = int(parsed.timestamp() // 60)
+    else:
+        raise ValueError("ts must be epoch seconds or an ISO 8601 string")
+    if not 0 <= minute <= MAX_MINUTE:
+        raise ValueError("ts is out of range")
+    return minute
+
+
+def parse_reading(raw):
+    """(minute, energy_kwh, h2_kg) from [ts, kwh, kg] or {"ts", "energy_kwh", "h2_kg"}, else None"""
+    try:
+        if isinstance(raw, dict):
+            ts, kwh, kg = raw['ts'], raw['energy_kwh'], raw['h2_kg']
+        else:
+            ts, kwh, kg = raw
+        kwh, kg = float(kwh), float(kg)
+        minute = reading_minute(ts)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    if not (0.0 <= kwh < math.inf and 0.0 <= kg < math.inf):
+        return None
+    return minute, kwh, kg
+
+
+class TelemetryDetector:
+    def __init__(self, alpha=0.01, z_threshold=4.0, warmup=30):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+
+    def fold(self, state, readings):
+        """
+        Fold (minute, energy_kwh, h2_kg) readings, oldest first, into a
+        state list in place. Returns (accepted, flagged, stale).
+        """
+        alpha = self.alpha
+        keep = 1.0 - alpha
+        z2 = self.z_threshold * self.z_threshold
+        warmup = self.warmup
+        accepted = flagged = stale = 0
+        last, n, n_eff, e_mean, e_var, k_mean, k_var, rate, total_flagged, kwh_total, kg_total = state
+        for minute, kwh, kg in readings:
+            if minute <= last:
+                stale += 1
+                continue
+            last = minute
+            kwh_total += kwh
+            kg_total += kg
+
+            # Energy per minute
+            if n:
+                d = kwh - k_mean
+                hit = n >= warmup and d * d > z2 * (k_var + NOISE_FLOOR * k_mean * k_mean)
+                incr = alpha * d
+                k_mean += incr
+                k_var = keep * (k_var + d * incr)
+            else:
+                hit = False
+                k_mean = kwh
+            n += 1
+
+            # Efficiency, only while producing
+            if kg > 0.0:
+                eff = kwh / kg
+                if n_eff:
+                    d = eff - e_mean
+                    if n_eff >= warmup and d * d > z2 * (e_var + NOISE_FLOOR * e_mean * e_mean):
+                        hit = True
+                    incr = alpha * d
+                    e_mean += incr
+                    e_var = keep * (e_var + d * incr)
+                else:
+                    e_mean = eff
+                n_eff += 1
+
+            if hit:
+                flagged += 1
+                rate += alpha * (1.0 - rate)
+            else:
+                rate *= keep
+            accepted += 1
+        state[:] = [last, n, n_eff, e_mean, e_var, k_mean, k_var, rate, total_flagged + flagged, kwh_total, kg_total]
+        return accepted, flagged, stale
+
+
+def summarize(state):
+    """Summary of one facility's state, or None before its first reading"""
+    if not state or not state[READINGS]:
+        return None
+    return {
+        "readings": state[READINGS],
+        "last_minute": datetime.fromtimestamp(state[LAST_MINUTE] * 60, timezone.utc).isoformat(),
+        "energy_kwh_mean": state[KWH_MEAN],
+        "energy_kwh_std": math.sqrt(state[KWH_VAR]),
+        "efficiency_mean": state[EFF_MEAN] if state[EFF_READINGS] else None,
+        "efficiency_std": math.sqrt(state[EFF_VAR]) if state[EFF_READINGS] else None,
+        "energy_kwh_total": state[KWH_TOTAL],
+        "h2_kg_total": state[KG_TOTAL],
+        "flagged_readings": state[FLAGGED],
+        "telemetry_anomaly": state[RATE],
+    }
+
+
+_detector = None
+
+
+def _locked_state(facility_id):
+    """A facility's state row, created if missing and write-locked until commit"""
+    table = FacilityTelemetry.__table__
+    now = datetime.utcnow()
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        # Touching the row takes its write lock, so no other worker folds into it until we commit
+        insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        db.session.execute(
+            insert(table).values(facility_id=facility_id, updated_at=now, **dict(zip(STATE_COLUMNS, EMPTY_STATE)))
+            .on_conflict_do_update(index_elements=[table.c.facility_id], set_={"updated_at": now})
+        )
+    elif not db.session.execute(
+        update(table).where(table.c.facility_id == facility_id).values(updated_at=now)
+    ).rowcount:
+        db.session.execute(table.insert().values(facility_id=facility_id, updated_at=now,
+                                                 **dict(zip(STATE_COLUMNS, EMPTY_STATE))))
+    row = db.session.execute(
+        select(*[table.c[name] for name in STATE_COLUMNS]).where(table.c.facility_id == facility_id)
+    ).one()
+    return list(row)
+
+
+def ingest(facility_id, readings):
+    """Fold a batch of parsed readings into a facility's stored state; returns (accepted, flagged, stale)"""
+    table = FacilityTelemetry.__table__
+    try:
+        state = _locked_state(facility_id)
+        counts = _detector.fold(state, readings)
+        db.session.execute(
+            update(table).where(table.c.facility_id == facility_id).values(**dict(zip(STATE_COLUMNS, state)))
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return counts
+
+
+def facility_summary(facility_id):
+    """Telemetry summary for the verification model, or None without readings"""
+    if facility_id is None:
+        return None
+    return facility_summaries([facility_id]).get(facility_id)
+
+
+def facility_summaries(facility_ids):
+    """{facility_id: summary} for the facilities with readings, in one query"""
+    facility_ids = {f for f in facility_ids if f is not None}
+    if not facility_ids:
+        return {}
+    table = FacilityTelemetry.__table__
+    rows = db.session.execute(
+        select(table.c.facility_id, *[table.c[name] for name in STATE_COLUMNS])
+        .where(table.c.facility_id.in_(facility_ids))
+    )
+    return {row[0]: summarize(list(row[1:])) for row in rows if row[1 + READINGS]}
+
+
+def init_telemetry(app):
+    """Build the detector with the configured parameters; its state lives in facility_telemetry"""
+    global _detector
+    _detector = TelemetryDetector(app.config['TELEMETRY_ALPHA'], app.config['TELEMETRY_Z_THRESHOLD'],
+                                  app.config['TELEMETRY_WARMUP'])
+    return _detector
+
+
+def ingest_stream(facility_id, raw_readings, batch_size=5000):
+    """Parse and ingest raw readings in batches, so a long upload is never held in memory at once"""
+    counts = {"accepted": 0, "flagged": 0, "stale": 0, "invalid": 0}
+    batch = []
+
+    def flush():
+        accepted, flagged, stale = ingest(facility_id, batch)
+        counts["accepted"] += accepted
+        counts["flagged"] += flagged
+        counts["stale"] += stale
+        batch.clear()
+
+    for raw in raw_readings:
+        reading = parse_reading(raw)
+        if reading is None:
+            counts["invalid"] += 1
+            continue
+        batch.append(reading)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return counts
@@ -0,0 +1,90 @@
+"""
+Signup latency while the CAPTCHA upstream is healthy, slow and down,
+using a local stub of the Turnstile siteverify endpoint.
+
+Run from backend/:  python -m benchmarks.captcha_degradation [signups_per_phase]
+
+Uses a scratch SQLite database unless POSTGRES_URI is set.
+"""
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_captcha_degradation.db')
+os.environ.setdefault('BCRYPT_CALIBRATE', 'false')
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+from app import create_app, db
+from app.utilis.captcha import build_verifier, set_verifier
+from config import Config
+
+STUB = {"delay": 0.0, "status": 200}
+
+
+class StubSiteverify(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(STUB["delay"])
+        body = json.dumps({"success": STUB["status"] == 200}).encode()
+        try:
+            self.send_response(STUB["status"])
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client already gave up on its read timeout
+
+    def log_message(self, *args):
+        pass
+
+
+def run_phase(client, label, signups, offset):
+    latencies, codes = [], {}
+    for i in range(signups):
+        start = time.perf_counter()
+        response = client.post('/api/signup', json={
+            "username": f"captcha-user-{offset + i}", "email": f"captcha{offset + i}@example.com",
+            "password": "pw", "role": "buyer", "cf-turnstile-response": "token",
+        })
+        latencies.append((time.perf_counter() - start) * 1000)
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    print(f"{label:<28} p50 {statistics.median(latencies):8.1f} ms  "
+          f"max {max(latencies):8.1f} ms  status {codes}")
+
+
+def main(signups):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubSiteverify)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    Config.CAPTCHA_BACKEND = 'turnstile'
+    Config.CAPTCHA_VERIFY_URL = f"http://127.0.0.1:{server.server_port}/turnstile/v0/siteverify"
+    Config.CAPTCHA_READ_TIMEOUT = 0.5
+    Config.CAPTCHA_BREAKER_RESET = 2.0
+    set_verifier(build_verifier())
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    client = app.test_client()
+    print(f"read timeout {Config.CAPTCHA_READ_TIMEOUT}s, breaker opens after "
+          f"{Config.CAPTCHA_BREAKER_THRESHOLD} failures for {Config.CAPTCHA_BREAKER_RESET}s\n")
+
+    run_phase(client, "healthy upstream", signups, 0)
+    STUB["delay"] = 5.0
+    run_phase(client, "upstream stalls 5s", signups, signups)
+    STUB["delay"], STUB["status"] = 0.0, 500
+    run_phase(client, "upstream returns 500", signups, 2 * signups)
+    STUB["status"] = 200
+    time.sleep(Config.CAPTCHA_BREAKER_RESET)
+    run_phase(client, "upstream recovered", signups, 3 * signups)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
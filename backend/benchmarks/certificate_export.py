@@ -0,0 +1,106 @@
+"""
+Bulk certificate export: throughput, peak memory and archive integrity.
+
+Seeds one buyer with `count` expired purchases (default 5,000; a tenth of
+them already rendered), streams /api/buyer/certificates/export under
+tracemalloc (writing the archive to a temporary file) and checks that the ZIP holds one certificate per purchase and
+a matching manifest. For comparison, times the per-credit
+download-certificate endpoint on a sample of the same purchases.
+
+Run from backend/:  python -m benchmarks.certificate_export [count]
+
+Uses a scratch SQLite file unless POSTGRES_URI is set; point it at a
+throwaway database, the tables are dropped and recreated.
+"""
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_certificate_export.db')
+os.environ.setdefault('BCRYPT_CALIBRATE', 'false')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.models.credit import Credit
+from app.models.transaction import PurchasedCredit, Transactions
+from app.models.user import User
+from app.utilis import certificates
+from app.utilis.current_user import user_claims
+
+DEFAULT_COUNT = 5_000
+SAMPLE = 200
+
+
+def seed(count):
+    db.drop_all()
+    db.create_all()
+    ngo = User(username='cert-ngo', email='cert-ngo@example.com', password='x', role='NGO')
+    buyer = User(username='cert-buyer', email='cert-buyer@example.com', password='x', role='buyer')
+    db.session.add_all([ngo, buyer])
+    db.session.commit()
+    start = datetime(2025, 1, 1)
+    ids = range(1, count + 1)
+    db.session.execute(insert(Credit), [
+        {"id": i, "name": f"credit-{i}", "amount": 10, "price": 2.5, "is_active": False, "is_expired": True,
+         "creator_id": ngo.id, "req_status": 1} for i in ids])
+    db.session.execute(insert(PurchasedCredit), [
+        {"id": i, "user_id": buyer.id, "credit_id": i, "amount": 10, "purchase_date": start + timedelta(minutes=i),
+         "is_expired": True, "creator_id": ngo.id} for i in ids])
+    db.session.execute(insert(Transactions), [
+        {"buyer_id": buyer.id, "credit_id": i, "amount": 10, "total_price": 2.5,
+         "timestamp": start + timedelta(minutes=i), "txn_hash": f"0x{i:064x}"} for i in ids])
+    db.session.commit()
+    for i in range(1, count + 1, 10):
+        certificates.precompute(i)
+    return create_access_token(identity=json.dumps({"username": buyer.username, "role": buyer.role}),
+                               additional_claims=user_claims(buyer))
+
+
+def main(count):
+    app = create_app()
+    with app.app_context():
+        token = seed(count)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    archive = tempfile.TemporaryFile()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get('/api/buyer/certificates/export', headers=headers, buffered=False)
+    for chunk in response.response:
+        archive.write(chunk)
+    response.close()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    size = archive.tell()
+    with zipfile.ZipFile(archive) as bundle:
+        assert bundle.testzip() is None, "corrupt archive"
+        names = set(bundle.namelist())
+        manifest = list(csv.DictReader(io.TextIOWrapper(bundle.open('manifest.csv'), encoding='utf-8')))
+    assert len(names) == count + 2, f"{len(names) - 2} certificates for {count} purchases"
+    assert len(manifest) == count and {row['filename'] for row in manifest} == names - {'manifest.csv', 'certificate.css'}
+    assert {int(row['purchase_id']) for row in manifest} == set(range(1, count + 1))
+
+    start = time.perf_counter()
+    for credit_id in range(2, SAMPLE + 2):
+        client.get(f'/api/buyer/download-certificate/{credit_id}', headers=headers)
+    per_call = (time.perf_counter() - start) / SAMPLE
+
+    print(f"{count:,} certificates, {size / 1e6:.1f} MB zip, manifest OK")
+    print(f"bulk export      {count / elapsed:10,.0f} certs/s  {elapsed:6.2f}s  peak {peak / 1e6:.1f} MB (tracemalloc)")
+    print(f"per-credit calls {1 / per_call:10,.0f} certs/s  ~{per_call * count:6.2f}s for all")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
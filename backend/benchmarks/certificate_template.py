@@ -1,4 +1,28 @@
-def generate_certificate_data(purchase_id, user, purchased_credit, credit, transaction):
+"""
+Micro-benchmarks of certificate rendering: the compiled template against
+the inline-styled f-string it replaced.
+
+Reports render time per certificate, the certificate_html payload raw and
+gzipped, and the bytes a client downloads for `count` certificates when the
+shared stylesheet is fetched once instead of repeated inline.
+
+Run from backend/:  python -m benchmarks.certificate_template [count]
+"""
+import gzip
+import sys
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.utilis.certificate_template import CERTIFICATE_CSS
+from app.utilis.simple_certificate import generate_simple_certificate
+
+DEFAULT_COUNT = 1_000
+ROUNDS = 20_000
+
+
+def legacy_certificate(purchase_id, user, purchased_credit, credit, transaction):
+    """Certificate data with the inline-styled f-string, as it was before the template"""
     return {
         "certificate_id": f"CC-{purchase_id}-{user.id}-{credit.id-1}",
         "buyer_name": user.username,
@@ -37,11 +61,6 @@ def generate_certificate_data(purchase_id, user, purchased_credit, credit, trans
                     background: linear-gradient(to right, #3498db, #2ecc71);
                 "></div>
                 
-                <!-- Logo -->
-                <div style="text-align: center; margin-bottom: 20px;">
-                    <img src="https://i.ibb.co/TDn711NW/leaf-8993153.png" alt="Website Logo" style="max-width: 50px; height: auto;">
-                </div>
-
                 <!-- Certificate Content -->
                 <h1 style="
                     font-family: 'Georgia', serif; 
@@ -110,3 +129,32 @@ def generate_certificate_data(purchase_id, user, purchased_credit, credit, trans
             </div>
         """
     }
+
+
+def main(count):
+    user = SimpleNamespace(id=42, username='green-buyer')
+    purchased_credit = SimpleNamespace(amount=10, purchase_date=datetime(2025, 6, 1, 12, 30))
+    credit = SimpleNamespace(id=1234, name='Electrolysis batch 1234', amount=500, price=0.25)
+    transaction = SimpleNamespace(txn_hash='0x' + 'ab' * 32)
+    args = (7, user, purchased_credit, credit, transaction)
+
+    legacy = legacy_certificate(*args)['certificate_html']
+    compiled = generate_simple_certificate(*args)['certificate_html']
+
+    legacy_us = min(timeit.repeat(lambda: legacy_certificate(*args), number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+    compiled_us = min(timeit.repeat(lambda: generate_simple_certificate(*args), number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+
+    def sizes(html):
+        return len(html.encode()), len(gzip.compress(html.encode()))
+
+    css = len(CERTIFICATE_CSS.encode())
+    print(f"{'':<18}{'render us':>10}{'html B':>9}{'gzip B':>9}{f'{count:,} certs KB':>18}")
+    for label, us, html, shared in (('inline f-string', legacy_us, legacy, 0),
+                                    ('compiled template', compiled_us, compiled, css)):
+        raw, packed = sizes(html)
+        print(f"{label:<18}{us:10.2f}{raw:9,}{packed:9,}{(raw * count + shared) / 1e3:18,.1f}")
+    print(f"\nshared stylesheet {css:,} B, fetched once and cached")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
@@ -0,0 +1,118 @@
+"""
+Listing and purchase throughput of full_server.py under N threads, with
+the pooled WAL connections versus a fresh rollback-journal connection
+per call (the previous behaviour).
+
+Run from backend/:  python -m benchmarks.full_server_concurrency [threads] [requests_per_thread]
+
+Works on scratch copies under /tmp; the tracked databases are not touched.
+The view functions are called directly inside a request context because
+the blueprints registered ahead of them own the same URLs.
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+WORKDIR = tempfile.mkdtemp(prefix='h2_full_server_')
+os.environ['FULL_SERVER_DB_PATH'] = os.path.join(WORKDIR, 'pooled.db')
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import full_server
+
+from flask_jwt_extended import create_access_token
+
+LISTED_CREDITS = 200
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    creator = conn.execute("SELECT id FROM users WHERE role = 'NGO'").fetchone()[0]
+    conn.executemany(
+        '''INSERT INTO credits (id, name, description, amount, price, creator_id, is_active, is_verified)
+           VALUES (?, ?, 'benchmark credit', 1000000000, 1.0, ?, 1, 1)''',
+        [(str(uuid.uuid4()), f'credit-{i}', creator) for i in range(LISTED_CREDITS)]
+    )
+    conn.commit()
+    credit_ids = [row[0] for row in conn.execute('SELECT id FROM credits')]
+    conn.close()
+    return credit_ids
+
+
+def baseline_copy():
+    """Rollback-journal copy of the pooled database"""
+    path = os.path.join(WORKDIR, 'baseline.db')
+    src, dst = sqlite3.connect(full_server.DB_PATH), sqlite3.connect(path)
+    src.backup(dst)
+    dst.execute('PRAGMA journal_mode=DELETE')
+    src.close()
+    dst.close()
+    return path
+
+
+def run(threads, per_thread, make_request):
+    errors = []
+
+    def worker(n):
+        for i in range(per_thread):
+            status = make_request(n * per_thread + i)
+            if status >= 400:
+                errors.append(status)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return threads * per_thread / elapsed, len(errors)
+
+
+def main(threads, per_thread):
+    credit_ids = seed(full_server.DB_PATH)
+    with full_server.app.app_context():
+        token = create_access_token(identity=json.dumps({"username": "test_buyer", "role": "buyer"}))
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def call(view, method='GET', body=None):
+        with full_server.app.test_request_context(method=method, headers=headers, json=body):
+            response = full_server.app.make_response(view())
+            status = response.status_code
+        full_server.db_pool.release_thread()
+        return status
+
+    def listing(i):
+        return call(full_server.buyer_credits)
+
+    def purchase(i):
+        return call(full_server.purchase_credit, 'POST',
+                    {"credit_id": credit_ids[i % len(credit_ids)], "amount": 1})
+
+    pooled_get_db = full_server.get_db
+    baseline_path = baseline_copy()
+    modes = [
+        ("fresh connection, rollback journal", lambda: sqlite3.connect(baseline_path)),
+        ("pooled connection, WAL", pooled_get_db),
+    ]
+    print(f"{threads} threads x {per_thread} requests, {LISTED_CREDITS} listed credits\n")
+    for label, get_db in modes:
+        full_server.get_db = get_db
+        for name, make_request in (("listing", listing), ("purchase", purchase)):
+            rate, errors = run(threads, per_thread, make_request)
+            print(f"{label:<36} {name:<9} {rate:9.1f} req/s  errors={errors}")
+    full_server.get_db = pooled_get_db
+    full_server.db_pool.close_all()
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [16, 50][len(args):]))
@@ -0,0 +1,76 @@
+"""
+Matching throughput of the in-memory order book on one core.
+
+Feeds a stream of random limit/market orders and cancels around a drifting
+mid price into MatchingEngine, without a WAL and with the WAL on disk.
+Target: 50k orders/sec.
+
+Run from backend/:  python -m benchmarks.order_book [orders]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.utilis.order_book import BUY, SELL, LIMIT, MARKET, MatchingEngine, OrderWAL
+
+DEFAULT_ORDERS = 200_000
+TARGET_RATE = 50_000
+CLASSES = ['electrolysis', 'wind', 'solar']
+
+
+def make_orders(count, seed=7):
+    rng = random.Random(seed)
+    mid = 10.0
+    orders = []
+    for _ in range(count):
+        mid = max(1.0, mid + rng.uniform(-0.01, 0.01))
+        roll = rng.random()
+        side = BUY if rng.random() < 0.5 else SELL
+        if roll < 0.05:
+            orders.append(('cancel',))
+        elif roll < 0.15:
+            orders.append((rng.choice(CLASSES), side, rng.randint(1, 50), None, MARKET))
+        else:
+            offset = rng.uniform(-0.25, 0.25)
+            price = round(mid + (offset if side == BUY else -offset), 2)
+            orders.append((rng.choice(CLASSES), side, rng.randint(1, 100), price, LIMIT))
+    return orders
+
+
+def run(engine, orders):
+    rng = random.Random(11)
+    fills = 0
+    start = time.perf_counter()
+    for order in orders:
+        if order[0] == 'cancel':
+            if engine.orders:
+                engine.cancel(next(iter(engine.orders)) if rng.random() < 0.5 else next(reversed(engine.orders)))
+            continue
+        fills += len(engine.submit(*order)[1])
+    elapsed = time.perf_counter() - start
+    return len(orders) / elapsed, fills, len(engine.orders)
+
+
+def main(count):
+    orders = make_orders(count)
+    rate, fills, resting = run(MatchingEngine(), orders)
+    print(f"{count:,} orders, {fills:,} fills, {resting:,} resting at the end\n")
+    print(f"in memory      {rate:12,.0f} orders/s  {'OK' if rate >= TARGET_RATE else 'below'} target {TARGET_RATE:,}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        wal = OrderWAL(os.path.join(workdir, 'bench.wal'))
+        rate, _, _ = run(MatchingEngine(wal), orders)
+        size = os.path.getsize(wal.path)
+        print(f"with WAL       {rate:12,.0f} orders/s  {'OK' if rate >= TARGET_RATE else 'below'} target {TARGET_RATE:,}"
+              f"  ({size / 1e6:.1f} MB log)")
+
+        start = time.perf_counter()
+        replayed = MatchingEngine()
+        replayed.replay(OrderWAL(wal.path).replay())
+        print(f"WAL replay     {wal.records / (time.perf_counter() - start):12,.0f} records/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ORDERS)
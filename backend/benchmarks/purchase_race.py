@@ -0,0 +1,122 @@
+"""
+Stress test for /api/buyer/purchase: many buyers race for the same credits
+and every successful purchase is retried with its txn_hash.
+
+Checks that no credit is sold twice, that replays never create another
+Transactions row, and reports the response mix and throughput.
+
+Run from backend/:  python -m benchmarks.purchase_race [buyers] [credits]
+
+Uses a scratch SQLite database unless POSTGRES_URI is set; SELECT ... FOR
+UPDATE only takes effect on PostgreSQL, SQLite relies on the conditional
+UPDATE alone. Exits non-zero if an invariant is violated.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_purchase_race.db')
+os.environ.setdefault('BCRYPT_CALIBRATE', 'false')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+
+from app import create_app, db
+from app.models.credit import Credit
+from app.models.transaction import PurchasedCredit, Transactions
+from app.models.user import User
+from app.utilis.current_user import user_claims
+
+
+def setup(buyers, credits):
+    db.drop_all()
+    db.create_all()
+    ngo = User(username='race-ngo', email='race-ngo@example.com', password='x', role='NGO')
+    users = [User(username=f'race-buyer-{i}', email=f'race{i}@example.com', password='x', role='buyer')
+             for i in range(buyers)]
+    db.session.add_all([ngo] + users)
+    db.session.commit()
+    db.session.add_all([
+        Credit(name=f'race-credit-{i}', amount=10, price=1.0, creator_id=ngo.id, req_status=1, is_active=True)
+        for i in range(credits)
+    ])
+    db.session.commit()
+    tokens = [
+        create_access_token(identity=json.dumps({"username": u.username, "role": u.role}),
+                            additional_claims=user_claims(u))
+        for u in users
+    ]
+    credit_ids = [c.id for c in Credit.query.all()]
+    return tokens, credit_ids
+
+
+def main(buyers, credits):
+    app = create_app()
+    with app.app_context():
+        tokens, credit_ids = setup(buyers, credits)
+
+    statuses = Counter()
+    replays = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(buyers)
+
+    def buyer(n):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[n]}'}
+        order = credit_ids[:]
+        random.Random(n).shuffle(order)
+        barrier.wait()
+        for credit_id in order:
+            body = {"credit_id": credit_id, "txn_hash": f"0x{n:04x}{credit_id:060x}"}
+            response = client.post('/api/buyer/purchase', headers=headers, json=body)
+            with lock:
+                statuses[response.status_code] += 1
+            if response.status_code == 200:
+                retry = client.post('/api/buyer/purchase', headers=headers, json=body)
+                with lock:
+                    replays[(retry.status_code, bool(retry.json and retry.json.get('replayed')))] += 1
+
+    threads = [threading.Thread(target=buyer, args=(n,)) for n in range(buyers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        transactions = db.session.query(func.count(Transactions.id)).scalar()
+        double_sold = (
+            db.session.query(Transactions.credit_id)
+            .group_by(Transactions.credit_id)
+            .having(func.count(Transactions.id) > 1)
+            .count()
+        )
+        holdings = db.session.query(func.count(PurchasedCredit.id)).scalar()
+        still_listed = Credit.query.filter_by(is_active=True).count()
+
+    attempts = buyers * credits
+    print(f"{buyers} buyers x {credits} credits: {attempts} purchase attempts in {elapsed:.2f}s "
+          f"({attempts / elapsed:.0f} req/s)")
+    print(f"purchase responses {dict(statuses)}")
+    print(f"replay responses   {dict(replays)}  (status, replayed)")
+    print(f"transactions {transactions}, holdings {holdings}, double-sold credits {double_sold}, "
+          f"still listed {still_listed}")
+
+    ok = (
+        double_sold == 0
+        and transactions == statuses[200]
+        and holdings == statuses[200]
+        and set(replays) <= {(200, True)}
+    )
+    print("OK: no double-sells, replays idempotent" if ok else "FAILED")
+    return ok
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(0 if main(*(args + [32, 200][len(args):])) else 1)
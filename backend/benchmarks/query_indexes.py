@@ -0,0 +1,202 @@
+"""
+Query plans and latency of each route's hot query, without and with the
+indexes declared on the models.
+
+Seeds `rows` rows (default 1M) across the credit, purchase, transaction and
+verification tables, then runs every query with the secondary indexes
+dropped and again after recreating them.
+
+Run from backend/:  python -m benchmarks.query_indexes [rows]
+
+Uses a scratch SQLite file unless POSTGRES_URI is set; point it at a
+throwaway database, the tables are dropped and recreated.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_query_indexes.db')
+
+from sqlalchemy import insert, select, text
+
+from app import create_app, db
+from app.models.credit import Credit
+from app.models.request import Request
+from app.models.transaction import PurchasedCredit, Transactions
+from app.models.user import User
+from app.models.verification import VerificationDocument, VerificationRequest
+
+DEFAULT_ROWS = 1_000_000
+REPEAT = 20
+BATCH = 50_000
+USERS = 1_000
+
+# Share of the seeded rows per table
+SHARES = [
+    (Credit, 0.30),
+    (PurchasedCredit, 0.20),
+    (Transactions, 0.25),
+    (Request, 0.05),
+    (VerificationRequest, 0.10),
+    (VerificationDocument, 0.10),
+]
+
+
+def _rows_for(model, n, counts, rng):
+    start = datetime(2024, 1, 1)
+    credits = counts.get(Credit, 1)
+    for i in range(1, n + 1):
+        if model is Credit:
+            yield {"id": i, "name": f"credit-{i}", "amount": rng.randint(1, 1000),
+                   "price": round(rng.uniform(1, 500), 2), "is_active": rng.random() < 0.3,
+                   "is_expired": False, "is_verified": rng.random() < 0.5,
+                   "created_at": start + timedelta(minutes=i),
+                   "creator_id": rng.randint(1, USERS), "req_status": rng.randint(1, 2)}
+        elif model is PurchasedCredit:
+            yield {"id": i, "user_id": rng.randint(1, USERS), "credit_id": rng.randint(1, credits),
+                   "amount": rng.randint(1, 1000), "purchase_date": start + timedelta(minutes=i),
+                   "is_expired": rng.random() < 0.1}
+        elif model is Transactions:
+            yield {"id": i, "buyer_id": rng.randint(1, USERS), "credit_id": rng.randint(1, credits),
+                   "amount": rng.randint(1, 1000), "total_price": round(rng.uniform(1, 500), 2),
+                   "timestamp": start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+                   "txn_hash": f"0x{i:064x}"}
+        elif model is Request:
+            yield {"id": i, "credit_id": rng.randint(1, credits), "creator_id": rng.randint(1, USERS),
+                   "score": rng.randint(0, 100)}
+        elif model is VerificationRequest:
+            yield {"id": i, "industry_id": rng.randint(1, USERS), "credit_id": rng.randint(1, credits),
+                   "hydrogen_amount": rng.uniform(10, 10_000), "production_date": start.date(),
+                   "production_method": rng.choice(["electrolysis", "wind", "solar"]),
+                   "energy_source": "renewable",
+                   "status": "pending" if rng.random() < 0.05 else "approved",
+                   "created_at": start + timedelta(minutes=i)}
+        elif model is VerificationDocument:
+            yield {"id": i, "verification_request_id": rng.randint(1, counts[VerificationRequest]),
+                   "document_type": "h2_certificate", "file_path": f"/docs/{i}.pdf",
+                   "file_name": f"{i}.pdf", "file_size": 1024}
+
+
+def seed(rows):
+    rng = random.Random(42)
+    db.drop_all()
+    db.create_all()
+    counts = {model: max(1, int(rows * share)) for model, share in SHARES}
+    with db.engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com",
+             "password": "x", "role": "buyer"} for i in range(1, USERS + 1)
+        ])
+        for model, _ in SHARES:
+            batch = []
+            for row in _rows_for(model, counts[model], counts, rng):
+                batch.append(row)
+                if len(batch) == BATCH:
+                    conn.execute(insert(model), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(model), batch)
+            print(f"  seeded {counts[model]:>9,} {model.__tablename__}")
+    return counts
+
+
+def route_queries(counts):
+    """(route, query) pairs mirroring what each endpoint runs"""
+    user_id, credit_id = 42, counts[Credit] // 2
+    return [
+        ("GET /api/buyer/credits?sort=price_asc",
+         select(Credit).where(Credit.is_active == True).order_by(Credit.price, Credit.id).limit(101)),
+        ("GET /api/buyer/credits?creator=",
+         select(Credit).where(Credit.is_active == True, Credit.creator_id == user_id)
+         .order_by(Credit.id.desc()).limit(101)),
+        ("GET /api/NGO/credits",
+         select(Credit).where(Credit.creator_id == user_id).order_by(Credit.id).limit(101)),
+        ("GET /api/NGO/credits (request score)",
+         select(Request.score).where(Request.credit_id == credit_id).order_by(Request.id).limit(1)),
+        ("GET /api/buyer/purchased",
+         select(PurchasedCredit).where(PurchasedCredit.user_id == user_id)),
+        ("POST /api/buyer/purchase (holder lookup)",
+         select(PurchasedCredit).where(PurchasedCredit.credit_id == credit_id).limit(1)),
+        ("GET /api/buyer/generate-certificate (owned credit)",
+         select(PurchasedCredit).where(PurchasedCredit.credit_id == credit_id,
+                                       PurchasedCredit.user_id == user_id).limit(1)),
+        ("GET /api/buyer/generate-certificate (latest txn)",
+         select(Transactions).where(Transactions.credit_id == credit_id)
+         .order_by(Transactions.timestamp.desc()).limit(1)),
+        ("GET /api/NGO/transactions",
+         select(Transactions).order_by(Transactions.timestamp.desc()).limit(100)),
+        ("buyer transaction history (buyer_id)",
+         select(Transactions).where(Transactions.buyer_id == user_id)),
+        ("GET /api/verification/pending",
+         select(VerificationRequest).where(VerificationRequest.status == 'pending')
+         .order_by(VerificationRequest.id).limit(101)),
+        ("GET /api/verification/industry-status",
+         select(VerificationRequest).where(VerificationRequest.industry_id == user_id)),
+        ("GET /api/verification/industry-status (documents)",
+         select(VerificationDocument).where(VerificationDocument.verification_request_id == 1234)),
+        ("GET /api/NGO/auto-credits (verification join)",
+         select(VerificationRequest).where(VerificationRequest.credit_id == credit_id)),
+    ]
+
+
+def _sql(query):
+    return str(query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def plan(conn, sql):
+    if db.engine.dialect.name == 'sqlite':
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+
+
+def measure(queries):
+    results = {}
+    with db.engine.connect() as conn:
+        for route, query in queries:
+            sql = _sql(query)
+            timings = []
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                conn.execute(text(sql)).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            results[route] = (statistics.median(timings), plan(conn, sql))
+    return results
+
+
+def secondary_indexes():
+    return [index for model, _ in SHARES for index in model.__table__.indexes]
+
+
+def main(rows):
+    app = create_app()
+    with app.app_context():
+        print(f"Seeding {rows:,} rows into {db.engine.url.render_as_string(hide_password=True)}")
+        start = time.perf_counter()
+        counts = seed(rows)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+        queries = route_queries(counts)
+
+        indexes = secondary_indexes()
+        for index in indexes:
+            index.drop(bind=db.engine)
+        before = measure(queries)
+
+        start = time.perf_counter()
+        for index in indexes:
+            index.create(bind=db.engine)
+        print(f"Created {len(indexes)} indexes in {time.perf_counter() - start:.1f}s\n")
+        after = measure(queries)
+
+    for route, _ in queries:
+        (before_ms, before_plan), (after_ms, after_plan) = before[route], after[route]
+        print(f"{route}")
+        print(f"  before {before_ms:9.3f} ms  {' | '.join(before_plan)}")
+        print(f"  after  {after_ms:9.3f} ms  {' | '.join(after_plan)}")
+        print(f"  speedup {before_ms / after_ms:8.1f}x\n")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
@@ -0,0 +1,132 @@
+"""
+Ingest throughput of the streaming telemetry detector on one core.
+
+Generates minute meter readings (energy kWh, H₂ kg) for a set of
+facilities with a small share of injected faults (efficiency jumps and
+energy spikes), folds them into in-memory states a day of readings per call,
+and reports readings/sec and how many injected faults were flagged. Then
+replays a slice through telemetry.ingest(), which reads and writes each
+facility's state row per batch, against a scratch database. Target: 100k
+readings/sec.
+
+Run from backend/:  python -m benchmarks.telemetry_ingest [readings]
+
+Uses a scratch SQLite database unless POSTGRES_URI is set.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_telemetry_ingest.db')
+os.environ.setdefault('BCRYPT_CALIBRATE', 'false')
+
+from app import create_app, db
+from app.utilis import telemetry
+from app.utilis.telemetry import EMPTY_STATE, TelemetryDetector, parse_reading, summarize
+
+DEFAULT_READINGS = 2_000_000
+TARGET_RATE = 100_000
+FACILITIES = 200
+DAY = 24 * 60
+FAULT_RATE = 0.001
+START_MINUTE = 29_000_000  # early 2025
+
+
+class MemoryDetector(TelemetryDetector):
+    """Facility states kept in a dict, to time the fold without the database"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.facilities = {}
+
+    def ingest(self, facility_id, readings):
+        state = self.facilities.setdefault(facility_id, list(EMPTY_STATE))
+        return self.fold(state, readings)
+
+    def summary(self, facility_id):
+        return summarize(self.facilities.get(facility_id))
+
+
+def make_stream(count, seed=5):
+    """{facility_id: [(minute, kwh, kg), ...]} plus the set of faulty (facility, minute)"""
+    rng = random.Random(seed)
+    per_facility = count // FACILITIES
+    streams, faults = {}, set()
+    for facility_id in range(1, FACILITIES + 1):
+        efficiency = rng.uniform(48, 56)
+        load = rng.uniform(200, 1000)
+        readings = []
+        for i in range(per_facility):
+            minute = START_MINUTE + i
+            kwh = max(0.0, rng.gauss(load, load * 0.03))
+            eff = rng.gauss(efficiency, 0.5)
+            if rng.random() < FAULT_RATE and i > DAY:
+                faults.add((facility_id, minute))
+                if rng.random() < 0.5:
+                    eff *= rng.choice((0.6, 1.5))
+                else:
+                    kwh *= 3
+            readings.append((minute, kwh, kwh / eff))
+        streams[facility_id] = readings
+    return streams, faults
+
+
+def run(detector, streams):
+    total = flagged = 0
+    start = time.perf_counter()
+    for offset in range(0, max(len(r) for r in streams.values()), DAY):
+        for facility_id, readings in streams.items():
+            accepted, hits, _ = detector.ingest(facility_id, readings[offset:offset + DAY])
+            total += accepted
+            flagged += hits
+    return total / (time.perf_counter() - start), total, flagged
+
+
+def recall(streams, faults):
+    """Replay facility by facility, recording which faults the detector flagged"""
+    detector = MemoryDetector()
+    caught = 0
+    for facility_id, readings in streams.items():
+        for reading in readings:
+            if detector.ingest(facility_id, (reading,))[1] and (facility_id, reading[0]) in faults:
+                caught += 1
+    return caught
+
+
+def main(count):
+    streams, faults = make_stream(count)
+    detector = MemoryDetector()
+    rate, total, flagged = run(detector, streams)
+    print(f"{total:,} readings from {FACILITIES} facilities, {len(faults):,} injected faults\n")
+    print(f"ingest          {rate:12,.0f} readings/s  {'OK' if rate >= TARGET_RATE else 'below'} target {TARGET_RATE:,}")
+
+    sample = [[r[0] * 60, r[1], r[2]] for r in streams[1][:100_000]]
+    start = time.perf_counter()
+    MemoryDetector().ingest(1, [parse_reading(raw) for raw in sample])
+    both = len(sample) / (time.perf_counter() - start)
+    print(f"parse + ingest  {both:12,.0f} readings/s  (decoded JSON arrays)")
+
+    caught = recall(streams, faults)
+    print(f"flagged         {flagged:12,} readings, {caught:,}/{len(faults):,} injected faults caught")
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        stored = {facility_id: readings[:DAY * 7] for facility_id, readings in streams.items()}
+        rate, total, _ = run(telemetry, stored)
+        same = telemetry.facility_summary(1) == run_memory_summary(stored, 1)
+        print(f"stored state    {rate:12,.0f} readings/s  ({total:,} readings, a state row read and"
+              f" written per day batch; {'state matches' if same else 'STATE DIFFERS'})")
+
+
+def run_memory_summary(streams, facility_id):
+    detector = MemoryDetector()
+    readings = streams[facility_id]
+    for offset in range(0, len(readings), DAY):
+        detector.ingest(facility_id, readings[offset:offset + DAY])
+    return detector.summary(facility_id)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_READINGS)
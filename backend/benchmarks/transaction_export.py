@@ -0,0 +1,112 @@
+"""
+Peak Python memory of the transaction export at growing result sizes.
+
+Seeds `rows` transactions (default 500k) on one NGO's credits, then streams
+/api/NGO/transactions/export as CSV and NDJSON for a quarter, half and all
+of them under tracemalloc, next to the old load-everything-and-jsonify
+approach. The streamed peak should stay flat as the row count grows.
+
+Run from backend/:  python -m benchmarks.transaction_export [rows]
+
+Uses a scratch SQLite file unless POSTGRES_URI is set; point it at a
+throwaway database, the tables are dropped and recreated.
+"""
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault('POSTGRES_URI', 'sqlite:////tmp/h2_transaction_export.db')
+os.environ.setdefault('BCRYPT_CALIBRATE', 'false')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.models.credit import Credit
+from app.models.transaction import Transactions
+from app.models.user import User
+from app.utilis.current_user import user_claims
+
+DEFAULT_ROWS = 500_000
+BATCH = 50_000
+CREDITS = 1000
+START = datetime(2024, 1, 1)
+
+
+def seed(rows):
+    db.drop_all()
+    db.create_all()
+    ngo = User(username='export-ngo', email='ngo@example.com', password='x', role='NGO')
+    db.session.add(ngo)
+    db.session.commit()
+    db.session.execute(insert(Credit), [
+        {"name": f"credit-{i}", "amount": 100, "price": 1.0, "creator_id": ngo.id, "req_status": 2}
+        for i in range(CREDITS)
+    ])
+    db.session.commit()
+    rng = random.Random(3)
+    for offset in range(0, rows, BATCH):
+        db.session.execute(insert(Transactions), [
+            {"buyer_id": rng.randint(1, 1000), "credit_id": rng.randint(1, CREDITS),
+             "amount": rng.randint(1, 100), "total_price": round(rng.uniform(1, 5000), 2),
+             "timestamp": START + timedelta(seconds=i), "txn_hash": f"0x{i:064x}"}
+            for i in range(offset, min(offset + BATCH, rows))
+        ])
+        db.session.commit()
+    return create_access_token(identity=json.dumps({"username": ngo.username, "role": ngo.role}),
+                               additional_claims=user_claims(ngo))
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main(rows):
+    app = create_app()
+    with app.app_context():
+        token = seed(rows)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def streamed(export_format, until):
+        def run():
+            response = client.get(
+                f'/api/NGO/transactions/export?format={export_format}&to={until.isoformat()}',
+                headers=headers, buffered=False)
+            size = sum(len(chunk) for chunk in response.response)
+            response.close()
+            return size
+        return run
+
+    def load_all(until):
+        def run():
+            with app.app_context():
+                data = [{
+                    "id": t.id, "buyer": t.buyer_id, "credit": t.credit_id, "amount": t.amount,
+                    "total_price": t.total_price, "timestamp": t.timestamp.isoformat(), "txn_hash": t.txn_hash
+                } for t in Transactions.query.filter(Transactions.timestamp < until).order_by(Transactions.id)]
+                return len(json.dumps(data))
+        return run
+
+    print(f"{'rows':>10}  {'method':<10} {'MB out':>8} {'seconds':>8} {'peak MB':>8}")
+    for share in (4, 2, 1):
+        count = rows // share
+        until = START + timedelta(seconds=count)
+        for label, fn in (('csv', streamed('csv', until)), ('ndjson', streamed('ndjson', until)),
+                          ('load all', load_all(until))):
+            size, elapsed, peak = measure(fn)
+            print(f"{count:>10,}  {label:<10} {size / 1e6:8.1f} {elapsed:8.2f} {peak / 1e6:8.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS)
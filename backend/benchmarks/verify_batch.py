@@ -0,0 +1,88 @@
+"""
+Benchmark AdvancedH2VerificationModel.verify_batch against the per-record path.
+
+Run from backend/:  python -m benchmarks.verify_batch [rows]
+"""
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.ml_models.h2_verification_model import advanced_h2_model
+
+SAMPLE_ROWS = 10_000
+SCORE_COLUMNS = ['composite_score', 'fraud_probability', 'confidence_level',
+                 'calculated_efficiency', 'efficiency_score', 'is_valid',
+                 'efficiency_rating', 'recommendations', 'next_steps']
+# verify_batch column -> path into the verify_h2_production result
+NESTED_COLUMNS = {
+    'production_score': ('production_validation', 'score'),
+    'energy_score': ('energy_validation', 'score'),
+    'anomaly_score': ('anomaly_detection', 'anomaly_score'),
+    'anomaly_count': ('anomaly_detection', 'anomaly_count'),
+    'anomaly_severity': ('anomaly_detection', 'severity'),
+    'telemetry_anomaly': ('anomaly_detection', 'telemetry_anomaly'),
+    'pattern_score': ('pattern_analysis', 'score'),
+    'risk_score': ('risk_assessment', 'risk_score'),
+    'risk_level': ('risk_assessment', 'risk_level'),
+}
+
+
+def mismatched_columns(result, row):
+    """Columns where a verify_batch row differs from the per-record result"""
+    columns = [col for col in SCORE_COLUMNS if result[col] != row[col]]
+    columns += [col for col, (section, key) in NESTED_COLUMNS.items() if result[section][key] != row[col]]
+    return columns
+
+
+def make_records(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    energy = rng.uniform(0.05, 1200, rows)
+    h2 = energy * 1000 / rng.uniform(25, 80, rows)
+    hours = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24, rows), unit='h')
+    return pd.DataFrame({
+        'energy_mwh': energy,
+        'h2_kg': h2,
+        'production_method': rng.choice(['electrolysis', 'wind'], rows),
+        'location': rng.choice(['unknown', 'plant-a', 'plant-b'], rows),
+        'timestamp': hours.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+
+
+def main(rows):
+    records = make_records(rows)
+    sample = records.head(SAMPLE_ROWS)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        per_record = [
+            advanced_h2_model.verify_h2_production(
+                r.energy_mwh, r.h2_kg, r.production_method,
+                location=r.location, timestamp=r.timestamp
+            )
+            for r in sample.itertuples()
+        ]
+        per_record_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = advanced_h2_model.verify_batch(records)
+        batch_time = time.perf_counter() - start
+
+    mismatches = 0
+    for result, row in zip(per_record, batch.head(len(per_record)).to_dict('records')):
+        if mismatched_columns(result, row):
+            mismatches += 1
+
+    per_record_rate = len(sample) / per_record_time
+    batch_rate = rows / batch_time
+    print(f"per-record: {per_record_rate:,.0f} rows/s ({len(sample)} row sample)")
+    print(f"batch:      {batch_rate:,.0f} rows/s ({rows} rows in {batch_time:.3f}s)")
+    print(f"speedup:    {batch_rate / per_record_rate:.0f}x")
+    print(f"mismatches: {mismatches}/{len(sample)} (scores, labels, flags and recommendations)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
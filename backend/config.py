@@ -20,3 +20,98 @@ class Config:
     REDIS_URL = os.getenv('REDIS_URL',
                           'redis://localhost:6379'
     )
+    # Background job queue (bulk verification submissions)
+    JOB_QUEUE_WORKERS = int(os.getenv('JOB_QUEUE_WORKERS', 4))
+    JOB_QUEUE_CHUNK_SIZE = int(os.getenv('JOB_QUEUE_CHUNK_SIZE', 100))
+    # Job status lives in background_jobs; finished jobs are deleted after this many seconds
+    JOB_QUEUE_RETENTION = int(os.getenv('JOB_QUEUE_RETENTION', 86400))
+    # A queued/running job without progress for this long was lost with its process
+    JOB_QUEUE_STALE_AFTER = int(os.getenv('JOB_QUEUE_STALE_AFTER', 900))
+    VERIFICATION_BATCH_MAX_RECORDS = int(os.getenv('VERIFICATION_BATCH_MAX_RECORDS', 1000))
+    # Serve portfolio analytics from the materialized portfolio_summaries table
+    PORTFOLIO_SUMMARY_ENABLED = os.getenv('PORTFOLIO_SUMMARY_ENABLED', 'false').lower() == 'true'
+    # Web worker processes (gunicorn reads the same variable). Per-process
+    # state that other workers would need to see is refused when above 1
+    WEB_WORKERS = int(os.getenv('WEB_CONCURRENCY', 1))
+    # Cache: Redis when reachable, otherwise an in-process LRU (single worker only)
+    REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 0.5))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.5))
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 300))
+    CACHE_LRU_MAX_ENTRIES = int(os.getenv('CACHE_LRU_MAX_ENTRIES', 4096))
+    # Stampede protection: lock lifetime, how long callers wait on a cold
+    # rebuild, and how long the last good copy is kept for stale reads
+    CACHE_LOCK_TTL = float(os.getenv('CACHE_LOCK_TTL', 10))
+    CACHE_LOCK_WAIT = float(os.getenv('CACHE_LOCK_WAIT', 2))
+    CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 600))
+    MARKETPLACE_SOFT_TTL = int(os.getenv('MARKETPLACE_SOFT_TTL', 30))
+
+    # Process-local LRU of user rows behind load_current_user
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 10000))
+
+    # bcrypt runs on a bounded process pool; the cost is calibrated at
+    # startup to BCRYPT_TARGET_MS per hash, never below BCRYPT_MIN_ROUNDS.
+    # Logins rehash only passwords stored below BCRYPT_MIN_ROUNDS (or
+    # below BCRYPT_LOG_ROUNDS with calibration off)
+    PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', 2))
+    PASSWORD_POOL_MAX_PENDING = int(os.getenv('PASSWORD_POOL_MAX_PENDING', 16))
+    PASSWORD_POOL_TIMEOUT = float(os.getenv('PASSWORD_POOL_TIMEOUT', 10))
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    BCRYPT_CALIBRATE = os.getenv('BCRYPT_CALIBRATE', 'true').lower() == 'true'
+    BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', 250))
+    BCRYPT_MIN_ROUNDS = int(os.getenv('BCRYPT_MIN_ROUNDS', 10))
+
+    # Signup CAPTCHA: 'turnstile' or 'disabled'; pooled session with
+    # timeouts and a circuit breaker in front of the verify endpoint
+    CAPTCHA_BACKEND = os.getenv('CAPTCHA_BACKEND', 'turnstile')
+    CAPTCHA_VERIFY_URL = os.getenv('CAPTCHA_VERIFY_URL', 'https://challenges.cloudflare.com/turnstile/v0/siteverify')
+    CAPTCHA_SECRET_KEY = os.getenv('SECRET_KEY', '1x0000000000000000000000000000000AA')
+    CAPTCHA_CONNECT_TIMEOUT = float(os.getenv('CAPTCHA_CONNECT_TIMEOUT', 1.0))
+    CAPTCHA_READ_TIMEOUT = float(os.getenv('CAPTCHA_READ_TIMEOUT', 2.0))
+    CAPTCHA_POOL_SIZE = int(os.getenv('CAPTCHA_POOL_SIZE', 10))
+    CAPTCHA_BREAKER_THRESHOLD = int(os.getenv('CAPTCHA_BREAKER_THRESHOLD', 5))
+    CAPTCHA_BREAKER_RESET = float(os.getenv('CAPTCHA_BREAKER_RESET', 30))
+
+    # Order book: write-ahead log location, fsync per record, and how many
+    # WAL records accumulate before the books are snapshotted to the DB
+    ORDER_WAL_PATH = os.getenv('ORDER_WAL_PATH', 'order_book.wal')
+    ORDER_WAL_FSYNC = os.getenv('ORDER_WAL_FSYNC', 'false').lower() == 'true'
+    ORDER_SNAPSHOT_EVERY = int(os.getenv('ORDER_SNAPSHOT_EVERY', 1000))
+
+    # Market data: in-memory OHLCV series are reloaded from market_candles
+    # after this many seconds to pick up trades from other workers
+    MARKET_DATA_REFRESH = float(os.getenv('MARKET_DATA_REFRESH', 30))
+
+    # The NGO transaction feed (?since=) assumes a transaction commits within
+    # this many seconds of being written, and re-checks newer ids until then
+    TRANSACTION_FEED_WINDOW = int(os.getenv('TRANSACTION_FEED_WINDOW', 60))
+    # At most this many recent ids ride in the since-cursor, which travels in the
+    # query string; past it the floor moves up over the oldest of them
+    TRANSACTION_FEED_MAX_SEEN = int(os.getenv('TRANSACTION_FEED_MAX_SEEN', 200))
+
+    # Rows fetched per round trip by the streaming transaction export
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 2000))
+
+    # Certificate rendering for bulk exports: worker processes and
+    # certificates handed to a worker per task
+    CERT_RENDER_WORKERS = int(os.getenv('CERT_RENDER_WORKERS', 2))
+    CERT_RENDER_CHUNK = int(os.getenv('CERT_RENDER_CHUNK', 64))
+
+    # PDF certificates (WeasyPrint): worker processes, renders queued at
+    # most, and where finished PDFs are cached by content hash
+    CERT_PDF_ENABLED = os.getenv('CERT_PDF_ENABLED', 'true').lower() == 'true'
+    CERT_PDF_WORKERS = int(os.getenv('CERT_PDF_WORKERS', 2))
+    CERT_PDF_MAX_PENDING = int(os.getenv('CERT_PDF_MAX_PENDING', 64))
+    CERT_PDF_CACHE_DIR = os.getenv('CERT_PDF_CACHE_DIR', 'certificate_cache')
+
+    # Weight of the newest approval in a producer's efficiency EWMA
+    # (0.2 tracks roughly the last 10 approved requests)
+    BASELINE_EWMA_ALPHA = float(os.getenv('BASELINE_EWMA_ALPHA', 0.2))
+
+    # Meter telemetry: EWMA weight per minute reading (0.01 ~ the last
+    # 100 minutes), z-score that flags a reading, readings before flagging
+    # starts, and the largest JSON (non-NDJSON) upload, which is parsed whole
+    TELEMETRY_ALPHA = float(os.getenv('TELEMETRY_ALPHA', 0.01))
+    TELEMETRY_Z_THRESHOLD = float(os.getenv('TELEMETRY_Z_THRESHOLD', 4.0))
+    TELEMETRY_WARMUP = int(os.getenv('TELEMETRY_WARMUP', 30))
+    TELEMETRY_JSON_MAX_BYTES = int(os.getenv('TELEMETRY_JSON_MAX_BYTES', 1 << 20))
@@ -21,6 +21,8 @@ CORS(app)
 from app.routes.NGO_routes import NGO_bp
 from app.routes.buyer_routes import buyer_bp
 from app.routes.verification_routes import verification_bp
+from app.utilis.sqlite_pool import SQLitePool
+from app.utilis.pagination import page_args, split_page, with_next_cursor
 
 # Register blueprints
 app.register_blueprint(NGO_bp)
@@ -33,16 +35,31 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 jwt = JWTManager(app)
 
 # Setup SQLite database
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'carbon_credit_full.db')
+DB_PATH = os.environ.get(
+    'FULL_SERVER_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'carbon_credit_full.db')
+)
 UPLOADS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 
 # Ensure uploads directory exists
 if not os.path.exists(UPLOADS_FOLDER):
     os.makedirs(UPLOADS_FOLDER)
 
+# Pooled connections (WAL, synchronous=NORMAL, mmap), reused across requests
+db_pool = SQLitePool(DB_PATH, max_connections=int(os.environ.get('SQLITE_POOL_SIZE', 16)))
+
+def get_db():
+    """Pooled connection for the current thread; conn.close() hands it back"""
+    return db_pool.connect()
+
+@app.teardown_request
+def release_db(exc):
+    """Return a connection left checked out by a failed request"""
+    db_pool.release_thread()
+
 def init_db():
     """Initialize database tables"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     cursor = conn.cursor()
     
     # Create users table
@@ -125,6 +142,10 @@ def init_db():
     )
     ''')
     
+    # Purchased-credits page: keyset on user_credits, certificate lookup by (user_id, credit_id)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_user_credits_user_id ON user_credits (user_id, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_certificates_user_credit ON certificates (user_id, credit_id)')
+    
     # Generate test password hashes
     password = 'sepolia'
     password_hash = generate_password_hash(password)
@@ -171,7 +192,7 @@ init_db()
 # Helper functions
 def get_user_by_username(username):
     """Get user by username"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
@@ -181,7 +202,7 @@ def get_user_by_username(username):
 
 def get_user_by_id(user_id):
     """Get user by ID"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
@@ -191,7 +212,7 @@ def get_user_by_id(user_id):
 
 def create_dummy_credit(creator_id, name="Forest Carbon Credit", amount=100, price=0.1):
     """Create a dummy credit for testing"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     cursor = conn.cursor()
     
     credit_id = str(uuid.uuid4())
@@ -223,7 +244,7 @@ def test_users():
     """List all test users in the database"""
     debug_log("Test users endpoint called")
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -248,7 +269,7 @@ def signup():
     if data['role'] not in ['buyer', 'NGO']:
         return jsonify({"message": "Invalid role"}), 400
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     cursor = conn.cursor()
     
     # Check if username or email already exists
@@ -292,7 +313,7 @@ def login():
         debug_log("Missing required fields")
         return jsonify({"message": "Missing required fields"}), 400
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -338,7 +359,7 @@ def get_profile():
     """Get user profile"""
     current_user = json.loads(get_jwt_identity())
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -371,7 +392,7 @@ def ngo_credits():
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized - Only NGOs can access this endpoint"}), 403
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -407,7 +428,7 @@ def ngo_credits():
         if user:
             credit_id = create_dummy_credit(user['id'])
             # Fetch the newly created credit
-            conn = sqlite3.connect(DB_PATH)
+            conn = get_db()
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM credits WHERE id = ?', (credit_id,))
@@ -447,7 +468,7 @@ def create_ngo_credit():
     if not data or 'name' not in data or 'amount' not in data or 'price' not in data:
         return jsonify({"message": "Missing required fields"}), 400
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -482,7 +503,7 @@ def create_ngo_credit():
 @jwt_required(optional=True)
 def buyer_credits():
     """Get all available credits for buyers"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -516,7 +537,7 @@ def buyer_credits():
 @jwt_required(optional=True)
 def get_credit_details(credit_id):
     """Get details of a specific credit"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -570,7 +591,7 @@ def purchase_credit():
     if not isinstance(amount, int) or amount <= 0:
         return jsonify({"message": "Amount must be a positive integer"}), 400
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -655,7 +676,7 @@ def get_purchased_credits():
     if current_user.get('role') != 'buyer':
         return jsonify({"message": "Unauthorized - Only buyers can access this endpoint"}), 403
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -667,41 +688,53 @@ def get_purchased_credits():
         conn.close()
         return jsonify({"message": "User not found"}), 404
     
-    # Get all purchased credits
-    cursor.execute('''
-    SELECT uc.*, c.name, c.description, c.price, u.username as seller_name
+    try:
+        limit, page_cursor = page_args()
+    except ValueError as e:
+        conn.close()
+        return jsonify({"message": str(e)}), 400
+    
+    # One page of purchased credits; certificate presence comes from the same query
+    params = [buyer['id']]
+    after = ''
+    if page_cursor:
+        after = 'AND uc.id > ?'
+        params.append(page_cursor[0])
+    cursor.execute(f'''
+    SELECT uc.*, c.name, c.description, c.price, u.username as seller_name,
+           EXISTS (
+               SELECT 1 FROM certificates cert
+               WHERE cert.user_id = uc.user_id AND cert.credit_id = uc.credit_id
+           ) AS has_certificate
     FROM user_credits uc
     JOIN credits c ON uc.credit_id = c.id
     JOIN users u ON c.creator_id = u.id
-    WHERE uc.user_id = ?
-    ''', (buyer['id'],))
-    
-    credits = []
-    for row in cursor.fetchall():
-        # Check if certificate exists
-        cursor.execute(
-            'SELECT id FROM certificates WHERE user_id = ? AND credit_id = ?',
-            (buyer['id'], row['credit_id'])
-        )
-        certificate = cursor.fetchone()
-        
-        credits.append({
-            "id": row['id'],
-            "credit_id": row['credit_id'],
-            "name": row['name'],
-            "description": row['description'],
-            "amount": row['amount'],
-            "price": row['price'],
-            "seller_name": row['seller_name'],
-            "purchase_date": row['purchase_date'],
-            "is_on_sale": bool(row['is_on_sale']),
-            "sale_price": row['sale_price'],
-            "has_certificate": certificate is not None
-        })
-    
+    WHERE uc.user_id = ? {after}
+    ORDER BY uc.id
+    LIMIT ?
+    ''', (*params, limit + 1))
+    rows, next_cursor = split_page(cursor.fetchall(), limit, key=lambda row: [row['id']])
     conn.close()
     
-    return jsonify(credits), 200
+    def generate():
+        yield '['
+        for i, row in enumerate(rows):
+            yield (',' if i else '') + json.dumps({
+                "id": row['id'],
+                "credit_id": row['credit_id'],
+                "name": row['name'],
+                "description": row['description'],
+                "amount": row['amount'],
+                "price": row['price'],
+                "seller_name": row['seller_name'],
+                "purchase_date": row['purchase_date'],
+                "is_on_sale": bool(row['is_on_sale']),
+                "sale_price": row['sale_price'],
+                "has_certificate": bool(row['has_certificate'])
+            })
+        yield ']'
+    
+    return with_next_cursor(Response(generate(), mimetype='application/json'), next_cursor), 200
 
 @app.route('/api/NGO/transactions', methods=['GET'])
 @jwt_required()
@@ -712,7 +745,7 @@ def get_ngo_transactions():
     if current_user.get('role') != 'NGO':
         return jsonify({"message": "Unauthorized - Only NGOs can access this endpoint"}), 403
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -779,7 +812,7 @@ def generate_certificate(credit_id):
     if current_user.get('role') != 'buyer':
         return jsonify({"message": "Unauthorized - Only buyers can generate certificates"}), 403
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
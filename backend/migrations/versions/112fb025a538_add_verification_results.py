@@ -0,0 +1,36 @@
+"""add verification results
+
+Revision ID: 112fb025a538
+Revises: ed981b9d0f78
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '112fb025a538'
+down_revision = 'ed981b9d0f78'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('verification_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('verification_request_id', sa.Integer(), nullable=False),
+    sa.Column('model_version', sa.String(length=20), nullable=False),
+    sa.Column('is_valid', sa.Boolean(), nullable=False),
+    sa.Column('composite_score', sa.Float(), nullable=False),
+    sa.Column('fraud_probability', sa.Float(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['verification_request_id'], ['verification_requests.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('verification_request_id', 'model_version', name='uq_verification_result_version')
+    )
+
+
+def downgrade():
+    op.drop_table('verification_results')
@@ -0,0 +1,28 @@
+"""add marketplace listing indexes
+
+Revision ID: 3c7d1e9a4b52
+Revises: 90e04ebbc69f
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7d1e9a4b52'
+down_revision = '90e04ebbc69f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('credits', schema=None) as batch_op:
+        batch_op.create_index('ix_credits_is_active_price_id', ['is_active', 'price', 'id'], unique=False)
+        batch_op.create_index('ix_credits_creator_id_id', ['creator_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('credits', schema=None) as batch_op:
+        batch_op.drop_index('ix_credits_creator_id_id')
+        batch_op.drop_index('ix_credits_is_active_price_id')
@@ -0,0 +1,27 @@
+"""add unique txn_hash
+
+Revision ID: 5a1c9d7e2f60
+Revises: b8e2f6a0c413
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1c9d7e2f60'
+down_revision = 'b8e2f6a0c413'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fails if duplicate txn_hash rows already exist; remove them first
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('uq_transactions_txn_hash', ['txn_hash'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('uq_transactions_txn_hash')
@@ -0,0 +1,36 @@
+"""add market candles
+
+Revision ID: 7d3b5f1a9c24
+Revises: e4f7a2b9c816
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3b5f1a9c24'
+down_revision = 'e4f7a2b9c816'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('market_candles',
+    sa.Column('production_method', sa.String(length=50), nullable=False),
+    sa.Column('interval', sa.String(length=2), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('open', sa.Float(), nullable=False),
+    sa.Column('high', sa.Float(), nullable=False),
+    sa.Column('low', sa.Float(), nullable=False),
+    sa.Column('close', sa.Float(), nullable=False),
+    sa.Column('volume', sa.Integer(), nullable=False),
+    sa.Column('notional', sa.Float(), nullable=False),
+    sa.Column('trades', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('production_method', 'interval', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('market_candles')
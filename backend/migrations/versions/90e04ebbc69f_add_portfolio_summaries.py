@@ -0,0 +1,34 @@
+"""add portfolio summaries
+
+Revision ID: 90e04ebbc69f
+Revises: 112fb025a538
+Create Date: 2026-10-18 08:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '90e04ebbc69f'
+down_revision = '112fb025a538'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('portfolio_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('credits_count', sa.Integer(), nullable=False),
+    sa.Column('expired_count', sa.Integer(), nullable=False),
+    sa.Column('total_invested', sa.Float(), nullable=False),
+    sa.Column('current_value', sa.Float(), nullable=False),
+    sa.Column('hydrogen_offset', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('portfolio_summaries')
@@ -0,0 +1,27 @@
+"""add certificate template version
+
+Revision ID: a7d3e5f1c924
+Revises: f3b9d2c7a1e8
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e5f1c924'
+down_revision = 'f3b9d2c7a1e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing renders have no version and are re-rendered on their next request
+    with op.batch_alter_table('certificate_renders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('template_version', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('certificate_renders', schema=None) as batch_op:
+        batch_op.drop_column('template_version')
@@ -0,0 +1,40 @@
+"""add facility telemetry
+
+Revision ID: b4e8c1f6d237
+Revises: a7d3e5f1c924
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8c1f6d237'
+down_revision = 'a7d3e5f1c924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('facility_telemetry',
+    sa.Column('facility_id', sa.Integer(), nullable=False),
+    sa.Column('last_minute', sa.BigInteger(), nullable=False),
+    sa.Column('readings', sa.Integer(), nullable=False),
+    sa.Column('eff_readings', sa.Integer(), nullable=False),
+    sa.Column('eff_mean', sa.Float(), nullable=False),
+    sa.Column('eff_var', sa.Float(), nullable=False),
+    sa.Column('kwh_mean', sa.Float(), nullable=False),
+    sa.Column('kwh_var', sa.Float(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.Column('flagged', sa.Integer(), nullable=False),
+    sa.Column('kwh_total', sa.Float(), nullable=False),
+    sa.Column('kg_total', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['facility_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('facility_id')
+    )
+
+
+def downgrade():
+    op.drop_table('facility_telemetry')
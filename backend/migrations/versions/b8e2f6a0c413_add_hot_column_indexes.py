@@ -0,0 +1,60 @@
+"""add hot column indexes
+
+Revision ID: b8e2f6a0c413
+Revises: 3c7d1e9a4b52
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2f6a0c413'
+down_revision = '3c7d1e9a4b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('purchased_credits', schema=None) as batch_op:
+        batch_op.create_index('ix_purchased_credits_user_id_credit_id', ['user_id', 'credit_id'], unique=False)
+        batch_op.create_index('ix_purchased_credits_credit_id', ['credit_id'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_timestamp', ['timestamp'], unique=False)
+        batch_op.create_index('ix_transactions_credit_id_timestamp', ['credit_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_transactions_buyer_id', ['buyer_id'], unique=False)
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.create_index('ix_requests_credit_id', ['credit_id'], unique=False)
+
+    with op.batch_alter_table('verification_requests', schema=None) as batch_op:
+        batch_op.create_index('ix_verification_requests_status_id', ['status', 'id'], unique=False)
+        batch_op.create_index('ix_verification_requests_industry_id', ['industry_id'], unique=False)
+        batch_op.create_index('ix_verification_requests_credit_id', ['credit_id'], unique=False)
+
+    with op.batch_alter_table('verification_documents', schema=None) as batch_op:
+        batch_op.create_index('ix_verification_documents_verification_request_id', ['verification_request_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('verification_documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_verification_documents_verification_request_id')
+
+    with op.batch_alter_table('verification_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_verification_requests_credit_id')
+        batch_op.drop_index('ix_verification_requests_industry_id')
+        batch_op.drop_index('ix_verification_requests_status_id')
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_requests_credit_id')
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_buyer_id')
+        batch_op.drop_index('ix_transactions_credit_id_timestamp')
+        batch_op.drop_index('ix_transactions_timestamp')
+
+    with op.batch_alter_table('purchased_credits', schema=None) as batch_op:
+        batch_op.drop_index('ix_purchased_credits_credit_id')
+        batch_op.drop_index('ix_purchased_credits_user_id_credit_id')
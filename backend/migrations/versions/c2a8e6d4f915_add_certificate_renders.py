@@ -0,0 +1,31 @@
+"""add certificate renders
+
+Revision ID: c2a8e6d4f915
+Revises: 7d3b5f1a9c24
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a8e6d4f915'
+down_revision = '7d3b5f1a9c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('certificate_renders',
+    sa.Column('purchase_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['purchase_id'], ['purchased_credits.id'], ),
+    sa.PrimaryKeyConstraint('purchase_id')
+    )
+
+
+def downgrade():
+    op.drop_table('certificate_renders')
@@ -0,0 +1,48 @@
+"""add background jobs
+
+Revision ID: c9f1a3e7b5d2
+Revises: b4e8c1f6d237
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f1a3e7b5d2'
+down_revision = 'b4e8c1f6d237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('background_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('counts', sa.JSON(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_background_jobs_finished_at', 'background_jobs', ['finished_at'], unique=False)
+    op.create_table('background_job_chunks',
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('start_index', sa.Integer(), nullable=False),
+    sa.Column('results', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['background_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'start_index')
+    )
+
+
+def downgrade():
+    op.drop_table('background_job_chunks')
+    op.drop_index('ix_background_jobs_finished_at', table_name='background_jobs')
+    op.drop_table('background_jobs')
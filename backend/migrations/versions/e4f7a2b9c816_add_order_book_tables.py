@@ -0,0 +1,70 @@
+"""add order book tables
+
+Revision ID: e4f7a2b9c816
+Revises: 5a1c9d7e2f60
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4f7a2b9c816'
+down_revision = '5a1c9d7e2f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_book_orders',
+    sa.Column('id', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('credit_class', sa.String(length=50), nullable=False),
+    sa.Column('side', sa.String(length=4), nullable=False),
+    sa.Column('price_ticks', sa.BigInteger(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_book_orders', schema=None) as batch_op:
+        batch_op.create_index('ix_order_book_orders_class_side_price', ['credit_class', 'side', 'price_ticks', 'id'], unique=False)
+
+    op.create_table('order_book_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), nullable=False),
+    sa.Column('snapshot_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.create_table('order_fills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('credit_class', sa.String(length=50), nullable=False),
+    sa.Column('maker_order_id', sa.BigInteger(), nullable=False),
+    sa.Column('taker_order_id', sa.BigInteger(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.Integer(), nullable=True),
+    sa.Column('seller_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['buyer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('order_fills', schema=None) as batch_op:
+        batch_op.create_index('ix_order_fills_class_created_at', ['credit_class', 'created_at'], unique=False)
+        batch_op.create_index('ix_order_fills_taker_order_id', ['taker_order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_fills', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_fills_taker_order_id')
+        batch_op.drop_index('ix_order_fills_class_created_at')
+
+    op.drop_table('order_fills')
+    op.drop_table('order_book_state')
+    with op.batch_alter_table('order_book_orders', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_book_orders_class_side_price')
+
+    op.drop_table('order_book_orders')
@@ -0,0 +1,28 @@
+"""add credit verification columns
+
+Revision ID: ed981b9d0f78
+Revises: 
+Create Date: 2026-10-18 07:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed981b9d0f78'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('credits', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_verified', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('credits', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('is_verified')
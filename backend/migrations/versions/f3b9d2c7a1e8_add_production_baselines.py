@@ -0,0 +1,34 @@
+"""add production baselines
+
+Revision ID: f3b9d2c7a1e8
+Revises: c2a8e6d4f915
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d2c7a1e8'
+down_revision = 'c2a8e6d4f915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('production_baselines',
+    sa.Column('producer_id', sa.Integer(), nullable=False),
+    sa.Column('production_method', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('ewma', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['producer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('producer_id', 'production_method')
+    )
+
+
+def downgrade():
+    op.drop_table('production_baselines')
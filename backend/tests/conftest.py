@@ -0,0 +1,120 @@
+"""
+Fixtures for the backend tests: one app on a scratch SQLite database in a
+temporary directory, with every table, the order book, the cache and the
+process-local user/market caches reset before each test.
+
+Run from backend/:  python -m pytest -q
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from flask.testing import FlaskClient
+from sqlalchemy import event
+
+_workdir = tempfile.mkdtemp(prefix='h2-tests-')
+os.environ['POSTGRES_URI'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['ORDER_WAL_PATH'] = os.path.join(_workdir, 'order_book.wal')
+os.environ['CERT_PDF_CACHE_DIR'] = os.path.join(_workdir, 'certificate_cache')
+os.environ['REDIS_URL'] = 'redis://127.0.0.1:1'  # unreachable: the in-process LRU is used
+os.environ['BCRYPT_CALIBRATE'] = 'false'
+os.environ['CERT_PDF_ENABLED'] = 'false'
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models.credit import Credit  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utilis import cache, current_user, market_data, order_book  # noqa: E402
+
+
+class RequestClient(FlaskClient):
+    """Test client giving each request its own app context (and so its own g and DB session)"""
+
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.test_client_class = RequestClient
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        open(app.config['ORDER_WAL_PATH'], 'w').close()
+        order_book.init_order_book(app)
+        cache.init_cache(app, client=cache.LRUCache())
+        current_user._users.clear()
+        market_data._series.clear()
+        market_data._methods.update(loaded_at=None, names=set())
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user():
+    count = [0]
+
+    def make(role='buyer', username=None):
+        count[0] += 1
+        username = username or f'{role.lower()}-{count[0]}'
+        user = User(username=username, email=f'{username}@example.com', password='x', role=role)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_credit():
+    def make(creator, amount=10, price=1.0, **fields):
+        fields.setdefault('req_status', 1)
+        credit = Credit(name=f'credit-{creator.id}', amount=amount, price=price, creator_id=creator.id, **fields)
+        db.session.add(credit)
+        db.session.commit()
+        return credit
+    return make
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements run inside it"""
+    @contextmanager
+    def count():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return count
+
+
+def auth_headers(user):
+    token = create_access_token(identity=json.dumps({"username": user.username, "role": user.role}),
+                                additional_claims=current_user.user_claims(user))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def auth():
+    return auth_headers
@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models.credit import Credit
+from app.models.verification import ProductionBaseline, VerificationRequest
+from app.utilis.baselines import baseline_for, rebuild_baselines
+from config import Config
+
+
+def add_request(producer, energy_mwh, h2_kg, method='electrolysis', status='pending'):
+    request = VerificationRequest(industry_id=producer.id, hydrogen_amount=h2_kg, energy_source_mwh=energy_mwh,
+                                  production_date=date(2025, 1, 1), production_method=method,
+                                  energy_source='solar', status=status)
+    db.session.add(request)
+    db.session.commit()
+    return request
+
+
+def expected(values):
+    count, mean = len(values), sum(values) / len(values)
+    m2 = sum((v - mean) ** 2 for v in values)
+    ewma = values[0]
+    for v in values[1:]:
+        ewma += Config.BASELINE_EWMA_ALPHA * (v - ewma)
+    return count, mean, m2, ewma
+
+
+def test_approvals_fold_into_the_baseline(make_user):
+    producer = make_user('NGO')
+    figures = [(5.0, 100.0), (5.5, 100.0), (4.8, 100.0), (6.0, 110.0)]
+    for energy_mwh, h2_kg in figures:
+        request = add_request(producer, energy_mwh, h2_kg)
+        request.status = 'approved'
+        db.session.commit()
+    add_request(producer, 9.0, 100.0)                       # never approved
+    add_request(producer, 9.0, 100.0, method='reforming', status='rejected')
+
+    row = db.session.get(ProductionBaseline, (producer.id, 'electrolysis'))
+    count, mean, m2, ewma = expected([e * 1000 / h for e, h in figures])
+    assert row.count == count
+    assert row.mean == pytest.approx(mean)
+    assert row.m2 == pytest.approx(m2)
+    assert row.ewma == pytest.approx(ewma)
+    assert baseline_for(producer.id, 'electrolysis')['std'] == pytest.approx((m2 / (count - 1)) ** 0.5)
+    assert baseline_for(producer.id, 'reforming') is None
+
+
+def test_rebuild_matches_the_incremental_rows(make_user):
+    producers = [make_user('NGO'), make_user('NGO')]
+    for i in range(12):
+        add_request(producers[i % 2], 4.0 + i * 0.1, 90.0 + i, method=('pem', 'alkaline')[i % 3 == 0],
+                    status='approved')
+    add_request(producers[0], None, 100.0, status='approved')  # no energy figure, no efficiency
+    incremental = {(r.producer_id, r.production_method): (r.count, r.mean, r.m2, r.ewma)
+                   for r in ProductionBaseline.query}
+
+    assert rebuild_baselines() == len(incremental)
+    db.session.expire_all()
+    for row in ProductionBaseline.query:
+        assert (row.count, row.mean, row.m2, row.ewma) == pytest.approx(
+            incremental[(row.producer_id, row.production_method)])
+
+
+def test_manual_approval_creates_the_credit_and_folds_the_baseline(client, make_user, auth):
+    producer, reviewer = make_user('NGO'), make_user('NGO')
+    request = add_request(producer, 5.2, 100.0)
+
+    response = client.post(f'/api/verification/{request.id}/approve', json={"notes": "checked"},
+                           headers=auth(reviewer))
+
+    assert response.status_code == 200
+    credit = db.session.get(Credit, response.get_json()['credit_id'])
+    assert (credit.creator_id, credit.req_status, credit.is_active, credit.amount) == (producer.id, 2, True, 100)
+    assert baseline_for(producer.id, 'electrolysis')['mean'] == pytest.approx(52.0)
+    again = client.post(f'/api/verification/{request.id}/approve', json={}, headers=auth(reviewer))
+    assert again.status_code == 400
+    assert baseline_for(producer.id, 'electrolysis')['count'] == 1
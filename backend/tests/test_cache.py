@@ -0,0 +1,85 @@
+import threading
+import time
+
+from app.utilis import cache
+from config import Config
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    calls = []
+
+    def load():
+        calls.append(1)
+        if len(calls) == 1:
+            # A write commits and invalidates while this value is being built
+            cache.invalidate(cache.PORTFOLIO, 7)
+        return len(calls)
+
+    assert cache.cached_json(cache.PORTFOLIO, 7, 'summary', load) == 1
+    assert cache.cached_json(cache.PORTFOLIO, 7, 'summary', load) == 2
+    assert cache.cached_json(cache.PORTFOLIO, 7, 'summary', load) == 2
+
+
+def test_invalidation_is_scoped():
+    cache.cached_json(cache.PURCHASED, 1, 'list', lambda: 'one')
+    cache.cached_json(cache.PURCHASED, 2, 'list', lambda: 'two')
+
+    cache.invalidate(cache.PURCHASED, 1)
+
+    assert cache.cached_json(cache.PURCHASED, 1, 'list', lambda: 'reloaded') == 'reloaded'
+    assert cache.cached_json(cache.PURCHASED, 2, 'list', lambda: 'reloaded') == 'two'
+
+
+def test_purchase_invalidates_the_buyers_cached_list(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, is_active=True)
+
+    assert client.get('/api/buyer/purchased', headers=auth(buyer)).get_json() == []
+    client.post('/api/buyer/purchase', json={"credit_id": credit.id, "txn_hash": '0x1'}, headers=auth(buyer))
+
+    assert [c['id'] for c in client.get('/api/buyer/purchased', headers=auth(buyer)).get_json()] == [credit.id]
+
+
+def test_no_process_local_cache_with_several_workers(app, monkeypatch):
+    monkeypatch.setattr(Config, 'WEB_WORKERS', 4)
+
+    assert cache.init_cache(app) is None
+    assert cache.make_key(cache.MARKETPLACE, 'all') is None
+    assert cache.cached_json(cache.MARKETPLACE, 'all', 'page', lambda: 'fresh') == 'fresh'
+
+
+def test_cold_misses_coalesce_onto_one_rebuild():
+    calls = []
+    results = []
+    start = threading.Barrier(10)
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'listing'
+
+    def read():
+        start.wait()
+        results.append(cache.single_flight_json(cache.MARKETPLACE, 'all', 'page', load))
+
+    threads = [threading.Thread(target=read) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ['listing'] * 10
+
+
+def test_stale_copy_is_served_while_another_caller_rebuilds():
+    assert cache.single_flight_json(cache.MARKETPLACE, 'all', 'page', lambda: 'old') == 'old'
+    cache.invalidate(cache.MARKETPLACE)
+    lock_key = f"{cache.make_key(cache.MARKETPLACE, 'all', 'page')}:lock"
+    token = cache._acquire_lock(lock_key)
+
+    assert cache.single_flight_json(cache.MARKETPLACE, 'all', 'page', lambda: 'new') == 'old'
+
+    cache._release_lock(lock_key, token)
+    assert cache.single_flight_json(cache.MARKETPLACE, 'all', 'page', lambda: 'new') == 'new'
+    assert cache.single_flight_json(cache.MARKETPLACE, 'all', 'page', lambda: 'newer') == 'new'
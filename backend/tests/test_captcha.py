@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.utilis import captcha
+from app.utilis.captcha import CaptchaUnavailable, CircuitBreaker, TurnstileVerifier
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    hits = 0
+
+    def do_POST(self):
+        type(self).hits += 1
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        time.sleep(self.delay)
+        body = json.dumps({"success": form['response'] == ['good']}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    StubHandler.delay, StubHandler.hits = 0.0, 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/siteverify"
+    server.shutdown()
+    server.server_close()
+    captcha.set_verifier(None)
+
+
+def verifier(url, threshold=2, reset_after=30):
+    return TurnstileVerifier(url, 'secret', 0.5, 0.2, 2, CircuitBreaker(threshold, reset_after))
+
+
+def test_tokens_are_checked_upstream(stub):
+    turnstile = verifier(stub)
+    assert turnstile.verify('good') is True
+    assert turnstile.verify('bad') is False
+    assert StubHandler.hits == 2
+
+
+def test_slow_upstream_is_bounded_and_trips_the_breaker(stub):
+    StubHandler.delay = 1.0
+    turnstile = verifier(stub, threshold=2)
+
+    start = time.monotonic()
+    for _ in range(2):
+        with pytest.raises(CaptchaUnavailable):
+            turnstile.verify('good')
+    assert time.monotonic() - start < 1.5
+    assert turnstile.breaker.state == 'open'
+
+    # Open circuit: refused without calling upstream
+    hits = StubHandler.hits
+    with pytest.raises(CaptchaUnavailable):
+        turnstile.verify('good')
+    assert StubHandler.hits == hits
+
+
+def test_breaker_lets_one_trial_through_after_the_reset():
+    breaker = CircuitBreaker(threshold=1, reset_after=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == 'half-open'
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_signup_answers_503_while_the_verifier_is_down(client, stub):
+    StubHandler.delay = 1.0
+    captcha.set_verifier(verifier(stub))
+
+    response = client.post('/api/signup', json={"username": "new", "email": "new@example.com", "password": "pw",
+                                                "role": "buyer", "cf-turnstile-response": "good"})
+
+    assert response.status_code == 503
@@ -0,0 +1,147 @@
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import db
+from app.models.certificate import CertificateRender
+from app.utilis import certificate_pdf
+from app.utilis.certificate_template import CSS_VERSION, TEMPLATE_VERSION
+from config import Config
+
+
+def expired_purchase(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, is_active=True)
+    client.post('/api/buyer/purchase', json={"credit_id": credit.id, "txn_hash": '0xcert'}, headers=auth(buyer))
+    credit.is_expired = True
+    db.session.commit()
+    return buyer, credit
+
+
+def test_generate_answers_304_for_the_current_etag(client, make_user, make_credit, auth):
+    buyer, credit = expired_purchase(client, make_user, make_credit, auth)
+    url = f'/api/buyer/generate-certificate/{credit.id}'
+
+    first = client.get(url, headers=auth(buyer))
+    assert first.status_code == 200 and first.get_json()['credit_name'] == credit.name
+    etag = first.headers['ETag']
+
+    again = client.get(url, headers={'If-None-Match': etag, **auth(buyer)})
+    assert again.status_code == 304 and again.data == b''
+    assert again.headers['ETag'] == etag
+    assert client.get(url, headers={'If-None-Match': '"other"', **auth(buyer)}).status_code == 200
+
+
+def test_download_etag_differs_from_generate(client, make_user, make_credit, auth):
+    buyer, credit = expired_purchase(client, make_user, make_credit, auth)
+    generated = client.get(f'/api/buyer/generate-certificate/{credit.id}', headers=auth(buyer)).headers['ETag']
+    url = f'/api/buyer/download-certificate/{credit.id}'
+
+    download = client.get(url, headers=auth(buyer))
+    assert download.status_code == 200 and 'html' in download.get_json()
+    etag = download.headers['ETag']
+    assert etag != generated and CSS_VERSION in etag
+
+    assert client.get(url, headers={'If-None-Match': etag, **auth(buyer)}).status_code == 304
+    assert client.get(url, headers={'If-None-Match': generated, **auth(buyer)}).status_code == 200
+
+
+def test_renders_from_an_older_template_are_replaced(client, make_user, make_credit, auth):
+    buyer, credit = expired_purchase(client, make_user, make_credit, auth)
+    url = f'/api/buyer/generate-certificate/{credit.id}'
+    current = client.get(url, headers=auth(buyer)).headers['ETag']
+
+    row = CertificateRender.query.one()
+    row.content_hash, row.template_version = 'stale', None
+    db.session.commit()
+
+    response = client.get(url, headers={'If-None-Match': '"stale"', **auth(buyer)})
+    assert response.status_code == 200 and response.headers['ETag'] == current
+    db.session.expire_all()
+    row = CertificateRender.query.one()
+    assert row.template_version == TEMPLATE_VERSION
+
+
+def test_unexpired_credit_has_no_certificate(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, is_active=True)
+    client.post('/api/buyer/purchase', json={"credit_id": credit.id, "txn_hash": '0xlive'}, headers=auth(buyer))
+
+    assert client.get(f'/api/buyer/generate-certificate/{credit.id}', headers=auth(buyer)).status_code == 404
+
+
+class FakeHTML:
+    """Stands in for weasyprint.HTML, which needs GTK libraries"""
+    fail = False
+
+    def __init__(self, string):
+        self.document = string
+
+    def write_pdf(self, target):
+        if self.fail:
+            raise RuntimeError("render failed")
+        target.write(b'%PDF-' + self.document[:20].encode())
+
+
+@pytest.fixture
+def pdf_renderer(monkeypatch, tmp_path):
+    pool = ThreadPoolExecutor(max_workers=1)
+    FakeHTML.fail = False
+    monkeypatch.setattr(certificate_pdf, 'WEASYPRINT_AVAILABLE', True)
+    monkeypatch.setattr(certificate_pdf, 'HTML', FakeHTML)
+    monkeypatch.setattr(certificate_pdf, 'pdf_pool', pool)
+    monkeypatch.setattr(Config, 'CERT_PDF_CACHE_DIR', str(tmp_path))
+    yield pool
+    pool.shutdown()
+    certificate_pdf._pending.clear()
+    certificate_pdf._failed.clear()
+
+
+def poll(client, url, headers):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        response = client.get(url, headers=headers)
+        if response.status_code != 202:
+            return response
+        time.sleep(0.02)
+    raise AssertionError("PDF was never rendered")
+
+
+def test_pdf_is_rendered_off_the_request_and_cached(client, make_user, make_credit, auth, pdf_renderer):
+    buyer, credit = expired_purchase(client, make_user, make_credit, auth)
+    url = f'/api/buyer/download-certificate/{credit.id}'
+
+    pending = client.get(url, headers=auth(buyer))
+    assert pending.status_code == 202
+    assert pending.headers['Location'] == pending.get_json()['poll_url'] == url
+
+    ready = poll(client, url, auth(buyer))
+    assert ready.status_code == 200
+    assert base64.b64decode(ready.get_json()['pdf_base64']).startswith(b'%PDF-')
+    assert ready.headers['ETag'].endswith('-pdf"')
+    [[key]] = [names for _, _, names in os.walk(Config.CERT_PDF_CACHE_DIR) if names]
+    assert key.endswith('.pdf') and not key.endswith('.tmp')
+
+    # Served from the disk cache from now on
+    FakeHTML.fail = True
+    assert client.get(url, headers=auth(buyer)).status_code == 200
+
+
+def test_failed_and_overflowing_renders(client, make_user, make_credit, auth, pdf_renderer, monkeypatch):
+    buyer, credit = expired_purchase(client, make_user, make_credit, auth)
+    url = f'/api/buyer/download-certificate/{credit.id}'
+
+    monkeypatch.setattr(Config, 'CERT_PDF_MAX_PENDING', 0)
+    assert client.get(url, headers=auth(buyer)).status_code == 503
+
+    monkeypatch.setattr(Config, 'CERT_PDF_MAX_PENDING', 4)
+    FakeHTML.fail = True
+    assert client.get(url, headers=auth(buyer)).status_code == 202
+    assert poll(client, url, auth(buyer)).status_code == 500
+    # A failure is reported once, then the render is queued again
+    FakeHTML.fail = False
+    assert client.get(url, headers=auth(buyer)).status_code == 202
+    assert poll(client, url, auth(buyer)).status_code == 200
@@ -0,0 +1,45 @@
+import json
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models.user import User
+from app.utilis import current_user
+
+
+def users_selects(statements):
+    return [s for s in statements if 'FROM users' in s]
+
+
+def test_repeat_requests_skip_the_users_lookup(client, make_user, auth, count_queries):
+    user = make_user()
+    headers = auth(user)
+    with count_queries() as first:
+        assert client.get('/api/profile', headers=headers).get_json()['username'] == user.username
+    with count_queries() as second:
+        assert client.get('/api/profile', headers=headers).get_json()['username'] == user.username
+
+    assert len(users_selects(first)) == 1
+    assert users_selects(second) == []
+
+
+def test_profile_changes_drop_the_cached_row(client, make_user, auth):
+    user = make_user()
+    headers = auth(user)
+    client.get('/api/profile', headers=headers)
+    assert user.id in current_user._users
+
+    db.session.get(User, user.id).email = 'changed@example.com'
+    db.session.commit()
+
+    assert user.id not in current_user._users
+    assert client.get('/api/profile', headers=headers).get_json()['email'] == 'changed@example.com'
+
+
+def test_tokens_without_the_uid_claim_still_resolve(client, make_user):
+    user = make_user('NGO')
+    token = create_access_token(identity=json.dumps({"username": user.username, "role": user.role}))
+
+    response = client.get('/api/profile', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.get_json()['role'] == 'NGO'
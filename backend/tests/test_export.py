@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from app import db
+from app.models.transaction import Transactions
+
+
+def add_transaction(credit, buyer, txn_hash, timestamp):
+    db.session.add(Transactions(buyer_id=buyer.id, credit_id=credit.id, amount=2, total_price=3.0,
+                                timestamp=timestamp, txn_hash=txn_hash))
+    db.session.commit()
+
+
+def seed(make_user, make_credit):
+    ngo, other, buyer = make_user('NGO'), make_user('NGO'), make_user()
+    mine, theirs = make_credit(ngo), make_credit(other)
+    add_transaction(mine, buyer, '0xa', datetime(2025, 1, 1, 12))
+    add_transaction(theirs, buyer, '0xb', datetime(2025, 1, 2, 12))
+    add_transaction(mine, buyer, '0xc', datetime(2025, 1, 3, 12))
+    return ngo, mine
+
+
+def test_csv_export_holds_only_the_callers_credits(client, make_user, make_credit, auth):
+    ngo, mine = seed(make_user, make_credit)
+
+    response = client.get('/api/NGO/transactions/export', headers=auth(ngo))
+
+    assert response.status_code == 200 and response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [r['txn_hash'] for r in rows] == ['0xa', '0xc']
+    assert {r['credit_id'] for r in rows} == {str(mine.id)}
+
+
+def test_ndjson_export_with_a_date_range(client, make_user, make_credit, auth):
+    ngo, _ = seed(make_user, make_credit)
+
+    response = client.get('/api/NGO/transactions/export',
+                          query_string={'format': 'ndjson', 'from': '2025-01-02', 'to': '2025-01-03'},
+                          headers=auth(ngo))
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['txn_hash'] for line in lines] == ['0xc']
+
+
+def test_other_ngos_credits_cannot_be_requested(client, make_user, make_credit, auth):
+    ngo, _ = seed(make_user, make_credit)
+
+    response = client.get('/api/NGO/transactions/export', query_string={'format': 'ndjson', 'credit_id': 2},
+                          headers=auth(ngo))
+
+    assert response.get_data(as_text=True) == ''
+
+
+def test_only_ngos_export(client, make_user, make_credit, auth):
+    seed(make_user, make_credit)
+    for role in ('buyer', 'auditor'):
+        response = client.get('/api/NGO/transactions/export', headers=auth(make_user(role)))
+        assert response.status_code == 403
@@ -0,0 +1,83 @@
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.job import BackgroundJob, BackgroundJobChunk
+from app.models.verification import VerificationRequest, VerificationResult
+from app.utilis import job_queue
+from config import Config
+
+
+def record(h2_kg=100.0, **fields):
+    return dict({"energy_mwh": 5.2, "h2_kg": h2_kg, "production_method": "electrolysis",
+                 "production_date": "2025-03-01"}, **fields)
+
+
+def wait_for(client, headers, status_url):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        job = client.get(status_url, headers=headers).get_json()
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_batch_results_are_stored_and_readable_from_any_session(client, make_user, auth, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_QUEUE_CHUNK_SIZE', 2)
+    ngo = make_user('NGO')
+    records = [record(h2_kg=100.0 + i) for i in range(5)]
+
+    response = client.post('/api/verification/submit-batch', json={"records": records}, headers=auth(ngo))
+    assert response.status_code == 202
+    # Each request has its own session, as a poll served by another worker would
+    job = wait_for(client, auth(ngo), response.get_json()['status_url'])
+
+    assert job['status'] == 'completed'
+    assert (job['total'], job['processed'], sum(job['counts'].values())) == (5, 5, 5)
+    assert [r['index'] for r in job['results']] == [0, 1, 2, 3, 4]
+    assert BackgroundJobChunk.query.count() == 3
+    assert VerificationRequest.query.count() == VerificationResult.query.count() == 5
+
+
+def test_jobs_are_private_to_their_owner(client, make_user, auth):
+    ngo, other = make_user('NGO'), make_user('NGO')
+    response = client.post('/api/verification/submit-batch', json={"records": [record()]}, headers=auth(ngo))
+    status_url = response.get_json()['status_url']
+    wait_for(client, auth(ngo), status_url)
+
+    assert client.get(status_url, headers=auth(other)).status_code == 404
+    assert client.get('/api/verification/jobs/unknown', headers=auth(ngo)).status_code == 404
+
+
+def test_a_job_without_progress_is_reported_as_failed(make_user):
+    owner = make_user('NGO')
+    quiet_since = datetime.utcnow() - timedelta(seconds=Config.JOB_QUEUE_STALE_AFTER + 1)
+    db.session.add(BackgroundJob(id='lost', kind='verification_batch', owner_id=owner.id, status='running',
+                                 total=10, processed=4, counts={"approved": 4}, errors=[], updated_at=quiet_since))
+    db.session.add(BackgroundJob(id='busy', kind='verification_batch', owner_id=owner.id, status='running',
+                                 total=10, processed=4, counts={"approved": 4}, errors=[]))
+    db.session.commit()
+
+    lost = job_queue.get_job('lost')
+    assert lost['status'] == 'failed' and lost['errors'][-1]['error'] == job_queue.INTERRUPTED
+    assert job_queue.get_job('busy')['status'] == 'running'
+
+
+def test_finished_jobs_are_pruned_after_the_retention(app, make_user):
+    owner = make_user('NGO')
+    long_ago = datetime.utcnow() - timedelta(seconds=Config.JOB_QUEUE_RETENTION + 1)
+    db.session.add(BackgroundJob(id='old', kind='verification_batch', owner_id=owner.id, status='completed',
+                                 total=1, processed=1, counts={}, errors=[], finished_at=long_ago))
+    db.session.add(BackgroundJobChunk(job_id='old', start_index=0, results=[{"status": "approved"}]))
+    db.session.commit()
+
+    job_id = job_queue.enqueue_job(app, owner.id, 'noop', [1, 2], lambda chunk: [{"status": "done"} for _ in chunk])
+    deadline = time.monotonic() + 10
+    while job_queue.get_job(job_id)['status'] != 'completed' and time.monotonic() < deadline:
+        db.session.expire_all()
+        time.sleep(0.05)
+
+    assert job_queue.get_job('old') is None
+    assert BackgroundJobChunk.query.filter_by(job_id='old').count() == 0
+    assert job_queue.get_job(job_id)['counts'] == {"done": 2}
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.market import MarketCandle
+from app.models.transaction import Transactions
+from app.utilis import market_data
+
+
+def add_trade(buyer, credit, ts, txn_hash):
+    db.session.add(Transactions(buyer_id=buyer.id, credit_id=credit.id, amount=2, total_price=4.0,
+                                timestamp=ts, txn_hash=txn_hash))
+    db.session.commit()
+
+
+def candle_buckets(interval):
+    return sorted(b for (b,) in db.session.query(MarketCandle.bucket_start).filter(MarketCandle.interval == interval))
+
+
+def test_trades_roll_up_into_candles(make_user, make_credit):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo)
+    now = datetime.utcnow()
+    add_trade(buyer, credit, now, 'a')
+    add_trade(buyer, credit, now, 'b')
+
+    candle = db.session.get(MarketCandle, (market_data.UNKNOWN_METHOD, '1h', market_data.bucket_start(now, '1h')))
+    assert (candle.volume, candle.trades, candle.close) == (4, 2, 2.0)
+    assert market_data.price_history(market_data.UNKNOWN_METHOD, '1m', 10)[-1]['trades'] == 2
+
+
+def test_old_minute_and_hour_candles_are_pruned(make_user, make_credit):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo)
+    now = datetime.utcnow()
+    old = now - timedelta(days=120)
+    add_trade(buyer, credit, old, 'old')
+    add_trade(buyer, credit, now - timedelta(days=2), 'recent')
+    add_trade(buyer, credit, now, 'now')
+
+    assert candle_buckets('1m') == [market_data.bucket_start(now, '1m')]
+    assert candle_buckets('1h') == [market_data.bucket_start(now - timedelta(days=2), '1h'),
+                                    market_data.bucket_start(now, '1h')]
+    # Daily candles keep the full history
+    assert market_data.bucket_start(old, '1d') in candle_buckets('1d')
+
+    assert market_data.rebuild_rollups() == 1 + 2 + 3
+    assert len(candle_buckets('1m')) == 1
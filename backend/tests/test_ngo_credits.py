@@ -0,0 +1,48 @@
+from app import db
+from app.models.verification import VerificationRequest
+
+
+def add_auto_credits(ngo, make_credit, count):
+    for _ in range(count):
+        credit = make_credit(ngo, is_verified=True, req_status=2)
+        db.session.add(VerificationRequest(industry_id=ngo.id, credit_id=credit.id, hydrogen_amount=10,
+                                           production_date=credit.created_at.date(), production_method='electrolysis',
+                                           energy_source='renewable', status='approved'))
+    db.session.commit()
+
+
+def test_listing_queries_do_not_grow_with_the_portfolio(client, make_user, make_credit, auth, count_queries):
+    ngo = make_user('NGO')
+    headers = auth(ngo)
+    add_auto_credits(ngo, make_credit, 3)
+    client.get('/api/NGO/credits', headers=headers)  # warm the user cache
+
+    counts = []
+    for limit, extra in ((50, 0), (60, 40)):
+        add_auto_credits(ngo, make_credit, extra)
+        with count_queries() as statements:
+            credits = client.get('/api/NGO/credits', query_string={'limit': limit}, headers=headers).get_json()
+            auto = client.get('/api/NGO/auto-credits', query_string={'limit': limit}, headers=headers).get_json()
+        counts.append(len(statements))
+        assert len(credits) == len(auto['auto_credits']) == auto['total_auto_generated'] == 3 + extra
+    assert counts[0] == counts[1]
+    assert auto['auto_credits'][0]['production_method'] == 'electrolysis'
+
+
+def test_listing_pages_in_id_order(client, make_user, make_credit, auth):
+    ngo = make_user('NGO')
+    add_auto_credits(ngo, make_credit, 5)
+    headers = auth(ngo)
+
+    first = client.get('/api/NGO/credits', query_string={'limit': 3}, headers=headers)
+    second = client.get('/api/NGO/credits', query_string={'limit': 3, 'cursor': first.headers['X-Next-Cursor']},
+                        headers=headers)
+    ids = [c['id'] for c in first.get_json() + second.get_json()]
+    assert ids == sorted(ids) and len(ids) == 5
+    assert 'X-Next-Cursor' not in second.headers
+
+    page = client.get('/api/NGO/auto-credits', query_string={'limit': 3}, headers=headers).get_json()
+    rest = client.get('/api/NGO/auto-credits', query_string={'limit': 3, 'cursor': page['next_cursor']},
+                      headers=headers).get_json()
+    ids = [c['id'] for c in page['auto_credits'] + rest['auto_credits']]
+    assert ids == sorted(ids, reverse=True) and len(ids) == 5
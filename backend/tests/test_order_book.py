@@ -0,0 +1,200 @@
+from app import db
+from app.models.order_book import OrderFill
+from app.models.transaction import PurchasedCredit, Transactions
+from app.utilis.order_book import (
+    BUY, SELL, MARKET, CANCELLED, FILLED, OPEN, MatchingEngine, OrderWAL, get_engine,
+)
+
+
+def test_price_time_priority_and_partial_fills():
+    engine = MatchingEngine()
+    early, _ = engine.submit('1', SELL, 5, 10.0)
+    late, _ = engine.submit('1', SELL, 5, 10.0)
+    cheap, _ = engine.submit('1', SELL, 2, 9.5)
+
+    order, fills = engine.submit('1', BUY, 6, 10.0)
+
+    assert [(f.maker_order_id, f.price / 10_000, f.quantity) for f in fills] == [
+        (cheap.id, 9.5, 2), (early.id, 10.0, 4),
+    ]
+    assert order.status == FILLED
+    assert early.remaining == 1 and early.status == OPEN
+    assert late.remaining == 5
+
+
+def test_market_order_remainder_expires():
+    engine = MatchingEngine()
+    engine.submit('1', SELL, 3, 10.0)
+
+    order, fills = engine.submit('1', BUY, 5, order_type=MARKET)
+
+    assert sum(f.quantity for f in fills) == 3
+    assert order.status == CANCELLED and order.remaining == 2
+    assert engine.book('1').depth() == {"bids": [], "asks": []}
+
+
+def test_wal_replay_rebuilds_the_same_books(tmp_path):
+    wal = OrderWAL(str(tmp_path / 'book.wal'))
+    engine = MatchingEngine(wal)
+    engine.submit('1', SELL, 5, 10.0)
+    resting, _ = engine.submit('1', BUY, 3, 9.0)
+    engine.submit('1', BUY, 2, 10.0)
+    engine.cancel(resting.id)
+    engine.submit('2', SELL, 4, 7.0)
+
+    replayed = MatchingEngine()
+    replayed.replay(OrderWAL(wal.path).replay())
+
+    assert replayed.seq == engine.seq
+    for credit_class in ('1', '2'):
+        assert replayed.book(credit_class).depth() == engine.book(credit_class).depth()
+
+
+def place(client, headers, credit, side, quantity, price=None, order_type='limit'):
+    return client.post('/api/market/orders', headers=headers, json={
+        "credit_class": credit.id, "side": side, "quantity": quantity, "price": price, "order_type": order_type,
+    })
+
+
+def test_orders_need_an_existing_credit(client, make_user, auth):
+    response = client.post('/api/market/orders', headers=auth(make_user()), json={
+        "credit_class": "999", "side": "buy", "quantity": 1, "price": 1.0,
+    })
+    assert response.status_code == 404
+
+
+def test_fills_settle_into_holdings_and_transactions(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, amount=100)
+
+    assert place(client, auth(ngo), credit, 'sell', 40, 5.0).status_code == 201
+    response = place(client, auth(buyer), credit, 'buy', 25, order_type='market')
+
+    assert response.status_code == 201
+    assert [(f['quantity'], f['price']) for f in response.get_json()['fills']] == [(25, 5.0)]
+    holding = PurchasedCredit.query.filter_by(user_id=buyer.id, credit_id=credit.id).one()
+    assert holding.amount == 25
+    transaction = Transactions.query.one()
+    assert (transaction.buyer_id, transaction.amount, transaction.total_price) == (buyer.id, 25, 125.0)
+    assert OrderFill.query.count() == 1
+
+
+def test_sell_orders_escrow_units_until_cancelled(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, amount=100)
+    place(client, auth(ngo), credit, 'sell', 30, 5.0)
+    place(client, auth(buyer), credit, 'buy', 30, 5.0)
+
+    # The NGO has 70 unsold units and the buyer 30
+    assert place(client, auth(ngo), credit, 'sell', 71, 6.0).status_code == 409
+    assert place(client, auth(buyer), credit, 'sell', 31, 6.0).status_code == 409
+
+    resting = place(client, auth(buyer), credit, 'sell', 20, 6.0).get_json()['order']
+    holding = PurchasedCredit.query.filter_by(user_id=buyer.id, credit_id=credit.id).one()
+    assert holding.amount == 10
+
+    assert client.delete(f"/api/market/orders/{resting['id']}", headers=auth(buyer)).status_code == 200
+    db.session.expire_all()
+    assert PurchasedCredit.query.filter_by(user_id=buyer.id, credit_id=credit.id).one().amount == 30
+
+
+def test_engine_catches_up_with_another_workers_log(app, client, make_user, make_credit, auth):
+    ngo = make_user('NGO')
+    credit = make_credit(ngo, amount=100)
+    # A second engine over the same log stands in for another worker
+    other = MatchingEngine(OrderWAL(app.config['ORDER_WAL_PATH']))
+    with other.exclusive():
+        pass
+    place(client, auth(ngo), credit, 'sell', 10, 5.0)
+
+    with other.exclusive():
+        assert other.seq == get_engine().seq
+        assert other.book(str(credit.id)).depth()['asks'] == [{"price": 5.0, "quantity": 10}]
+
+
+def buy_listed(client, headers, credit, txn_hash):
+    return client.post('/api/buyer/purchase', json={"credit_id": credit.id, "txn_hash": txn_hash}, headers=headers)
+
+
+def units_held(credit):
+    db.session.expire_all()
+    return db.session.query(db.func.sum(PurchasedCredit.amount)).filter_by(credit_id=credit.id).scalar() or 0
+
+
+def test_listed_credits_take_no_sell_orders(client, make_user, make_credit, auth):
+    ngo = make_user('NGO')
+    credit = make_credit(ngo, is_active=True)
+
+    assert place(client, auth(ngo), credit, 'sell', 10, 5.0).status_code == 409
+
+
+def test_units_on_the_book_are_not_sold_again_at_a_fixed_price(client, make_user, make_credit, auth):
+    ngo, buyer, trader = make_user('NGO'), make_user(), make_user()
+    credit = make_credit(ngo, amount=10)
+    place(client, auth(ngo), credit, 'sell', 10, 5.0)
+
+    response = client.patch('/api/buyer/sell', json={"credit_id": credit.id, "salePrice": 9.0}, headers=auth(ngo))
+    assert response.status_code == 403
+    # Even a listing left over from before the units went on the book
+    credit.is_active = True
+    db.session.commit()
+    assert buy_listed(client, auth(buyer), credit, '0xlisted').status_code == 409
+
+    assert place(client, auth(trader), credit, 'buy', 10, order_type='market').get_json()['order']['filled'] == 10
+    assert units_held(credit) == 10
+
+
+def test_only_a_whole_holder_lists_or_delists(client, make_user, make_credit, auth):
+    ngo, buyer, other = make_user('NGO'), make_user(), make_user()
+    credit = make_credit(ngo, amount=10, is_active=True)
+    assert buy_listed(client, auth(buyer), credit, '0xwhole').status_code == 200
+
+    def sell(user):
+        return client.patch('/api/buyer/sell', json={"credit_id": credit.id, "salePrice": 7.0}, headers=auth(user))
+
+    def remove(user):
+        return client.patch('/api/buyer/remove-from-sale', json={"credit_id": credit.id}, headers=auth(user))
+
+    assert sell(other).status_code == 403
+    assert sell(ngo).status_code == 403
+    assert sell(buyer).status_code == 200
+    assert remove(other).status_code == 403
+    assert remove(buyer).status_code == 200
+
+    # Once part of it is on the book, the credit no longer sells whole
+    place(client, auth(buyer), credit, 'sell', 4, 5.0)
+    place(client, auth(other), credit, 'buy', 4, 5.0)
+    assert sell(buyer).status_code == 403
+    assert units_held(credit) == 10
+
+
+def test_expiry_refunds_resting_orders_and_expires_every_holding(client, make_user, make_credit, auth):
+    ngo, first, second = make_user('NGO'), make_user(), make_user()
+    credit = make_credit(ngo, amount=100)
+    place(client, auth(ngo), credit, 'sell', 30, 5.0)
+    place(client, auth(first), credit, 'buy', 20, 5.0)
+    place(client, auth(second), credit, 'buy', 10, 5.0)
+    resting = place(client, auth(first), credit, 'sell', 5, 8.0).get_json()['order']
+
+    assert client.patch(f'/api/NGO/credits/expire/{credit.id}', headers=auth(ngo)).status_code == 200
+
+    db.session.expire_all()
+    holdings = {pc.user_id: (pc.amount, pc.is_expired) for pc in PurchasedCredit.query.filter_by(credit_id=credit.id)}
+    assert holdings == {first.id: (20, True), second.id: (10, True)}
+    assert get_engine().get_order(resting['id']) is None
+
+
+def test_cancel_after_expiry_returns_the_escrow(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, amount=10)
+    place(client, auth(ngo), credit, 'sell', 10, 5.0)
+    place(client, auth(buyer), credit, 'buy', 10, 5.0)
+    resting = place(client, auth(buyer), credit, 'sell', 4, 6.0).get_json()['order']
+    # Expired by another path while the order rests
+    credit.is_expired = True
+    PurchasedCredit.query.filter_by(credit_id=credit.id).update({"is_expired": True})
+    db.session.commit()
+
+    assert client.delete(f"/api/market/orders/{resting['id']}", headers=auth(buyer)).status_code == 200
+    db.session.expire_all()
+    assert [(pc.amount, pc.is_expired) for pc in PurchasedCredit.query.filter_by(credit_id=credit.id)] == [(10, True)]
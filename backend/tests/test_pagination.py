@@ -0,0 +1,46 @@
+from app.utilis.pagination import encode_cursor
+
+
+def test_marketplace_pages_follow_the_next_cursor(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    for price in (5.0, 1.0, 4.0, 2.0, 3.0):
+        make_credit(ngo, price=price, is_active=True)
+
+    prices, params = [], {'sort': 'price_asc', 'limit': 2}
+    while True:
+        response = client.get('/api/buyer/credits', query_string=params, headers=auth(buyer))
+        assert response.status_code == 200
+        prices += [c['price'] for c in response.get_json()]
+        if 'X-Next-Cursor' not in response.headers:
+            break
+        params['cursor'] = response.headers['X-Next-Cursor']
+
+    assert prices == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_bad_cursor_is_rejected(client, make_user, auth):
+    response = client.get('/api/buyer/credits', query_string={'cursor': 'not-a-cursor'}, headers=auth(make_user()))
+    assert response.status_code == 400
+
+
+def test_cursor_values_must_match_the_sort_key(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    make_credit(ngo, price=1.0, is_active=True)
+    headers = auth(buyer)
+    for sort, values in (('price_asc', [[1], {}]), ('price_asc', ['cheap', 1]), ('recent', [True]), ('recent', [1, 2])):
+        response = client.get('/api/buyer/credits', query_string={'sort': sort, 'cursor': encode_cursor(values)},
+                              headers=headers)
+        assert response.status_code == 400, (sort, values)
+    for path in ('/api/NGO/credits', '/api/NGO/transactions'):
+        response = client.get(path, query_string={'cursor': encode_cursor([{}, []])}, headers=auth(ngo))
+        assert response.status_code == 400, path
+
+    response = client.get('/api/buyer/credits', query_string={'sort': 'price_asc', 'cursor': encode_cursor([0, 0])},
+                          headers=headers)
+    assert response.status_code == 200 and len(response.get_json()) == 1
+
+
+def test_cursor_headers_are_exposed_to_browsers(client, make_user, auth):
+    response = client.get('/api/buyer/credits', headers={'Origin': 'http://localhost:3000', **auth(make_user())})
+    exposed = response.headers['Access-Control-Expose-Headers']
+    assert 'X-Next-Cursor' in exposed and 'X-Since-Cursor' in exposed
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from app import db
+from app.utilis import password_pool
+from app.utilis.password_pool import PasswordPoolUnavailable
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    """A pool of its own, so breaking it leaves the session's pool alone"""
+    monkeypatch.setattr(password_pool, '_executor', None)
+    monkeypatch.setattr(password_pool, '_broken', False)
+    monkeypatch.setattr(password_pool, '_rounds', 4)
+    yield
+    if password_pool._executor is not None:
+        password_pool._executor.shutdown()
+
+
+def test_hash_and_check(fresh_pool):
+    pw_hash = password_pool.hash_password('secret')
+    assert password_pool.check_password(pw_hash, 'secret')
+    assert not password_pool.check_password(pw_hash, 'wrong')
+
+
+def test_broken_pool_fails_closed(fresh_pool, client, make_user):
+    user = make_user()
+    user.password = password_pool.hash_password('secret')
+    db.session.commit()
+    broken = password_pool._executor
+
+    with pytest.raises(PasswordPoolUnavailable):
+        password_pool._run(os._exit, 1)
+
+    # No replacement is forked from the running process
+    assert password_pool._executor is broken
+    with pytest.raises(PasswordPoolUnavailable):
+        password_pool.hash_password('secret')
+    response = client.post('/api/login', json={'username': user.username, 'password': 'secret', 'role': 'buyer'})
+    assert response.status_code == 503
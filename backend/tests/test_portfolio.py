@@ -0,0 +1,55 @@
+import pytest
+
+from app import db
+from app.models.portfolio import PortfolioSummary
+from app.models.transaction import PurchasedCredit
+from app.utilis import portfolio
+from config import Config
+
+
+def hold(buyer, credit, expired=False):
+    db.session.add(PurchasedCredit(user_id=buyer.id, credit_id=credit.id, amount=credit.amount,
+                                   creator_id=credit.creator_id, is_expired=expired))
+    db.session.commit()
+
+
+def summary_row(user_id):
+    db.session.expire_all()
+    row = db.session.get(PortfolioSummary, user_id)
+    return {name: getattr(row, name) for name in portfolio.portfolio_totals(user_id)}
+
+
+def test_totals_from_the_aggregate(make_user, make_credit):
+    ngo, buyer = make_user('NGO'), make_user()
+    credits = [make_credit(ngo, amount=10 * (i + 1), price=2.0 + i) for i in range(3)]
+    for i, credit in enumerate(credits):
+        hold(buyer, credit, expired=i == 0)
+
+    totals = portfolio.portfolio_totals(buyer.id)
+
+    assert (totals['credits_count'], totals['expired_count']) == (3, 1)
+    assert totals['total_invested'] == pytest.approx(sum(c.price for c in credits))
+    assert totals['current_value'] == pytest.approx(
+        sum(c.price * (1 + portfolio.mock_performance(c.id)) for c in credits))
+    assert totals['hydrogen_offset'] == pytest.approx(sum(c.amount for c in credits) * portfolio.HYDROGEN_OFFSET_FACTOR)
+    assert portfolio.portfolio_totals(make_user().id)['credits_count'] == 0
+
+
+def test_summary_row_follows_purchases_and_expiry(client, make_user, make_credit, auth, monkeypatch):
+    monkeypatch.setattr(Config, 'PORTFOLIO_SUMMARY_ENABLED', True)
+    ngo, buyer = make_user('NGO'), make_user()
+    held = make_credit(ngo, amount=5, price=3.0)
+    hold(buyer, held)  # bought before the summary table was on
+    listed = [make_credit(ngo, amount=7, price=4.0, is_active=True) for _ in range(2)]
+
+    analytics = client.get('/api/buyer/portfolio-analytics', headers=auth(buyer)).get_json()
+    assert analytics['creditsCount'] == 1
+    for i, credit in enumerate(listed):
+        response = client.post('/api/buyer/purchase', json={"credit_id": credit.id, "txn_hash": f'0xp{i}'},
+                               headers=auth(buyer))
+        assert response.status_code == 200
+    assert client.patch(f'/api/NGO/credits/expire/{held.id}', headers=auth(ngo)).status_code == 200
+
+    assert summary_row(buyer.id) == pytest.approx(portfolio.portfolio_totals(buyer.id))
+    assert summary_row(buyer.id)['credits_count'] == 3
+    assert summary_row(buyer.id)['expired_count'] == 1
@@ -0,0 +1,55 @@
+import threading
+from collections import Counter
+
+from app import db
+from app.models.credit import Credit
+from app.models.transaction import PurchasedCredit, Transactions
+
+
+def buy(client, headers, credit_id, txn_hash):
+    return client.post('/api/buyer/purchase', json={"credit_id": credit_id, "txn_hash": txn_hash}, headers=headers)
+
+
+def test_concurrent_buyers_get_one_sale(app, client, make_user, make_credit, auth):
+    ngo = make_user('NGO')
+    credit = make_credit(ngo, is_active=True)
+    buyers = [make_user() for _ in range(8)]
+    headers = [auth(b) for b in buyers]
+    credit_id = credit.id
+    statuses = []
+    start = threading.Barrier(len(buyers))
+
+    def race(i):
+        start.wait()
+        statuses.append(buy(app.test_client(), headers[i], credit_id, f'0xrace{i}').status_code)
+
+    threads = [threading.Thread(target=race, args=(i,)) for i in range(len(buyers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert Counter(statuses) == {200: 1, 409: len(buyers) - 1}
+    assert PurchasedCredit.query.filter_by(credit_id=credit_id).count() == 1
+    assert Transactions.query.filter_by(credit_id=credit_id).count() == 1
+
+
+def test_retried_txn_hash_replays_without_a_second_transaction(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo, is_active=True)
+
+    first = buy(client, auth(buyer), credit.id, '0xabc')
+    again = buy(client, auth(buyer), credit.id, '0xabc')
+
+    assert first.status_code == 200
+    assert again.status_code == 200 and again.get_json()['replayed'] is True
+    assert Transactions.query.filter_by(txn_hash='0xabc').count() == 1
+
+
+def test_txn_hash_reused_for_another_purchase_is_rejected(client, make_user, make_credit, auth):
+    ngo, buyer, other = make_user('NGO'), make_user(), make_user()
+    first, second = make_credit(ngo, is_active=True), make_credit(ngo, is_active=True)
+
+    assert buy(client, auth(buyer), first.id, '0xdup').status_code == 200
+    assert buy(client, auth(other), second.id, '0xdup').status_code == 409
+    assert db.session.get(Credit, second.id).is_active
@@ -0,0 +1,114 @@
+import json
+import random
+
+import pytest
+
+from app.utilis import telemetry
+from app.utilis.telemetry import EMPTY_STATE, TelemetryDetector, parse_reading, summarize
+from config import Config
+
+START = 29_000_000
+
+
+def steady_readings(count, start=START, seed=1):
+    rng = random.Random(seed)
+    readings = []
+    for i in range(count):
+        kwh = rng.gauss(500, 5)
+        readings.append((start + i, kwh, kwh / rng.gauss(52, 0.3)))
+    return readings
+
+
+def test_spike_is_flagged_after_warmup():
+    detector, state = TelemetryDetector(warmup=30), list(EMPTY_STATE)
+    assert detector.fold(state, steady_readings(200)) == (200, 0, 0)
+
+    accepted, flagged, _ = detector.fold(state, [(START + 200, 1500.0, 1500.0 / 52)])
+    assert (accepted, flagged) == (1, 1)
+    assert summarize(state)['flagged_readings'] == 1
+    assert summarize(state)['telemetry_anomaly'] > 0
+
+
+def test_no_flags_during_warmup():
+    detector = TelemetryDetector(warmup=30)
+    readings = steady_readings(10) + [(START + 10, 5000.0, 10.0)]
+    assert detector.fold(list(EMPTY_STATE), readings)[1] == 0
+
+
+def test_resent_readings_are_dropped():
+    detector, state = TelemetryDetector(), list(EMPTY_STATE)
+    readings = steady_readings(50)
+    detector.fold(state, readings)
+    before = summarize(state)
+
+    assert detector.fold(state, readings[-10:]) == (0, 0, 10)
+    assert summarize(state) == before
+
+
+def test_parse_reading_forms():
+    assert parse_reading([60, 1, 2]) == (1, 1.0, 2.0)
+    assert parse_reading({"ts": "1970-01-01T00:02:00Z", "energy_kwh": 3, "h2_kg": 4}) == (2, 3.0, 4.0)
+    assert parse_reading([60, -1, 2]) is None
+    assert parse_reading({"ts": 60}) is None
+
+
+def test_out_of_range_timestamps_are_invalid():
+    for ts in (1e18, -60, float('inf'), float('nan'), "0001-01-01T00:00:00Z"):
+        assert parse_reading([ts, 1, 1]) is None, ts
+    assert parse_reading(["9999-12-31T23:59:00Z", 1, 1]) is not None
+
+
+def test_stored_state_matches_the_in_memory_detector(make_user):
+    facility = make_user('NGO')
+    readings = steady_readings(500) + [(START + 500, 2000.0, 2000.0 / 52)] + steady_readings(100, START + 501, 2)
+    detector = TelemetryDetector(Config.TELEMETRY_ALPHA, Config.TELEMETRY_Z_THRESHOLD, Config.TELEMETRY_WARMUP)
+    state = list(EMPTY_STATE)
+    for offset in range(0, len(readings), 120):
+        batch = readings[offset:offset + 120]
+        assert telemetry.ingest(facility.id, batch) == detector.fold(state, batch)
+
+    assert telemetry.facility_summary(facility.id) == pytest.approx(summarize(state))
+    assert telemetry.facility_summary(facility.id)['flagged_readings'] >= 1
+    assert telemetry.facility_summaries([facility.id, None, 999]).keys() == {facility.id}
+
+
+def test_upload_with_out_of_range_timestamp(client, make_user, auth):
+    facility = make_user('NGO')
+    readings = [[minute * 60, kwh, kg] for minute, kwh, kg in steady_readings(5)] + [[1e18, 500, 10]]
+
+    response = client.post('/api/verification/telemetry', json={"readings": readings}, headers=auth(facility))
+
+    assert response.status_code == 200
+    assert (response.get_json()['accepted'], response.get_json()['invalid']) == (5, 1)
+    assert client.get('/api/verification/telemetry', headers=auth(facility)).status_code == 200
+
+
+def test_ndjson_upload(client, make_user, auth):
+    facility = make_user('NGO')
+    lines = [json.dumps([minute * 60, kwh, kg]) for minute, kwh, kg in steady_readings(40)]
+    body = '\n'.join(lines[:20] + ['not json'] + lines[20:] + lines[:5])
+
+    response = client.post('/api/verification/telemetry', data=body, content_type='application/x-ndjson',
+                           headers=auth(facility))
+
+    assert response.status_code == 200
+    counts = response.get_json()
+    assert (counts['accepted'], counts['invalid'], counts['stale']) == (40, 1, 5)
+    assert counts['telemetry']['readings'] == 40
+    assert client.get('/api/verification/telemetry', headers=auth(facility)).get_json()['readings'] == 40
+
+
+def test_large_json_body_is_refused(client, make_user, auth, monkeypatch):
+    monkeypatch.setattr(Config, 'TELEMETRY_JSON_MAX_BYTES', 1000)
+    facility = make_user('NGO')
+    readings = [[minute * 60, kwh, kg] for minute, kwh, kg in steady_readings(100)]
+
+    response = client.post('/api/verification/telemetry', json={"readings": readings}, headers=auth(facility))
+
+    assert response.status_code == 413
+    assert client.get('/api/verification/telemetry', headers=auth(facility)).status_code == 404
+
+
+def test_only_ngos_report_telemetry(client, make_user, auth):
+    response = client.post('/api/verification/telemetry', json={"readings": []}, headers=auth(make_user()))
+    assert response.status_code == 403
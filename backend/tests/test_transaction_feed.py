@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.transaction import Transactions
+from app.utilis.pagination import decode_cursor
+from config import Config
+
+
+def add_transaction(credit, buyer, id, age=timedelta(0)):
+    db.session.add(Transactions(id=id, buyer_id=buyer.id, credit_id=credit.id, amount=1, total_price=1.0,
+                                timestamp=datetime.utcnow() - age, txn_hash=f'0x{id}'))
+    db.session.commit()
+
+
+def test_transaction_feed_delivers_late_commits_once(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo)
+    for id in (1, 2, 3):
+        add_transaction(credit, buyer, id, age=timedelta(hours=1))
+    add_transaction(credit, buyer, 5)
+
+    def poll(since=None):
+        response = client.get('/api/NGO/transactions', query_string={'since': since} if since else {},
+                              headers=auth(ngo))
+        assert response.status_code == 200
+        return [t['id'] for t in response.get_json()], response.headers['X-Since-Cursor']
+
+    ids, since = poll()
+    assert ids == [5, 3, 2, 1]
+    # Settled rows move the floor, recent ones are remembered individually
+    assert decode_cursor(since) == [3, [5]]
+
+    # Id 4 was handed out before 5 but committed after it
+    add_transaction(credit, buyer, 4)
+    add_transaction(credit, buyer, 6)
+    ids, since = poll(since)
+    assert ids == [4, 6]
+
+    ids, since = poll(since)
+    assert ids == []
+    assert decode_cursor(since) == [3, [4, 5, 6]]
+
+
+def test_since_cursor_stays_bounded_under_a_burst(client, make_user, make_credit, auth):
+    ngo, buyer = make_user('NGO'), make_user()
+    credit = make_credit(ngo)
+    ids = range(10_000_000, 10_000_000 + 3 * (Config.TRANSACTION_FEED_MAX_SEEN + 100), 3)
+    db.session.add_all(Transactions(id=i, buyer_id=buyer.id, credit_id=credit.id, amount=1, total_price=1.0,
+                                    txn_hash=f'0x{i}') for i in ids)
+    db.session.commit()
+
+    first = client.get('/api/NGO/transactions', query_string={'limit': 500}, headers=auth(ngo))
+    since = first.headers['X-Since-Cursor']
+    floor, delivered = decode_cursor(since)
+    assert len(delivered) == Config.TRANSACTION_FEED_MAX_SEEN
+    assert floor == ids[-Config.TRANSACTION_FEED_MAX_SEEN - 1] and delivered[0] > floor
+    # Well inside a 4094-byte request line
+    assert len(f'GET /api/NGO/transactions?since={since} HTTP/1.1') < 3000
+
+    add_transaction(credit, buyer, ids[-1] + 1)
+    response = client.get('/api/NGO/transactions', query_string={'since': since}, headers=auth(ngo))
+    assert [t['id'] for t in response.get_json()] == [ids[-1] + 1]
@@ -0,0 +1,55 @@
+from datetime import date
+
+from app import db
+from app.ml_models.h2_verification_model import advanced_h2_model
+from app.models.verification import VerificationRequest, VerificationResult
+from app.routes.verification_routes import _persist_verification_chunk
+
+
+def pending_request(industry, h2_kg=100.0):
+    request = VerificationRequest(industry_id=industry.id, hydrogen_amount=h2_kg, production_date=date(2025, 3, 1),
+                                  production_method='electrolysis', energy_source='renewable',
+                                  energy_source_mwh=5.2, status='pending')
+    db.session.add(request)
+    db.session.commit()
+    return request
+
+
+def test_submission_stores_its_result(client, make_user, auth):
+    ngo = make_user('NGO')
+    response = client.post('/api/verification/submit', json={
+        "energy_mwh": 5.2, "h2_kg": 100.0, "production_method": "electrolysis", "production_date": "2025-03-01",
+    }, headers=auth(ngo))
+
+    body = response.get_json()
+    stored = VerificationResult.query.filter_by(verification_request_id=body['verification_id']).one()
+    assert stored.model_version == advanced_h2_model.model_version
+    assert stored.result['verification_id'] == body['ml_verification']['verification_id']
+
+
+def test_pending_requests_are_scored_once(client, make_user, auth, monkeypatch):
+    ngo, reviewer = make_user('NGO'), make_user('admin')
+    pending_request(ngo)
+    first = client.get('/api/verification/pending', headers=auth(reviewer)).get_json()
+    assert VerificationResult.query.count() == 1
+
+    def must_not_rescore(*args, **kwargs):
+        raise AssertionError("stored result was not reused")
+    monkeypatch.setattr(advanced_h2_model, 'verify_h2_production', must_not_rescore)
+    second = client.get('/api/verification/pending', headers=auth(reviewer)).get_json()
+
+    assert second[0]['ml_verification'] == first[0]['ml_verification']
+    assert VerificationResult.query.count() == 1
+
+
+def test_batch_chunk_does_not_log_per_record(make_user, capsys):
+    ngo = make_user('NGO')
+    records = [{"energy_mwh": 5.2, "h2_kg": 100.0 + i, "production_method": "electrolysis",
+                "production_date": "2025-03-01", "location": "unknown"} for i in range(50)]
+    capsys.readouterr()
+
+    results = _persist_verification_chunk(ngo.id, records)
+
+    assert len(results) == 50
+    assert VerificationResult.query.count() == 50
+    assert len(capsys.readouterr().out.splitlines()) < 5
@@ -1,6 +1,6 @@
 import axios from 'axios';
 
-const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
+export const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
 const api = axios.create({
   baseURL: API_URL,
@@ -17,19 +17,32 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// List endpoints return one page at a time and the cursor of the next
+// page in X-Next-Cursor. Each list call returns one page with nextCursor
+// (null on the last page); pass it back to load the next page on demand
+export const PAGE_SIZE = 100;
+
+const getPage = async (url, cursor, params = {}) => {
+  const response = await api.get(url, { params: { ...params, limit: PAGE_SIZE, ...(cursor && { cursor }) } });
+  return { ...response, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 // Authentication APIs
 export const login = (credentials) => api.post('/login', credentials);
 export const signup = (userData) => api.post('/signup', userData);
 export const getProfile = () => api.get('/profile');
 
 // NGO APIs
-export const getNGOCredits = () => api.get('/NGO/my-credits');
+export const getNGOCredits = (cursor) => getPage('/NGO/credits', cursor);
 export const createNGOCredit = (creditData) => api.post('/NGO/credits', creditData);
-export const getTransactions = () => api.get('/NGO/transactions');
-export const getAutoGeneratedCredits = () => api.get('/NGO/auto-credits');
+export const getTransactions = (cursor) => getPage('/NGO/transactions', cursor);
+export const getAutoGeneratedCredits = async (cursor) => {
+  const response = await api.get('/NGO/auto-credits', { params: { limit: PAGE_SIZE, ...(cursor && { cursor }) } });
+  return { ...response, nextCursor: response.data.next_cursor || null };
+};
 
 // Buyer APIs
-export const getBuyerCredits = () => api.get('/buyer/credits');
+export const getBuyerCredits = (cursor, params) => getPage('/buyer/credits', cursor, params);
 export const getCreditDetailsAPI = (creditId) => api.get(`/buyer/credits/${creditId}`);
 export const purchaseCredit = (purchaseData) => api.post('/buyer/purchase', purchaseData);
 export const getPurchasedCredits = () => api.get('/buyer/purchased-credits');
@@ -57,7 +70,7 @@ export const getNotifications = () => api.get('/buyer/notifications');
 // 🧠 ML VERIFICATION API ENDPOINTS
 export const submitVerification = (data) => api.post('/verification/submit', data);
 export const mlVerify = (data) => api.post('/verification/ml-verify', data);
-export const getPendingVerifications = () => api.get('/verification/pending');
+export const getPendingVerifications = (cursor) => getPage('/verification/pending', cursor);
 export const approveVerification = (verificationId, data) => api.post(`/verification/${verificationId}/approve`, data);
 export const rejectVerification = (verificationId, data) => api.post(`/verification/${verificationId}/reject`, data);
 export const getIndustryVerificationStatus = () => api.get('/verification/industry-status');
@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useContext, useMemo } from 'react';
-import { getBuyerCredits, purchaseCredit, sellCreditApi, removeSaleCreditApi, getPurchasedCredits, generateCertificate, downloadCertificate, getPortfolioAnalytics, getMarketTrends, getNotifications } from '../api/api';
+import { getBuyerCredits, purchaseCredit, sellCreditApi, removeSaleCreditApi, getPurchasedCredits, generateCertificate, downloadCertificate, getPortfolioAnalytics, getMarketTrends, getNotifications, API_URL } from '../api/api';
+import LoadMoreButton from './LoadMoreButton';
 import { CC_Context } from "../context/SmartContractConnector.js";
 import { ethers } from "ethers";
 import { Eye, EyeOff, Loader2, File, Info, Download, ShoppingCart, XCircle, Tag, DollarSign, AlertCircle, TrendingUp, BarChart3, Users, Target, Zap, Star, Filter, Search, Bell, Share2, Calendar, TrendingDown, Award, Globe, Leaf, Coins, Wallet, PieChart, Activity, ArrowUpRight, ArrowDownRight, Crown, Trophy, Gift, Shield, Clock, CheckCircle, AlertTriangle, Heart, MessageCircle, Bookmark, Share, Eye as EyeIcon, BarChart, LineChart, PieChart as PieChartIcon, Target as TargetIcon, Zap as ZapIcon, Star as StarIcon, Filter as FilterIcon, Search as SearchIcon, Bell as BellIcon, Share2 as Share2Icon, Calendar as CalendarIcon, TrendingDown as TrendingDownIcon, Award as AwardIcon, Globe as GlobeIcon, Leaf as LeafIcon, Coins as CoinsIcon, Wallet as WalletIcon, PieChart as PieChartIcon2, Activity as ActivityIcon, ArrowUpRight as ArrowUpRightIcon, ArrowDownRight as ArrowDownRightIcon, Crown as CrownIcon, Trophy as TrophyIcon, Gift as GiftIcon, Shield as ShieldIcon, Clock as ClockIcon, CheckCircle as CheckCircleIcon, AlertTriangle as AlertTriangleIcon, Heart as HeartIcon, MessageCircle as MessageCircleIcon, Bookmark as BookmarkIcon, Share as ShareIcon } from 'lucide-react';
@@ -38,6 +39,7 @@ const LoadingCredit = () => (
 
 const BuyerDashboard = () => {
   const [availableCredits, setAvailableCredits] = useState([]);
+  const [availableCursor, setAvailableCursor] = useState(null);
   const [purchasedCredits, setPurchasedCredits] = useState([]);
   const [certificateData, setCertificateData] = useState(null);
   const [error, setError] = useState(null);
@@ -107,6 +109,7 @@ const BuyerDashboard = () => {
 
       setPurchasedCredits(creditsWithSalePrice);
       setAvailableCredits(availableResponse.data || []);
+      setAvailableCursor(availableResponse.nextCursor);
       
       // 🚀 SET REAL DATA FROM API
       setPerformanceData(analyticsResponse.data || {});
@@ -123,6 +126,12 @@ const BuyerDashboard = () => {
 
 
 
+  const loadMoreAvailable = async () => {
+    const response = await getBuyerCredits(availableCursor);
+    setAvailableCredits((prev) => [...prev, ...(response.data || [])]);
+    setAvailableCursor(response.nextCursor);
+  };
+
   useEffect(() => {
     fetchAllCredits();
   }, []);
@@ -179,8 +188,19 @@ const BuyerDashboard = () => {
   const handleDownloadCertificate = async (creditId) => {
     try {
       setError(null);
-      const response = await downloadCertificate(creditId);
-      const linksource = `data:application/pdf;base64,${response.data.pdf_base64}`;
+      let response = await downloadCertificate(creditId);
+      // 202 while the PDF renders on the server; poll until it is ready
+      for (let attempt = 0; response.status === 202 && attempt < 30; attempt++) {
+        const retryAfter = Number(response.headers['retry-after']) || 1;
+        await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+        response = await downloadCertificate(creditId);
+      }
+      if (response.status === 202) {
+        throw new Error('Certificate PDF is still rendering');
+      }
+      const linksource = response.data.pdf_base64
+        ? `data:application/pdf;base64,${response.data.pdf_base64}`
+        : `data:text/html;charset=utf-8,${encodeURIComponent(response.data.html)}`;
       const downloadLink = document.createElement("a");
       const fileName = response.data.filename;
       downloadLink.href = linksource;
@@ -846,6 +866,7 @@ const BuyerDashboard = () => {
                       </div>
                     ))}
                   </div>
+                  {!isLoading && <LoadMoreButton hasMore={Boolean(availableCursor)} onLoadMore={loadMoreAvailable} />}
                 </div>
               </div>
             )}
@@ -971,6 +992,9 @@ const BuyerDashboard = () => {
                     <XCircle size={16} />
                   </button>
                 </div>
+                {certificateData.stylesheet_url && (
+                  <link rel="stylesheet" href={new URL(certificateData.stylesheet_url, API_URL).href} />
+                )}
                 <div
                   className="p-4 border border-gray-200 rounded-md"
                   dangerouslySetInnerHTML={{ __html: certificateData.certificate_html }}
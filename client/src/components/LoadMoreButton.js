@@ -0,0 +1,33 @@
+import React, { useState } from 'react';
+
+// Fetches the next page of a cursor-paginated list when clicked; hidden on the last page
+const LoadMoreButton = ({ hasMore, onLoadMore }) => {
+  const [loading, setLoading] = useState(false);
+
+  if (!hasMore) return null;
+
+  const handleClick = async () => {
+    setLoading(true);
+    try {
+      await onLoadMore();
+    } catch (error) {
+      console.error('Failed to load more:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="flex justify-center py-4">
+      <button
+        onClick={handleClick}
+        disabled={loading}
+        className="px-4 py-2 text-sm font-medium text-green-700 bg-white border border-green-300 rounded-lg hover:bg-green-50 disabled:opacity-50"
+      >
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
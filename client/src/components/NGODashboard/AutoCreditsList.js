@@ -1,9 +1,12 @@
 import React, { useState, useEffect } from 'react';
 import { CheckCircle, Zap, Shield, FileText, Calendar, DollarSign } from 'lucide-react';
 import { getAutoGeneratedCredits } from '../../api/api';
+import LoadMoreButton from '../LoadMoreButton';
 
 const AutoCreditsList = () => {
   const [autoCredits, setAutoCredits] = useState([]);
+  const [totalAutoCredits, setTotalAutoCredits] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -16,6 +19,8 @@ const AutoCreditsList = () => {
       setIsLoading(true);
       const response = await getAutoGeneratedCredits();
       setAutoCredits(response.data.auto_credits || []);
+      setTotalAutoCredits(response.data.total_auto_generated || 0);
+      setNextCursor(response.nextCursor);
     } catch (error) {
       console.error('Error fetching auto-credits:', error);
       setError('Error fetching auto-generated credits');
@@ -24,6 +29,12 @@ const AutoCreditsList = () => {
     }
   };
 
+  const loadMoreAutoCredits = async () => {
+    const response = await getAutoGeneratedCredits(nextCursor);
+    setAutoCredits((prev) => [...prev, ...(response.data.auto_credits || [])]);
+    setNextCursor(response.nextCursor);
+  };
+
   if (isLoading) {
     return (
       <div className="flex items-center justify-center py-12">
@@ -80,7 +91,7 @@ const AutoCreditsList = () => {
         </div>
         <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
           <div className="bg-white rounded-lg p-4 border border-green-200">
-            <div className="text-2xl font-bold text-green-600">{autoCredits.length}</div>
+            <div className="text-2xl font-bold text-green-600">{totalAutoCredits}</div>
             <div className="text-sm text-gray-600">Total Auto-Credits</div>
           </div>
           <div className="bg-white rounded-lg p-4 border border-blue-200">
@@ -175,6 +186,7 @@ const AutoCreditsList = () => {
           </div>
         ))}
       </div>
+      <LoadMoreButton hasMore={Boolean(nextCursor)} onLoadMore={loadMoreAutoCredits} />
     </div>
   );
 };
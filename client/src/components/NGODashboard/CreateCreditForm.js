@@ -4,9 +4,9 @@ import { Loader2, Upload, Tag, Cloud, Currency, FileText, Bitcoin } from 'lucide
 import { FaEthereum } from "react-icons/fa6";
 import { useDropzone } from 'react-dropzone';
 import Swal from 'sweetalert2';
-import { createNGOCredit, getNGOCredits } from '../../api/api';
+import { createNGOCredit } from '../../api/api';
 
-const CreateCreditForm = ({ setMyCredits }) => {
+const CreateCreditForm = ({ refreshCredits }) => {
   const { generateCredit, getNextCreditId, requestAudit } = useContext(CC_Context);
   const [newCredit, setNewCredit] = useState({ creditId: 0, name: '', amount: '', price: '', auditFees: '', secure_url: '' });
   const [pendingCr, setPendingCr] = useState(false);
@@ -114,9 +114,7 @@ const CreateCreditForm = ({ setMyCredits }) => {
         docu_url: updatedCredit.secure_url || ''
       });
 
-      const updatedCredits = await getNGOCredits();
-      // Handle both axios response shape and direct data returns
-      setMyCredits(updatedCredits?.data ?? updatedCredits);
+      await refreshCredits();
 
       setNewCredit({ name: "", amount: "", price: "", creditId: "", auditFees: '', secure_url: '' });
       
@@ -2,9 +2,10 @@ import React, { useState, useContext, useMemo } from 'react';
 import { CC_Context } from "../../context/SmartContractConnector.js";
 import { Loader2, File, AlertTriangle, CheckCircle, AlertCircle, Tag, ChevronDown, ChevronRight, Search, Filter, Download, BarChart3, Calendar, DollarSign, TrendingUp, Eye, Edit, Trash2, MoreHorizontal } from 'lucide-react';
 import Swal from 'sweetalert2';
-import { expireCreditApi, verifyBeforeExpire, sellCreditApi, getNGOCredits } from '../../api/api';
+import { expireCreditApi, verifyBeforeExpire, sellCreditApi } from '../../api/api';
+import LoadMoreButton from '../LoadMoreButton';
 
-const MyCreditsList = ({ credits, setCredits, isLoading }) => {
+const MyCreditsList = ({ credits, setCredits, refreshCredits, hasMore, onLoadMore, isLoading }) => {
   const { expireCredit, sellCredit } = useContext(CC_Context);
   const [modalVisible, setModalVisible] = useState(false);
   const [selectedCredit, setSelectedCredit] = useState(null);
@@ -347,8 +348,7 @@ const MyCreditsList = ({ credits, setCredits, isLoading }) => {
       console.log(response);
 
       // Refetch the updated credit list after successful creation
-      const updatedCredits = await getNGOCredits();
-      setCredits(updatedCredits.data);
+      await refreshCredits();
     } catch (error) {
       console.error("Can't sell credit: ", error);
       Swal.fire({
@@ -703,6 +703,7 @@ const MyCreditsList = ({ credits, setCredits, isLoading }) => {
             No credits available
           </div>
                   )}
+        {!isLoading && <LoadMoreButton hasMore={hasMore} onLoadMore={onLoadMore} />}
         </dd>
       </div>
 
@@ -8,7 +8,9 @@ import AutoCreditsList from './AutoCreditsList';
 
 const NGODashboard = () => {
   const [myCredits, setMyCredits] = useState([]);
+  const [creditsCursor, setCreditsCursor] = useState(null);
   const [transactions, setTransactions] = useState([]);
+  const [transactionsCursor, setTransactionsCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [activeTab, setActiveTab] = useState('verification');
 
@@ -20,7 +22,9 @@ const NGODashboard = () => {
           getTransactions(),
         ]);
         setMyCredits(creditsResponse.data);
+        setCreditsCursor(creditsResponse.nextCursor);
         setTransactions(transactionsResponse.data);
+        setTransactionsCursor(transactionsResponse.nextCursor);
       } catch (error) {
         console.error('Failed to fetch data:', error);
       } finally {
@@ -30,6 +34,25 @@ const NGODashboard = () => {
     fetchData();
   }, []);
 
+  // Reload from the first page after a change, dropping the pages loaded so far
+  const refreshCredits = async () => {
+    const response = await getNGOCredits();
+    setMyCredits(response.data);
+    setCreditsCursor(response.nextCursor);
+  };
+
+  const loadMoreCredits = async () => {
+    const response = await getNGOCredits(creditsCursor);
+    setMyCredits((prev) => [...prev, ...response.data]);
+    setCreditsCursor(response.nextCursor);
+  };
+
+  const loadMoreTransactions = async () => {
+    const response = await getTransactions(transactionsCursor);
+    setTransactions((prev) => [...prev, ...response.data]);
+    setTransactionsCursor(response.nextCursor);
+  };
+
   return (
     <div className="min-h-screen bg-gray-50">
       <div className="max-w-7xl mx-auto py-8 px-4 sm:px-6 lg:px-8">
@@ -72,12 +95,19 @@ const NGODashboard = () => {
             )}
             {activeTab === 'create' && (
               <div className="animate-fade-in">
-                <CreateCreditForm setMyCredits={setMyCredits} />
+                <CreateCreditForm refreshCredits={refreshCredits} />
               </div>
             )}
             {activeTab === 'credits' && (
               <div className="animate-fade-in">
-                <MyCreditsList credits={myCredits} setCredits={setMyCredits} isLoading={isLoading} />
+                <MyCreditsList
+                  credits={myCredits}
+                  setCredits={setMyCredits}
+                  refreshCredits={refreshCredits}
+                  hasMore={Boolean(creditsCursor)}
+                  onLoadMore={loadMoreCredits}
+                  isLoading={isLoading}
+                />
               </div>
             )}
             {activeTab === 'auto-credits' && (
@@ -87,7 +117,12 @@ const NGODashboard = () => {
             )}
             {activeTab === 'transactions' && (
               <div className="animate-fade-in">
-                <RecentTransactionsList transactions={transactions} isLoading={isLoading} />
+                <RecentTransactionsList
+                  transactions={transactions}
+                  hasMore={Boolean(transactionsCursor)}
+                  onLoadMore={loadMoreTransactions}
+                  isLoading={isLoading}
+                />
               </div>
             )}
           </div>
@@ -1,6 +1,7 @@
 import React from 'react';
+import LoadMoreButton from '../LoadMoreButton';
 
-const RecentTransactionsList = ({ transactions, isLoading }) => {
+const RecentTransactionsList = ({ transactions, isLoading, hasMore, onLoadMore }) => {
   const LoadingCredit = () => (
     <li className="flex justify-between items-center py-3 pr-4 pl-3 text-sm animate-pulse">
       <div className="flex-1">
@@ -23,7 +24,7 @@ const RecentTransactionsList = ({ transactions, isLoading }) => {
               <LoadingCredit />
               <LoadingCredit />
             </>
-          ) : (transactions && Array.isArray(transactions) ? transactions.slice(-10) : []).map((transaction) => (
+          ) : (transactions && Array.isArray(transactions) ? transactions : []).map((transaction) => (
             <li key={transaction.id} className="flex justify-between items-center py-3 pr-4 pl-3 text-sm">
               <div className="flex flex-1 items-center w-0">
                 <span className="flex-1 ml-2 w-0 truncate">
@@ -33,6 +34,7 @@ const RecentTransactionsList = ({ transactions, isLoading }) => {
             </li>
           ))}
         </ul>
+        {!isLoading && <LoadMoreButton hasMore={hasMore} onLoadMore={onLoadMore} />}
       </dd>
     </div>
   );